@@ -1,119 +1,233 @@
 import os
-from dotenv import load_dotenv
 from flask_mail import Mail, Message
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 
 from datetime import date
 from functools import wraps
 
-from flask import Flask, abort, flash, redirect, render_template, url_for, make_response, jsonify
+from flask import (Blueprint, Flask, abort, current_app, flash, redirect, render_template, send_file,
+                   stream_template, url_for, make_response, jsonify)
 from flask_bootstrap import Bootstrap
 from flask_ckeditor import CKEditor
 from flask_gravatar import Gravatar
 from flask_login import (LoginManager, current_user, login_required,
                          login_user, logout_user)
 from flask_wtf.csrf import CSRFProtect
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from forms import CommentForm, CreatePostForm, LoginForm, RegisterForm, GeneralRecommendationForm
 
-from git_handle import git_push
-from tables import BlogPost, Comment, User, db
+from assets import AssetPipeline
+from avatars import AVATAR_HASH_RE, cached_identicon, gravatar_url
+from compression import Compressor
+from config import PROFILES
+from content import content_cli
+from database import migrate
+from engagement import EngagementCounters, counts_views
+from export import export_command
+from feeds import FeedCache
+from mail_queue import MailQueue
+from observability import RequestMetrics, setup_logging
+from page_cache import PageCache, cached_page
+from passwords import LoginThrottle, PasswordHasher, PasswordHasherBusy
+from queries import FeedPage, comments_for_post, feed_page, most_read, post_stats, related_posts
+from related import RelatedIndex
+from search import index_post, remove_post, search_cli, search_posts
+from tables import BlogPost, Comment, PostStat, UploadBlob, User, db
+from uploads import register_upload, store_blob
+from user_cache import UserCache
 
 from flask_caching import Cache
 from flask import make_response
 import time
 
-import hashlib
 from flask import request
+from werkzeug.local import LocalProxy
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename 
 
-from ftplib import FTP
+from functools import partial
 
 import logging
 
-# Konfigurasi logging
-if not os.path.exists("logs"):
-    os.makedirs("logs")
-
-logging.basicConfig(
-    filename="logs/app.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
+# Ekstensi pihak ketiga menyimpan state per app di app.extensions sendiri,
+# jadi satu objek bisa dipasang ke beberapa app
+cache = Cache()
+mail = Mail()
+ckeditor = CKEditor()
+bootstrap = Bootstrap()
+gravatar = Gravatar(
+    size=100,
+    rating="g",
+    default="retro",
+    force_default=False,
+    force_lower=False,
+    use_ssl=True,
+    base_url=None,
 )
+login_manager = LoginManager()
 
 
+def _extension(name):
+    return LocalProxy(lambda: current_app.extensions[name])
+
+
+# Ekstensi blog dibuat per app oleh create_app() dan disimpan di app.extensions
+# (konfigurasi, thread latar belakang, dan buffer-nya milik app itu); nama di
+# bawah ini selalu mengarah ke milik current_app
+page_cache = _extension("page_cache")
+feeds = _extension("feeds")
+mail_queue = _extension("mail_queue")
+request_metrics = _extension("request_metrics")
+password_hasher = _extension("password_hasher")
+login_throttle = _extension("login_throttle")
+user_cache = _extension("user_cache")
+related_index = _extension("related_index")
+engagement = _extension("engagement")
+
+AVATAR_MAX_AGE = 365 * 24 * 3600
+
+bp = Blueprint("blog", __name__)
+
+
+def create_app(config=None):
+    """Buat app Flask dari profil konfigurasi ("production", "test", "benchmark")
+    atau kelas konfigurasi; tanpa argumen profil dibaca dari env BLOG_CONFIG.
+
+    Backup git dan pool FTP hanya di-import / dibuat kalau diaktifkan, jadi
+    test dan benchmark tidak butuh GitPython, SMTP, atau FTP sungguhan. Setiap
+    panggilan membuat ekstensi blog sendiri, jadi beberapa app bisa berdampingan.
+    """
+    if config is None or isinstance(config, str):
+        config = PROFILES[config or os.getenv("BLOG_CONFIG", "production")]
+    app = Flask(__name__, instance_relative_config=True)
+    app.config.from_object(config)
+    if app.config["TRUSTED_PROXIES"]:
+        # Tanpa ini remote_addr selalu alamat nginx, dan batas login per IP
+        # berubah menjadi batas untuk seluruh situs
+        proxies = app.config["TRUSTED_PROXIES"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+    app.config["AVATAR_FOLDER"] = app.config["AVATAR_FOLDER"] or os.path.join(app.instance_path, "avatars")
+    # Blob content-addressed: static/uploads/blobs/<2 huruf hash>/<sha256><ext>
+    app.config["BLOB_FOLDER"] = app.config["BLOB_FOLDER"] or os.path.join(app.root_path, "static", "uploads", "blobs")
+
+    # Logging JSON per baris, ditulis oleh thread QueueListener supaya
+    # request tidak menunggu disk
+    app.extensions["log_handler"] = setup_logging(
+        app.config["LOG_FILE"],
+        max_bytes=app.config["LOG_MAX_BYTES"],
+        backup_count=app.config["LOG_BACKUP_COUNT"],
+    )
 
-# Muat environment variables dari file .env
-load_dotenv()
-
-app = Flask(__name__,instance_relative_config=True)
-app.config["SECRET_KEY"] = "8BYkEfBA6O6donzWlSihBXox7C0sKR6b"
-
-# Konfigurasi cache sederhana (disimpan di memori)
-app.config['CACHE_TYPE'] = 'SimpleCache'
-app.config['CACHE_DEFAULT_TIMEOUT'] = 60  # cache berlaku selama 60 detik
-# Inisialisasi objek cache
-cache = Cache(app)
-
-app.config["SERVER_NAME"] = "127.0.0.1:5000"
-
-# Serializer untuk membuat dan memverifikasi token
-serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'])
-
-# ==================== KONFIGURASI FLASK-MAIL ==================== #
-app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER')
-app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT'))
-app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS').lower() in ['true', '1', 't']
-app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
-app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
-app.config['MAIL_DEFAULT_SENDER'] = ('Sahal\'s Blog', os.getenv('MAIL_USERNAME'))
-
-mail = Mail(app)
-# ============================================================= #
+    cache.init_app(app)
+    # RSS / JSON Feed: dirender ulang hanya setelah post ditambah, diedit, atau dihapus
+    FeedCache(cache, title="Sahal's Blog").init_app(app)
+    mail.init_app(app)
+    # Email tidak dikirim di dalam request: masuk antrean SQLite di instance/,
+    # lalu dikirim per batch oleh thread pengirim dengan satu koneksi SMTP
+    MailQueue().init_app(app, mail)
+    ckeditor.init_app(app)
+    bootstrap.init_app(app)
+    gravatar.init_app(app)
+    # Aset statis ber-hash di static/dist (lihat assets.py)
+    AssetPipeline().init_app(app)
+    # Cache halaman HTML per kelas pengunjung (anon / user / admin); versinya
+    # memuat manifest aset, jadi dipasang setelah AssetPipeline
+    pages = PageCache(cache, timeout=120)
+    pages.init_app(app)
+
+    db.init_app(app)
+    # Schema selalu disamakan saat start (pragma SQLite dipasang oleh modul database)
+    with app.app_context():
+        migrate()
 
-# interacting with CkEditor
-ckeditor = CKEditor(app)
-app.config["CKEDITOR_PKG_TYPE"] = "standard-all"
-app.config["CKEDITOR_ENABLE_CODESNIPPET"] = True
+    if app.config["GIT_BACKUP_ENABLED"]:
+        # GitPython cukup berat di-import; hanya dimuat kalau backup dipakai
+        from git_handle import BackupWorker, git_path
 
-# Bootstrap
-Bootstrap(app)
+        app.extensions["backup_worker"] = BackupWorker(
+            git_path,
+            debounce=app.config["GIT_BACKUP_DEBOUNCE"],
+            max_retries=app.config["GIT_BACKUP_RETRIES"],
+        )
 
-# Connect to DB
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///blog.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db.init_app(app)
+    if app.config["FTP_HOST"]:
+        # Beberapa sesi FTP yang sudah login dipakai ulang oleh semua upload
+        from uploads import FTPPool
 
+        app.extensions["ftp_pool"] = FTPPool(
+            app.config["FTP_HOST"],
+            app.config["FTP_PORT"],
+            app.config["FTP_USER"],
+            app.config["FTP_PASSWORD"],
+            size=app.config["FTP_POOL_SIZE"],
+        )
 
-# Gravatar!
-gravatar = Gravatar(
-    app,
-    size=100,
-    rating="g",
-    default="retro",
-    force_default=False,
-    force_lower=False,
-    use_ssl=False,
-    base_url=None,
-)
+    # Urutan penting: after_request dijalankan terbalik, jadi metrics (dipasang
+    # pertama) ikut mengukur kompresi, dan kompresi berjalan setelah
+    # unified_cache_headers menghapus Vary
+    # Durasi, status, page cache, dan jumlah query SQL per request -> log + /metrics
+    RequestMetrics().init_app(app)
+    # Kompresi gzip / brotli; hasil kompresi halaman dari page cache ikut di-cache
+    Compressor(cache=cache).init_app(app)
+    # Hashing password di process pool; hash lama diganti saat login
+    PasswordHasher().init_app(app)
+    LoginThrottle(cache).init_app(app)
+    # current_user adalah UserSnapshot dari cache, bukan objek ORM; query User
+    # langsung kalau butuh relasi atau kolom lain
+    users = UserCache(lambda user_id: User.query.get(user_id))
+    users.watch(User)
+    users.init_app(app)
+    # Post terkait (TF-IDF) dihitung saat post disimpan, bukan saat halaman dibaca;
+    # halaman post yang daftar terkaitnya berubah dibuang dari page cache
+    RelatedIndex(on_change=lambda post_ids: pages.invalidate(
+        *(url_for("blog.show_post", post_id=post_id, _external=False) for post_id in post_ids))).init_app(app)
+    # View dan komentar per post dijumlahkan di memori, ditulis ke post_stats per batch;
+    # urutan /popular ikut berubah, jadi halamannya dibuang dari page cache
+    EngagementCounters(on_flush=lambda: pages.invalidate(
+        url_for("blog.popular", _external=False))).init_app(app)
+    login_manager.init_app(app)
+    app.register_blueprint(bp)
+
+    # Pencarian full-text (SQLite FTS5): `flask search rebuild` untuk mengindeks ulang
+    app.cli.add_command(search_cli)
+    # `flask export -o site/`: HTML statis untuk pengunjung anonim (dilayani nginx)
+    app.cli.add_command(export_command)
+    # `flask content export > arsip.jsonl` / `flask content import arsip.jsonl`
+    app.cli.add_command(content_cli)
+    return app
+
+
+def email_serializer():
+    # Serializer untuk membuat dan memverifikasi token verifikasi email
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"])
+
+
+@bp.app_template_global()
+def avatar_url(avatar_hash, size=100):
+    if current_app.config["AVATAR_PROVIDER"] == "gravatar":
+        return gravatar_url(avatar_hash, size=size)
+    return url_for("blog.avatar", avatar_hash=avatar_hash)
+
+
+def schedule_backup(message):
+    # Backup git berjalan di thread terpisah; perubahan beruntun digabung jadi satu commit
+    backup_worker = current_app.extensions.get("backup_worker")
+    if backup_worker is not None:
+        backup_worker.enqueue(message)
 
-# Flask Login
-login_manager = LoginManager()
-login_manager.init_app(app)
 
 # Flask Login Functions
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(id)
+    return user_cache.get(id)
 
 
 # Create admin-only decorator
 def admin_only(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # If id is not 1 then return abort with 403 error
-        if current_user.id != 1:
+        # If id is not 1 (or not logged in) then return abort with 403 error
+        if not current_user.is_authenticated or current_user.id != 1:
             return abort(403)
         # Otherwise continue with the route function
         return f(*args, **kwargs)
@@ -121,48 +235,63 @@ def admin_only(f):
     return decorated_function
 
 
+def render_page(template_name, **context):
+    # STREAM_TEMPLATES: beranda dan halaman post dikirim per potongan selagi
+    # template dirender (byte pertama lebih cepat sampai)
+    if current_app.config["STREAM_TEMPLATES"]:
+        return current_app.response_class(stream_template(template_name, **context))
+    return render_template(template_name, **context)
+
+
 # Global Variables?
-@app.context_processor
+@bp.app_context_processor
 def get_year():
     return dict(year=date.today().year)
 
-@cache.cached(timeout=120)  # cache selama 120 detik
-@app.route("/")
+@bp.route("/")
+@cached_page()
 def home():
-    # print("query jalan")  # Debug: hanya muncul saat cache belum aktif
-    # Ambil semua postingan dan urutkan berdasarkan tanggal terbaru (best practice)
-    # Ini akan mengembalikan daftar kosong jika tidak ada post, tanpa menyebabkan error
-    all_blog_posts = BlogPost.query.order_by(BlogPost.id.desc()).all()
-    
-    # Kirim daftar postingan ke template
-    # Jika all_blog_posts kosong, perulangan for di template tidak akan berjalan
-    return render_template("index.html", all_posts=all_blog_posts)
+    # Ambil satu halaman postingan terbaru (keyset: ?before=<id> / ?after=<id>)
+    # Hanya kolom preview yang di-query, body tidak ikut di-load
+    feed = feed_page(
+        before=request.args.get("before", type=int),
+        after=request.args.get("after", type=int),
+    )
+
+    # Jika feed.posts kosong, perulangan for di template tidak akan berjalan
+    return render_page("index.html", all_posts=feed.posts, feed=feed)
 
-@cache.cached(timeout=120)  # Cache 2 menit
-@app.route("/about")
+@bp.route("/about")
+@cached_page()
 def about():
     return render_template("about.html")
 
-@cache.cached(timeout=120)  # Cache 2 menit
-@app.route("/contact")
+@bp.route("/contact")
+@cached_page()
 def contact():
     return render_template("contact.html")
 
 
 # ================= LOGIN / REGISTER ============================== #
-@app.route("/register", methods=["GET", "POST"])
+@bp.route("/register", methods=["GET", "POST"])
 def register():
     form = RegisterForm()
     if form.validate_on_submit():
+        if not login_throttle.allow(request.remote_addr):
+            flash("Terlalu banyak percobaan. Silakan coba lagi beberapa menit lagi.")
+            return render_template("register.html", form=form), 429
+
         email = form.email.data
         user = User.query.filter_by(email=email).first()
         if user:
             flash("Email sudah terdaftar! Silakan login.")
-            return redirect(url_for("login"))
+            return redirect(url_for("blog.login"))
 
-        password = generate_password_hash(
-            form.password.data, method="pbkdf2:sha256", salt_length=8
-        )
+        try:
+            password = password_hasher.hash(form.password.data)
+        except PasswordHasherBusy:
+            flash("Server sedang sibuk, silakan coba lagi.")
+            return render_template("register.html", form=form), 503
         # Buat user dengan status is_verified = False
         new_user = User(
             email=email, 
@@ -175,9 +304,9 @@ def register():
 
         # === KIRIM EMAIL VERIFIKASI ===
         # Buat token (berlaku selama 1 jam / 3600 detik)
-        token = serializer.dumps(email, salt='email-verification-salt')
+        token = email_serializer().dumps(email, salt='email-verification-salt')
         # Buat link verifikasi
-        verification_url = url_for('verify_email', token=token, _external=True)
+        verification_url = url_for('blog.verify_email', token=token, _external=True)
         # Buat pesan email
         msg = Message(
             subject="Verifikasi Akun Sahal's Blog",
@@ -186,24 +315,24 @@ def register():
                  f"<p><a href='{verification_url}'>{verification_url}</a></p>"
                  f"<p>Jika Anda tidak merasa mendaftar, abaikan email ini.</p>"
         )
-        mail.send(msg)
+        mail_queue.enqueue(msg)
         # ===============================
 
         flash("Pendaftaran berhasil! Silakan cek email Anda untuk verifikasi akun.", "info")
-        return redirect(url_for("login"))
+        return redirect(url_for("blog.login"))
     return render_template("register.html", form=form)
 
-@app.route('/verify/<token>')
+@bp.route('/verify/<token>')
 def verify_email(token):
     try:
         # Verifikasi token dengan masa berlaku 1 jam (3600 detik)
-        email = serializer.loads(token, salt='email-verification-salt', max_age=3600)
+        email = email_serializer().loads(token, salt='email-verification-salt', max_age=3600)
     except SignatureExpired:
         flash("Link verifikasi telah kedaluwarsa. Silakan daftar ulang.", "danger")
-        return redirect(url_for('register'))
+        return redirect(url_for('blog.register'))
     except BadSignature:
         flash("Link verifikasi tidak valid.", "danger")
-        return redirect(url_for('register'))
+        return redirect(url_for('blog.register'))
 
     user = User.query.filter_by(email=email).first_or_404()
     
@@ -214,13 +343,18 @@ def verify_email(token):
         db.session.commit()
         flash("Akun Anda telah berhasil diverifikasi! Silakan login.", "success")
         
-    return redirect(url_for('login'))
+    return redirect(url_for('blog.login'))
 
-@app.route("/login", methods=["GET", "POST"])
+@bp.route("/login", methods=["GET", "POST"])
 def login():
     form = LoginForm()
     if form.validate_on_submit():
         email = form.email.data
+        # Dicek sebelum query dan hashing, jadi serbuan login tidak memakan CPU
+        if not login_throttle.allow(request.remote_addr, email):
+            flash("Terlalu banyak percobaan login. Silakan coba lagi beberapa menit lagi.")
+            return render_template("login.html", form=form), 429
+
         user = User.query.filter_by(email=email).first()
         
         if not user:
@@ -228,16 +362,31 @@ def login():
             return render_template("login.html", form=form)
 
         # Cek apakah password cocok
-        if check_password_hash(pwhash=user.password, password=form.password.data):
+        try:
+            password_ok = password_hasher.verify(user.password, form.password.data)
+        except PasswordHasherBusy:
+            flash("Server sedang sibuk, silakan coba lagi.")
+            return render_template("login.html", form=form), 503
+
+        if password_ok:
             
             # === TAMBAHKAN PENGECEKAN INI ===
             if not user.is_verified:
                 flash("Akun Anda belum diverifikasi. Silakan cek email Anda.", "warning")
-                return redirect(url_for('login'))
+                return redirect(url_for('blog.login'))
             # ===============================
 
+            # Hash lama (salt 8 / iterasi lebih sedikit) diganti ke parameter sekarang
+            if password_hasher.needs_rehash(user.password):
+                try:
+                    user.password = password_hasher.hash(form.password.data)
+                    db.session.commit()
+                except PasswordHasherBusy:
+                    pass
+
+            login_throttle.reset(email)
             login_user(user)
-            return redirect(url_for("home"))
+            return redirect(url_for("blog.home"))
         else:
             flash("Password salah, silakan coba lagi!")
             return render_template("login.html", form=form)
@@ -245,42 +394,77 @@ def login():
     return render_template("login.html", form=form)
 
 
-@app.route("/logout")
+@bp.route("/logout")
 def logout():
     logout_user()
-    return redirect(url_for("home"))
+    return redirect(url_for("blog.home"))
 
 
 # ====================== ADDING / SHOWING / EDITING /  DELETING POSTS ============= #
-@app.route("/post/<int:post_id>", methods=["GET", "POST"])
+@bp.route("/post/<int:post_id>", methods=["GET", "POST"])
+# Form komentar membawa token CSRF per sesi, jadi hanya pengunjung anonim
+# yang mendapat halaman dari cache. View dihitung juga untuk cache hit / 304.
+@counts_views
+@cached_page(viewers=("anon",))
 def show_post(post_id):
-    all_comments = db.session.query(Comment).all()[::-1]
-    requested_post = BlogPost.query.get(post_id)
+    requested_post = BlogPost.query.get_or_404(post_id)
     form = CommentForm()
+    if request.method == "POST" and not current_user.is_authenticated:
+        flash("You need to be logged in to make a comment!")
+        return redirect(url_for("blog.login"))
+
     if form.validate_on_submit():
-        if current_user.is_authenticated:
-            new_comment = Comment(
-                text=form.body.data,
-                author=current_user,
-                author_id=current_user.id,
-                post=requested_post,
-                post_id=post_id,
-            )
-            db.session.add(new_comment)
-            db.session.commit()
+        new_comment = Comment(
+            text=form.body.data,
+            author_id=current_user.id,
+            post=requested_post,
+            post_id=post_id,
+        )
+        db.session.add(new_comment)
+        db.session.commit()
+        engagement.record(post_id, comments=1)
+        page_cache.invalidate(url_for("blog.show_post", post_id=post_id))
 
-            return redirect(url_for("show_post", post_id=post_id))
+        return redirect(url_for("blog.show_post", post_id=post_id))
 
-        else:
-            flash("You need to be logged in to make a comment!")
-            return redirect(url_for("login"))
+    # Komentar di-load per post dan per halaman, bukan seluruh tabel comments
+    page = request.args.get("page", 1, type=int)
+    comments = comments_for_post(post_id, page=page)
 
-    return render_template(
-        "post.html", post=requested_post, form=form, all_comments=all_comments
+    return render_page(
+        "post.html", post=requested_post, form=form, comments=comments,
+        related=related_posts(post_id),
     )
 
 
-@app.route("/new-post", methods=["GET", "POST"])
+@bp.route("/popular")
+@cached_page()
+def popular():
+    # Urutan dari post_stats; page cache dibuang setiap engagement.flush()
+    return render_page("index.html", all_posts=most_read(), feed=FeedPage([], None, None),
+                       subheading="Tulisan yang paling banyak dibaca")
+
+
+@bp.route("/feed.xml")
+def rss_feed():
+    return feeds.response("rss")
+
+
+@bp.route("/feed.json")
+def json_feed():
+    return feeds.response("json")
+
+
+@bp.route("/search")
+def search():
+    results = search_posts(
+        request.args.get("q", "").strip(),
+        page=max(request.args.get("page", 1, type=int), 1),
+    )
+    return render_template("search.html", results=results)
+
+
+@bp.route("/new-post", methods=["GET", "POST"])
 @admin_only
 def add_new_post():
     form = CreatePostForm()
@@ -290,19 +474,24 @@ def add_new_post():
             subtitle=form.subtitle.data,
             body=form.body.data,
             img_url=form.img_url.data,
-            author=current_user,
+            author_id=current_user.id,
             date=date.today().strftime("%B %d, %Y"),
         )
         db.session.add(new_post)
+        db.session.flush()
+        index_post(new_post)
         db.session.commit()
+        page_cache.invalidate(url_for("blog.home"))
+        feeds.invalidate()
+        related_index.schedule(new_post.id)
 
-        git_push("Added a post -- autobackup")
+        schedule_backup("Added a post")
 
-        return redirect(url_for("home"))
+        return redirect(url_for("blog.home"))
     return render_template("make-post.html", form=form)
 
 
-@app.route("/edit-post/<int:post_id>", methods=["GET", "POST"])
+@bp.route("/edit-post/<int:post_id>", methods=["GET", "POST"])
 @admin_only
 def edit_post(post_id):
     post = BlogPost.query.get(post_id)
@@ -318,28 +507,61 @@ def edit_post(post_id):
         post.subtitle = edit_form.subtitle.data
         post.img_url = edit_form.img_url.data
         post.body = edit_form.body.data
+        index_post(post)
         db.session.commit()
+        page_cache.invalidate(url_for("blog.home"), url_for("blog.show_post", post_id=post.id))
+        feeds.invalidate()
+        related_index.schedule(post.id)
 
-        git_push("Edited a post -- autobackup")
+        schedule_backup("Edited a post")
 
-        return redirect(url_for("show_post", post_id=post.id))
+        return redirect(url_for("blog.show_post", post_id=post.id))
 
     return render_template("make-post.html", form=edit_form, is_edit=True)
 
 
-@app.route("/delete/<int:post_id>")
+@bp.route("/delete/<int:post_id>")
 @admin_only
 def delete_post(post_id):
     post_to_delete = BlogPost.query.get(post_id)
     db.session.delete(post_to_delete)
+    remove_post(post_id)
+    PostStat.query.filter_by(post_id=post_id).delete()
     db.session.commit()
+    page_cache.invalidate(url_for("blog.home"), url_for("blog.show_post", post_id=post_id),
+                          url_for("blog.popular"))
+    feeds.invalidate()
+    related_index.schedule(post_id)
 
-    git_push("Deleted a post -- auto-backup")
+    schedule_backup("Deleted a post")
 
-    return redirect(url_for("home"))
+    return redirect(url_for("blog.home"))
 
 
-@app.route("/set-cookie-consent")
+@bp.route("/backup-status")
+@admin_only
+def backup_status():
+    backup_worker = current_app.extensions.get("backup_worker")
+    return jsonify(backup_worker.status if backup_worker else {"enabled": False})
+
+
+@bp.route("/metrics")
+@admin_only
+def metrics():
+    return jsonify(request_metrics.snapshot())
+
+
+@bp.route("/stats")
+@admin_only
+def stats():
+    # Angka worker ini ditulis dulu; worker lain menyusul di flush berikutnya
+    engagement.flush()
+    order_by = "comments" if request.args.get("sort") == "comments" else "views"
+    return render_template("stats.html", rows=post_stats(order_by), order_by=order_by,
+                           flush_interval=engagement.interval)
+
+
+@bp.route("/set-cookie-consent")
 def set_cookie_consent():
     # Buat response JSON sederhana
     response = make_response(jsonify(message="Cookie consent set"))
@@ -350,7 +572,54 @@ def set_cookie_consent():
     return response
 
 
-@app.route("/recommend", methods=["GET", "POST"])
+def queue_recommendation_email(sender_name, admin_email, title, notes, filename,
+                               mimetype, path, size, file_url, fallback_url):
+    # File besar tidak dilampirkan (tidak perlu dibaca ke memori), cukup link-nya
+    attach = size <= current_app.config["MAIL_ATTACHMENT_MAX_SIZE"]
+    note = "" if attach else "<p><i>File terlalu besar untuk dilampirkan, silakan unduh lewat link.</i></p>"
+
+    # ✅ LOG 3: Email masuk antrean
+    logging.info(f"Email rekomendasi diantrekan untuk admin: {admin_email}, file URL: {file_url}")
+
+    # ✅ Kirim email ke admin
+    msg = Message(
+        subject=f"Rekomendasi Blog Baru dari {sender_name}",
+        recipients=[admin_email],
+        html=f"""
+            <p><b>{sender_name}</b> mengirimkan rekomendasi blog baru.</p>
+            <p><b>Judul:</b> {title or '-'}</p>
+            <p><b>Catatan:</b> {notes or '-'}</p>
+            <p>🔗 <a href="{file_url}">Download Lampiran</a></p>
+            {note}
+        """
+    )
+    mail_queue.enqueue(msg, attachments=[(filename, mimetype, path)] if attach else [])
+
+
+def ftp_file_url(remote_name, recommendation):
+    base_url = current_app.config["FTP_BASE_URL"]
+    if base_url:
+        return f"{base_url.rstrip('/')}/{remote_name}"
+    return recommendation["fallback_url"]
+
+
+def _after_ftp_upload(flask_app, recommendation, sha256, remote_name, future):
+    with flask_app.app_context():
+        try:
+            future.result()
+        except Exception as e:
+            logging.error(f"FTP Error oleh {recommendation['sender_name']}: {e}")
+            file_url = recommendation["fallback_url"]
+        else:
+            logging.info(f"File '{recommendation['filename']}' berhasil diupload ke FTP oleh {recommendation['sender_name']}")
+            UploadBlob.query.filter_by(sha256=sha256).update({"ftp_uploaded": True})
+            db.session.commit()
+            file_url = ftp_file_url(remote_name, recommendation)
+
+        queue_recommendation_email(file_url=file_url, **recommendation)
+
+
+@bp.route("/recommend", methods=["GET", "POST"])
 @login_required
 def recommend_blog():
     form = GeneralRecommendationForm()
@@ -358,99 +627,98 @@ def recommend_blog():
     if form.validate_on_submit():
         file = form.file.data
         filename = secure_filename(file.filename)
-        temp_path = os.path.join("static/uploads", filename)
-        file.save(temp_path)
+        # Upload disimpan per SHA-256 isinya; file yang sama persis tidak
+        # ditulis ulang ke disk dan tidak diupload ulang ke FTP
+        blob_folder = current_app.config["BLOB_FOLDER"]
+        stored = store_blob(file, blob_folder, os.path.splitext(filename)[1].lower(),
+                            max_size=current_app.config["UPLOAD_MAX_SIZE"])
+        blob = register_upload(current_user.id, filename, file.mimetype, stored, blob_folder)
 
         # ✅ LOG 1: User upload
-        logging.info(f"User {current_user.name} mengirim rekomendasi: {filename}")
-
-        # ====================== FTP UPLOAD ======================
-        try:
-            ftp = FTP()
-            ftp.connect(os.getenv("FTP_HOST"), int(os.getenv("FTP_PORT")))
-            ftp.login(os.getenv("FTP_USER"), os.getenv("FTP_PASSWORD"))
-            ftp.set_pasv(True)  # Wajib untuk mencegah 425 Error
-
-            with open(temp_path, 'rb') as f:
-                ftp.storbinary(f"STOR {filename}", f)
-
-            logging.info(f"File '{filename}' berhasil diupload ke FTP oleh {current_user.name}")
-            ftp.quit()
-
-        except Exception as e:
-            logging.error(f"FTP Error oleh {current_user.name}: {e}")
-            flash(f"Gagal upload ke FTP: {e}", "danger")
-            return redirect(url_for("recommend_blog"))
-        # ========================================================
+        logging.info(
+            f"User {current_user.name} mengirim rekomendasi: {filename} "
+            f"({stored.size} byte, sha256={stored.sha256}, baru={stored.created})"
+        )
 
         # ✅ Ambil email admin (id = 1)
         admin = User.query.get(1)
         if not admin:
             flash("Admin tidak ditemukan!", "danger")
-            return redirect(url_for("home"))
+            return redirect(url_for("blog.home"))
 
-        # ✅ Buat URL untuk file (versi static sebagai fallback)
-        if os.getenv("FTP_BASE_URL"):
-            file_url = f"{os.getenv('FTP_BASE_URL').rstrip('/')}/{filename}"
+        recommendation = dict(
+            sender_name=current_user.name,
+            admin_email=admin.email,
+            title=form.title.data,
+            notes=form.notes.data,
+            filename=filename,
+            mimetype=file.mimetype,
+            path=stored.path,
+            size=stored.size,
+            # URL static sebagai fallback kalau FTP tidak tersedia / gagal
+            fallback_url=url_for("static", filename=f"uploads/blobs/{blob.path}", _external=True),
+        )
+        remote_name = os.path.basename(blob.path)
+
+        # ====================== FTP UPLOAD ======================
+        # Transfer FTP berjalan di thread pool dengan sesi yang dipakai ulang;
+        # email ke admin diantrekan setelah transfer selesai
+        if blob.ftp_uploaded:
+            logging.info(f"File '{filename}' sudah ada di FTP sebagai {remote_name}, upload dilewati")
+            queue_recommendation_email(file_url=ftp_file_url(remote_name, recommendation), **recommendation)
+        elif "ftp_pool" in current_app.extensions:
+            future = current_app.extensions["ftp_pool"].submit(stored.path, remote_name)
+            future.add_done_callback(partial(
+                _after_ftp_upload, current_app._get_current_object(), recommendation, blob.sha256, remote_name))
         else:
-            file_url = f"{request.host_url}static/uploads/{filename}"
+            queue_recommendation_email(file_url=recommendation["fallback_url"], **recommendation)
+        # ========================================================
 
-        # ✅ LOG 3: Email berhasil dikirim
-        logging.info(f"Email rekomendasi dikirim ke admin: {admin.email}, file URL: {file_url}")
+        flash("Rekomendasi berhasil dikirim! Admin akan menerima email setelah file selesai diunggah.", "success")
+        return redirect(url_for("blog.home"))
 
-        # ✅ Kirim email ke admin
-        msg = Message(
-            subject=f"Rekomendasi Blog Baru dari {current_user.name}",
-            recipients=[admin.email],
-            html=f"""
-                <p><b>{current_user.name}</b> mengirimkan rekomendasi blog baru.</p>
-                <p><b>Judul:</b> {form.title.data or '-'}</p>
-                <p><b>Catatan:</b> {form.notes.data or '-'}</p>
-                <p>🔗 <a href="{file_url}">Download Lampiran</a></p>
-            """
-        )
-        msg.attach(filename, file.mimetype, open(temp_path, 'rb').read())
-        mail.send(msg)
+    return render_template("recommend.html", form=form)
 
-        flash("Rekomendasi berhasil dikirim ke admin via email dan FTP!", "success")
-        return redirect(url_for("home"))
 
-    return render_template("recommend.html", form=form)
 
 
+@bp.route("/avatar/<avatar_hash>.svg")
+def avatar(avatar_hash):
+    if not AVATAR_HASH_RE.match(avatar_hash):
+        abort(404)
+    path = cached_identicon(current_app.config["AVATAR_FOLDER"], avatar_hash)
+    # Isi avatar hanya bergantung pada hash di URL, jadi aman di-cache selamanya
+    response = send_file(path, mimetype="image/svg+xml", max_age=AVATAR_MAX_AGE)
+    response.cache_control.immutable = True
+    response.cache_control.public = True
+    return response
 
 
-@app.route("/debug-session")
+@bp.route("/debug-session")
 def debug_session():
     print("Current user name:", current_user.name)
     return "Cek terminal / console Flask"
 
-@app.route("/clear-cache")
+@bp.route("/clear-cache")
+# Cache juga menyimpan counter rate limit login, jadi hanya admin yang boleh
+@admin_only
 def clear_cache():
     cache.clear()
     return "Cache dibersihkan"
 
-@app.after_request
+@bp.after_app_request
 def unified_cache_headers(response):
     if response.content_type.startswith("text/html"):
-        response.headers['Cache-Control'] = 'public, max-age=120'
-
-        # ETag (berbasis isi konten, aman untuk cache validation)
-        etag = hashlib.md5(response.get_data()).hexdigest()
-        response.set_etag(etag)
+        # ETag / Last-Modified sudah dipasang oleh page_cache dari versi konten
+        # (tanpa hashing body), dan 304 dijawab sebelum view dijalankan.
+        # Halaman pengunjung yang login berisi data pribadi, jadi jangan
+        # disimpan di cache bersama (proxy / CDN).
+        if current_user.is_authenticated:
+            response.headers['Cache-Control'] = 'private, max-age=0, must-revalidate'
+        else:
+            response.headers['Cache-Control'] = 'public, max-age=120'
 
         # Hapus Vary: Cookie agar bisa cache
         response.headers.pop("Vary", None)
-
-        # Validasi If-None-Match dari browser (304)
-        if request.headers.get("If-None-Match") == etag:
-            response.status_code = 304
-            response.set_data(b"")
     return response
-
-
-if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True)
     
\ No newline at end of file
@@ -0,0 +1,247 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import tempfile
+
+import click
+from flask import request, send_from_directory, url_for
+from flask.cli import AppGroup
+from markupsafe import Markup
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # .br tidak dibuat, cukup .gz
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:  # varian WebP / resize dilewati
+    Image = None
+
+# Nama file hasil build memuat hash isinya, jadi boleh di-cache selamanya
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+FINGERPRINT_EXTENSIONS = {".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp", ".woff", ".woff2"}
+COMPRESS_EXTENSIONS = {".css", ".js", ".svg", ".ico", ".json", ".txt"}
+# Folder di static/ yang bukan aset (file upload pengguna, hasil build)
+SKIP_FOLDERS = {"uploads", "dist"}
+# Gambar header halaman: dibuat juga versi kecil (JPEG + WebP)
+HEADER_IMAGE_RE = re.compile(r"-bg\.(jpe?g|png)$", re.IGNORECASE)
+
+assets_cli = AppGroup("assets", help="Build aset statis (fingerprint, kompresi, varian gambar).")
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _sources(static_folder):
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder:
+            dirs[:] = [d for d in dirs if d not in SKIP_FOLDERS]
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in FINGERPRINT_EXTENSIONS:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, static_folder).replace(os.sep, "/"), path
+
+
+_IMAGE_VARIANTS = (
+    ("jpeg", ".jpg", {"quality": 80, "optimize": True, "progressive": True}),
+    ("webp", ".webp", {"quality": 78, "method": 6}),
+)
+
+
+def _image_variants(source, out_base, width):
+    # out_base tanpa ekstensi, mis. dist/assets/img/home-bg.<hash>.w1920
+    variants = {kind: out_base + ext for kind, ext, _ in _IMAGE_VARIANTS}
+    if all(os.path.exists(path) for path in variants.values()):
+        return variants
+
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        for kind, ext, options in _IMAGE_VARIANTS:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(out_base), suffix=".part")
+            os.close(fd)
+            image.save(temp_path, format=kind.upper(), **options)
+            os.replace(temp_path, variants[kind])
+    return variants
+
+
+def prune_dist(dist_folder, manifest, static_folder):
+    """Hapus file hasil build lama yang tidak lagi dirujuk manifest."""
+    keep = {"manifest.json"}
+    for path in list(manifest["files"].values()) + [
+        path for variants in manifest["variants"].values() for path in variants.values()
+    ]:
+        relpath = os.path.relpath(os.path.join(static_folder, path), dist_folder).replace(os.sep, "/")
+        keep.update((relpath, relpath + ".gz", relpath + ".br"))
+
+    removed = []
+    for root, _, files in os.walk(dist_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.relpath(path, dist_folder).replace(os.sep, "/") not in keep:
+                os.unlink(path)
+                removed.append(path)
+    return removed
+
+
+def build_assets(static_folder, dist="dist", image_width=1920):
+    """Salin aset ke ``static/<dist>`` dengan nama berisi hash dan tulis manifest.
+
+    File yang sudah ada (nama sama = isi sama) tidak ditulis ulang, jadi build
+    ulang hanya membaca dan meng-hash file sumber.
+    """
+    dist_folder = os.path.join(static_folder, dist)
+    manifest = {"files": {}, "variants": {}}
+
+    for relpath, source in _sources(static_folder):
+        root, ext = os.path.splitext(relpath)
+        digest = _file_digest(source)
+        hashed = f"{root}.{digest}{ext}"
+        target = os.path.join(dist_folder, hashed)
+
+        if not os.path.exists(target):
+            with open(source, "rb") as f:
+                data = f.read()
+            _write_atomic(target, data)
+            if ext.lower() in COMPRESS_EXTENSIONS:
+                _write_atomic(target + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    _write_atomic(target + ".br", brotli.compress(data, quality=11))
+        manifest["files"][relpath] = f"{dist}/{hashed}"
+
+        if Image is not None and HEADER_IMAGE_RE.search(relpath):
+            out_base = os.path.join(dist_folder, f"{root}.{digest}.w{image_width}")
+            variants = _image_variants(source, out_base, image_width)
+            manifest["variants"][relpath] = {
+                kind: os.path.relpath(path, static_folder).replace(os.sep, "/")
+                for kind, path in variants.items()
+            }
+
+    _write_atomic(os.path.join(dist_folder, "manifest.json"), json.dumps(manifest, indent=1).encode("utf-8"))
+    return manifest
+
+
+class AssetPipeline:
+    """Fingerprint aset statis dan sajikan dengan cache satu tahun.
+
+    ``url_for('static', filename='css/styles.css')`` otomatis menjadi
+    ``/static/dist/css/styles.<hash>.css``. File di ``dist/`` dikirim dengan
+    ``Cache-Control: public, max-age=31536000, immutable`` dan, kalau browser
+    mendukung, langsung dari sibling ``.br`` / ``.gz`` yang sudah dikompres.
+    File yang tidak ada di manifest tetap dilayani seperti biasa.
+    """
+
+    def __init__(self, app=None):
+        self.manifest = {"files": {}, "variants": {}}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.static_folder = app.static_folder
+        self.dist = app.config.get("ASSETS_DIST", "dist")
+        self.image_width = app.config.get("ASSETS_IMAGE_WIDTH", 1920)
+
+        if app.config.get("ASSETS_BUILD_ON_START", False):
+            self.build()
+        else:
+            self.load()
+
+        app.url_defaults(self._url_defaults)
+        app.view_functions["static"] = self.send_static
+        app.add_template_global(self.header_background)
+        app.extensions["assets"] = self
+        app.cli.add_command(assets_cli)
+
+    def build(self):
+        self.manifest = build_assets(self.static_folder, self.dist, self.image_width)
+        return self.manifest
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.static_folder, self.dist, "manifest.json")
+
+    def load(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def _url_defaults(self, endpoint, values):
+        if endpoint == "static" and "filename" in values:
+            filename = values["filename"].lstrip("/")
+            values["filename"] = self.manifest["files"].get(filename, filename)
+
+    def header_background(self, filename):
+        """Deklarasi CSS background-image: JPEG kecil, WebP untuk browser yang mendukung."""
+        variants = self.manifest["variants"].get(filename)
+        if not variants:
+            return Markup(f"background-image: url('{url_for('static', filename=filename)}');")
+        jpeg = url_for("static", filename=variants["jpeg"])
+        webp = url_for("static", filename=variants["webp"])
+        return Markup(
+            f"background-image: url('{jpeg}');"
+            f" background-image: image-set(url('{webp}') type('image/webp'), url('{jpeg}') type('image/jpeg'));"
+        )
+
+    def send_static(self, filename):
+        if not filename.startswith(self.dist + "/"):
+            return self.app.send_static_file(filename)
+
+        path = safe_join(self.static_folder, filename)
+        encoding = None
+        if path is not None:
+            for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+                if request.accept_encodings[candidate] and os.path.exists(path + suffix):
+                    encoding = candidate
+                    break
+
+        if encoding is None:
+            response = send_from_directory(self.static_folder, filename, max_age=ASSET_MAX_AGE)
+        else:
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            response = send_from_directory(
+                self.static_folder, filename + (".br" if encoding == "br" else ".gz"),
+                mimetype=mimetype, max_age=ASSET_MAX_AGE,
+            )
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+@assets_cli.command("build")
+def build_command():
+    """Fingerprint aset di static/ ke static/dist dan tulis manifest.json."""
+    from flask import current_app
+
+    assets = current_app.extensions["assets"]
+    manifest = assets.build()
+    # Jalankan saat deploy, setelah worker lama berhenti memakai nama file lama
+    removed = prune_dist(os.path.join(assets.static_folder, assets.dist), manifest, assets.static_folder)
+    click.echo(f"{len(manifest['files'])} aset, {len(manifest['variants'])} gambar header diproses; "
+               f"{len(removed)} file lama dihapus.")
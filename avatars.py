@@ -0,0 +1,58 @@
+import hashlib
+import os
+import re
+import tempfile
+from urllib.parse import urlencode
+
+# Hash avatar = MD5 email (format yang dipakai Gravatar)
+AVATAR_HASH_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# Avatar lokal: pola 5x5 yang simetris kiri-kanan
+_GRID = 5
+_CELL = 20
+
+
+def email_hash(email):
+    return hashlib.md5((email or "").strip().lower().encode("utf-8")).hexdigest()
+
+
+def gravatar_url(avatar_hash, size=100, default="retro", rating="g"):
+    query = urlencode({"s": size, "d": default, "r": rating})
+    return f"https://www.gravatar.com/avatar/{avatar_hash}?{query}"
+
+
+def identicon_svg(avatar_hash):
+    """SVG identicon deterministik dari hash avatar (tanpa request ke luar)."""
+    digest = bytes.fromhex(avatar_hash)
+    hue = int.from_bytes(digest[:2], "big") % 360
+    color = f"hsl({hue}, 55%, 50%)"
+
+    size = _GRID * _CELL
+    rects = []
+    bit = 0
+    for x in range((_GRID + 1) // 2):
+        for y in range(_GRID):
+            on = digest[2 + bit // 8] >> (bit % 8) & 1
+            bit += 1
+            if not on:
+                continue
+            for column in {x, _GRID - 1 - x}:
+                rects.append(f'<rect x="{column * _CELL}" y="{y * _CELL}" width="{_CELL}" height="{_CELL}"/>')
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" width="{size}" height="{size}">'
+        f'<rect width="{size}" height="{size}" fill="#f0f0f0"/>'
+        f'<g fill="{color}">{"".join(rects)}</g></svg>'
+    )
+
+
+def cached_identicon(directory, avatar_hash):
+    """Path file SVG untuk hash ini; dibuat sekali lalu dibaca dari disk."""
+    path = os.path.join(directory, avatar_hash[:2], f"{avatar_hash}.svg")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            out.write(identicon_svg(avatar_hash))
+        os.replace(temp_path, path)
+    return path
@@ -0,0 +1,253 @@
+"""Benchmark route utama lewat Flask test client.
+
+Contoh:
+
+    python -m benchmarks.bench_routes --users 50 --posts 500 --comments 5000 \
+        --requests 300 --output bench-results.json
+
+Database, cache, antrean email, dan folder upload dibuat di folder sementara;
+SMTP dan FTP memakai server lokal dari ``tests/servers.py``. Hasilnya (JSON)
+bisa di-diff antar versi untuk melihat regresi sebelum deploy.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+# Persentil yang dilaporkan untuk latensi
+PERCENTILES = (0.50, 0.95, 0.99)
+
+BENCH_PASSWORD = "benchmark-password"
+
+
+def summarize(durations_ms, elapsed, statuses, metrics):
+    from observability import percentile
+
+    durations = sorted(durations_ms)
+    summary = {
+        "requests": len(durations),
+        "errors": sum(count for status, count in statuses.items() if status >= 500),
+        "throughput_rps": round(len(durations) / elapsed, 1) if elapsed else None,
+        "latency_ms": {f"p{int(p * 100)}": round(percentile(durations, p), 3) for p in PERCENTILES},
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+    summary["latency_ms"]["mean"] = round(sum(durations) / len(durations), 3)
+    summary["latency_ms"]["max"] = round(durations[-1], 3)
+    if metrics:
+        # Dari RequestMetrics: jumlah query SQL yang benar-benar dijalankan view
+        summary["sql_queries"] = metrics["sql_queries"]
+        summary["sql_ms_avg"] = metrics["sql_ms_avg"]
+        summary["page_cache"] = metrics["cache"]
+    return summary
+
+
+def seed(app, users, posts, comments, rng):
+    """Isi database dengan data palsu; user id 1 adalah admin."""
+    from tables import BlogPost, Comment, User, db
+
+    with app.app_context():
+        db.create_all()
+        # Semua user memakai hash yang sama supaya seeding tidak lama, tapi
+        # login tetap membayar biaya verifikasi penuh
+        pwhash = app.extensions["password_hasher"].hash(BENCH_PASSWORD)
+        db.session.add_all([
+            User(email=f"user{i}@example.com", password=pwhash, name=f"User {i}", is_verified=True)
+            for i in range(1, users + 1)
+        ])
+        db.session.commit()
+
+        paragraph = "<p>" + " ".join(f"kata{n}" for n in range(120)) + "</p>"
+        for start in range(0, posts, 200):
+            db.session.add_all([
+                BlogPost(
+                    title=f"Post {i}", subtitle=f"Subjudul {i}", date="July 04, 2025",
+                    body=paragraph * 5 + '<pre><code class="language-python">print("halo")</code></pre>',
+                    img_url="https://example.com/header.jpg", author_id=1,
+                )
+                for i in range(start, min(start + 200, posts))
+            ])
+            db.session.commit()
+
+        db.session.bulk_insert_mappings(Comment, [
+            {"text": f"<p>Komentar {i}</p>", "author_id": rng.randint(1, users), "post_id": rng.randint(1, posts)}
+            for i in range(comments)
+        ])
+        db.session.commit()
+
+
+def _login_as(client, user_id):
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+
+
+def scenarios(users, posts, rng):
+    from page_cache import BYPASS_ENVIRON_KEY
+
+    def home(client, i):
+        return client.get("/")
+
+    def home_uncached(client, i):
+        return client.get("/", environ_base={BYPASS_ENVIRON_KEY: True})
+
+    def show_post(client, i):
+        return client.get(f"/post/{rng.randint(1, posts)}")
+
+    def login(client, i):
+        user = rng.randint(1, users)
+        return client.post("/login", data={"email": f"user{user}@example.com", "password": BENCH_PASSWORD})
+
+    def recommend_blog(client, i):
+        _login_as(client, rng.randint(2, max(users, 2)))
+        # Sebagian besar file baru, sebagian isi yang sama (dedup)
+        content = b"%PDF-1.4 benchmark " + (str(i).encode() if i % 4 else b"sama") * 2048
+        return client.post("/recommend", data={
+            "title": f"Rekomendasi {i}", "notes": "Catatan",
+            "file": (io.BytesIO(content), f"rekomendasi-{i}.pdf"),
+        }, content_type="multipart/form-data")
+
+    return {
+        "home": home,
+        "home_uncached": home_uncached,
+        "show_post": show_post,
+        "login": login,
+        "recommend_blog": recommend_blog,
+    }
+
+
+def run_benchmarks(app, users=20, posts=100, comments=1000, requests=100, seed_value=1, routes=None):
+    """Jalankan semua skenario terhadap app dari ``create_app()``."""
+    from app import cache
+
+    rng = random.Random(seed_value)
+    app.config["WTF_CSRF_ENABLED"] = False
+    seed(app, users, posts, comments, rng)
+    request_metrics = app.extensions["request_metrics"]
+
+    results = {}
+    for name, scenario in scenarios(users, posts, rng).items():
+        if routes and name not in routes:
+            continue
+        client = app.test_client()
+        with app.app_context():
+            cache.clear()
+        request_metrics.reset()
+
+        durations, statuses = [], Counter()
+        started = time.perf_counter()
+        for i in range(requests):
+            before = time.perf_counter()
+            response = scenario(client, i)
+            durations.append((time.perf_counter() - before) * 1000)
+            statuses[response.status_code] += 1
+            response.close()
+        elapsed = time.perf_counter() - started
+
+        endpoint_stats = request_metrics.snapshot()["endpoints"]
+        endpoint = "blog.home" if name.startswith("home") else f"blog.{name}"
+        results[name] = summarize(durations, elapsed, statuses, endpoint_stats.get(endpoint))
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--comments", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200, help="Jumlah request per skenario")
+    parser.add_argument("--routes", nargs="*", help="Hanya jalankan skenario ini")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench-results.json")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from tests.servers import FTPStandIn, SMTPStandIn
+
+    workdir = tempfile.mkdtemp(prefix="blog-bench-")
+    ftp_root = os.path.join(workdir, "ftp")
+    os.makedirs(ftp_root)
+
+    # pyftpdlib memasang log ke stderr sendiri kalau loggernya belum punya handler
+    ftp_logger = logging.getLogger("pyftpdlib")
+    ftp_logger.addHandler(logging.NullHandler())
+    ftp_logger.setLevel(logging.WARNING)
+    with SMTPStandIn() as smtp, FTPStandIn(ftp_root) as ftp:
+        # Profil "benchmark" (config.py) membaca sisa konfigurasi dari env
+        # saat app dibuat: tanpa git backup, rate limit login, atau CSRF
+        os.environ.update({
+            "BLOG_CONFIG": "benchmark",
+            "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "bench.db"),
+            "CACHE_SQLITE_PATH": os.path.join(workdir, "cache.sqlite"),
+            "MAIL_SERVER": "127.0.0.1",
+            "MAIL_PORT": str(smtp.port),
+            "MAIL_USE_TLS": "false",
+            "MAIL_USERNAME": "bench@example.com",
+            "MAIL_QUEUE_PATH": os.path.join(workdir, "mail_queue.sqlite"),
+            "FTP_HOST": "127.0.0.1",
+            "FTP_PORT": str(ftp.port),
+            "FTP_USER": ftp.user,
+            "FTP_PASSWORD": ftp.password,
+            "LOG_FILE": os.path.join(workdir, "app.log"),
+            "AVATAR_FOLDER": os.path.join(workdir, "avatars"),
+            "BLOB_FOLDER": os.path.join(workdir, "blobs"),
+        })
+        from app import create_app
+
+        app = create_app("benchmark")
+        results = run_benchmarks(app, args.users, args.posts, args.comments, args.requests, args.seed, args.routes)
+
+        # Efek samping recommend_blog: tunggu upload FTP lalu kirim antrean email
+        app.extensions["ftp_pool"].close()
+        started = time.perf_counter()
+        while app.extensions["mail_queue"].send_batch():
+            pass
+        side_effects = {
+            "mail_flush_seconds": round(time.perf_counter() - started, 3),
+            "emails_delivered": len(smtp.messages),
+            "smtp_connections": smtp.connections,
+            "ftp_logins": ftp.logins,
+            "ftp_files": len(os.listdir(ftp_root)),
+        }
+
+    report = {
+        "meta": {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "params": vars(args),
+        },
+        "routes": results,
+        "side_effects": side_effects,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print(f"{'route':<16}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'sql p95':>10}")
+    for name, summary in results.items():
+        latency = summary["latency_ms"]
+        sql = summary.get("sql_queries", {}).get("p95", "-")
+        print(f"{name:<16}{summary['throughput_rps']:>10}{latency['p50']:>10}{latency['p95']:>10}"
+              f"{latency['p99']:>10}{sql:>10}")
+    print(f"Hasil ditulis ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+import zlib
+
+from flask import g, request
+
+try:
+    import brotli
+except ImportError:  # hanya gzip
+    brotli = None
+
+COMPRESS_MIMETYPES = {
+    "text/html", "text/css", "text/plain", "text/xml", "text/javascript", "application/javascript",
+    "application/json", "application/xml", "application/rss+xml", "application/feed+json", "image/svg+xml",
+}
+
+
+def choose_encoding(accept_encodings):
+    """Pilih "br" atau "gzip" sesuai Accept-Encoding; br menang kalau bobotnya sama."""
+    candidates = [("gzip", accept_encodings["gzip"])]
+    if brotli is not None:
+        candidates.insert(0, ("br", accept_encodings["br"]))
+    encoding, quality = max(candidates, key=lambda item: item[1])
+    return encoding if quality > 0 else None
+
+
+class Compressor:
+    """Kompresi gzip / brotli untuk respons teks (HTML, feed, JSON, CSS, JS).
+
+    Respons di bawah ``COMPRESS_MIN_SIZE`` byte, respons yang sudah punya
+    ``Content-Encoding`` (aset di ``static/dist`` yang sudah dikompres), dan
+    file yang dikirim langsung (``send_file``) tidak disentuh. Respons streaming
+    dikompres per potongan dengan flush, jadi byte pertama tetap cepat sampai.
+
+    View yang menaruh ``g.compress_key`` (page cache, feed) mendapat hasil
+    kompresi yang disimpan di cache, jadi halaman yang sama tidak dikompres
+    ulang di setiap request.
+    """
+
+    def __init__(self, app=None, cache=None):
+        self.cache = cache
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+        app.config.setdefault("COMPRESS_GZIP_LEVEL", 6)
+        # Kualitas 11 terlalu lambat untuk dikompres per request
+        app.config.setdefault("COMPRESS_BR_LEVEL", 5)
+        self.min_size = app.config["COMPRESS_MIN_SIZE"]
+        self.gzip_level = app.config["COMPRESS_GZIP_LEVEL"]
+        self.br_level = app.config["COMPRESS_BR_LEVEL"]
+        app.after_request(self.after_request)
+        app.extensions["compression"] = self
+
+    def compress(self, data, encoding):
+        if encoding == "br":
+            return brotli.compress(data, quality=self.br_level)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def _compressed(self, data, encoding):
+        key = g.get("compress_key")
+        if key is None or self.cache is None:
+            return self.compress(data, encoding)
+        # Digest isi ikut di key: kalau body di page cache kedaluwarsa lebih dulu
+        # dan halaman dirender ulang, hasil kompresi lama tidak terpakai lagi
+        key = f"{key}:{encoding}:{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+        body = self.cache.get(key)
+        if body is None:
+            body = self.compress(data, encoding)
+            self.cache.set(key, body, timeout=g.get("compress_timeout"))
+        return body
+
+    def _stream(self, chunks, encoding):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.br_level)
+            for chunk in chunks:
+                data = compressor.process(chunk) + compressor.flush()
+                if data:
+                    yield data
+            yield compressor.finish()
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+            for chunk in chunks:
+                data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                if data:
+                    yield data
+            yield compressor.flush()
+
+    def after_request(self, response):
+        if (response.mimetype not in COMPRESS_MIMETYPES or response.status_code != 200
+                or request.method == "HEAD" or response.direct_passthrough
+                or "Content-Encoding" in response.headers):
+            return response
+        response.vary.add("Accept-Encoding")
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(response.iter_encoded(), encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(self._compressed(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+
+        # Byte-nya berbeda per encoding, jadi ETag kuat (feed) diberi akhiran
+        # encoding dan tetap kuat. View membandingkan If-None-Match dengan ETag
+        # aslinya, jadi pencocokan ulang dilakukan di sini
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f"{etag}-{encoding}")
+            response.make_conditional(request)
+        return response
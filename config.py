@@ -0,0 +1,133 @@
+import os
+
+from dotenv import load_dotenv
+
+# Muat environment variables dari file .env sebelum profil dibaca
+load_dotenv()
+
+
+def _flag(name, default):
+    return os.getenv(name, default).lower() in ["true", "1", "t"]
+
+
+class Config:
+    """Konfigurasi dasar; semua nilai bisa di-override lewat env / .env."""
+
+    SECRET_KEY = os.getenv("SECRET_KEY", "8BYkEfBA6O6donzWlSihBXox7C0sKR6b")
+    SERVER_NAME = os.getenv("SERVER_NAME", "127.0.0.1:5000")
+    # Jumlah reverse proxy di depan app (nginx di deploy/ = 1); X-Forwarded-For
+    # dari proxy ini dipakai sebagai remote_addr. Set 0 kalau gunicorn langsung
+    # menerima koneksi dari internet, supaya header itu tidak bisa dipalsukan.
+    TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", 1))
+
+    # Logging JSON per baris, file berotasi
+    LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+
+    # Cache bersama: satu file SQLite di instance/ dipakai semua worker gunicorn.
+    # Set CACHE_TYPE=SimpleCache untuk cache di memori per proses.
+    CACHE_TYPE = os.getenv("CACHE_TYPE", "sqlite_cache.SQLiteCache")
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH")  # default: instance/cache.sqlite
+    CACHE_DEFAULT_TIMEOUT = 60
+    CACHE_THRESHOLD = 5000
+    CACHE_SQLITE_MAX_BYTES = 64 * 1024 * 1024
+
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 500))
+    STREAM_TEMPLATES = _flag("STREAM_TEMPLATES", "false")
+
+    # Flask-Mail; tanpa MAIL_PORT dipakai port submission standar
+    MAIL_SERVER = os.getenv("MAIL_SERVER")
+    MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
+    MAIL_USE_TLS = _flag("MAIL_USE_TLS", "true")
+    MAIL_USERNAME = os.getenv("MAIL_USERNAME")
+    MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
+    MAIL_DEFAULT_SENDER = ("Sahal's Blog", os.getenv("MAIL_USERNAME"))
+    # "thread": dikirim dari worker web, "none": `flask mail-queue work` terpisah
+    MAIL_QUEUE_WORKER = os.getenv("MAIL_QUEUE_WORKER", "thread")
+    MAIL_QUEUE_PATH = os.getenv("MAIL_QUEUE_PATH")  # default: instance/mail_queue.sqlite
+    MAIL_ATTACHMENT_MAX_SIZE = int(os.getenv("MAIL_ATTACHMENT_MAX_SIZE", 5 * 1024 * 1024))
+
+    CKEDITOR_PKG_TYPE = "standard-all"
+    CKEDITOR_ENABLE_CODESNIPPET = True
+
+    # Aset dibangun sekali saat deploy (`flask assets build`); worker hanya
+    # membaca static/dist/manifest.json
+    ASSETS_BUILD_ON_START = _flag("ASSETS_BUILD_ON_START", "false")
+    ASSETS_IMAGE_WIDTH = int(os.getenv("ASSETS_IMAGE_WIDTH", 1920))
+
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///blog.db")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # "local": identicon SVG dari /avatar/<hash>.svg, "gravatar": gravatar.com
+    AVATAR_PROVIDER = os.getenv("AVATAR_PROVIDER", "local")
+    AVATAR_FOLDER = os.getenv("AVATAR_FOLDER")  # default: instance/avatars
+    BLOB_FOLDER = os.getenv("BLOB_FOLDER")  # default: static/uploads/blobs
+    UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", 25 * 1024 * 1024))
+
+    GIT_BACKUP_ENABLED = _flag("GIT_BACKUP_ENABLED", "true")
+    GIT_BACKUP_DEBOUNCE = float(os.getenv("GIT_BACKUP_DEBOUNCE", 10))
+    GIT_BACKUP_RETRIES = int(os.getenv("GIT_BACKUP_RETRIES", 5))
+
+    # FTP dipakai hanya kalau FTP_HOST di-set
+    FTP_HOST = os.getenv("FTP_HOST")
+    FTP_PORT = int(os.getenv("FTP_PORT", 21))
+    FTP_USER = os.getenv("FTP_USER")
+    FTP_PASSWORD = os.getenv("FTP_PASSWORD")
+    FTP_POOL_SIZE = int(os.getenv("FTP_POOL_SIZE", 2))
+    FTP_BASE_URL = os.getenv("FTP_BASE_URL")
+
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256")
+    PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", 16))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    LOGIN_LIMIT_PER_IP = int(os.getenv("LOGIN_LIMIT_PER_IP", 20))
+    LOGIN_LIMIT_PER_ACCOUNT = int(os.getenv("LOGIN_LIMIT_PER_ACCOUNT", 5))
+    LOGIN_LIMIT_PERIOD = int(os.getenv("LOGIN_LIMIT_PERIOD", 300))
+
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))
+
+    # Post terkait (related.py): "thread" = diperbarui di latar belakang,
+    # "none" = langsung di request admin yang menyimpan post
+    RELATED_POSTS = int(os.getenv("RELATED_POSTS", 5))
+    RELATED_WORKER = os.getenv("RELATED_WORKER", "thread")
+    RELATED_REBUILD_AFTER = int(os.getenv("RELATED_REBUILD_AFTER", 100))
+
+    # View / komentar per post dijumlahkan di memori tiap worker dan ditulis
+    # ke post_stats setiap sekian detik (0 = hanya saat flush() dipanggil)
+    STATS_FLUSH_INTERVAL = float(os.getenv("STATS_FLUSH_INTERVAL", 10))
+
+
+class ProductionConfig(Config):
+    pass
+
+
+class TestConfig(Config):
+    """Tanpa SMTP, FTP, git, atau thread latar belakang; cache di memori."""
+
+    TESTING = True
+    CACHE_TYPE = "SimpleCache"
+    MAIL_SUPPRESS_SEND = True
+    MAIL_QUEUE_WORKER = "none"
+    GIT_BACKUP_ENABLED = False
+    FTP_HOST = None
+    PASSWORD_HASH_WORKERS = 0
+    RELATED_WORKER = "none"
+    STATS_FLUSH_INTERVAL = 0
+
+
+class BenchmarkConfig(Config):
+    """Seperti produksi (cache SQLite, process pool password) minus efek samping."""
+
+    WTF_CSRF_ENABLED = False
+    MAIL_QUEUE_WORKER = "none"
+    GIT_BACKUP_ENABLED = False
+    # Benchmark login tidak boleh terkena rate limit
+    LOGIN_LIMIT_PER_IP = 10 ** 9
+    LOGIN_LIMIT_PER_ACCOUNT = 10 ** 9
+
+
+PROFILES = {
+    "production": ProductionConfig,
+    "test": TestConfig,
+    "benchmark": BenchmarkConfig,
+}
@@ -0,0 +1,266 @@
+import json
+from datetime import date
+
+import click
+from flask import current_app, url_for
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, text
+
+from avatars import email_hash
+from engagement import UPSERT_SQL as STATS_UPSERT_SQL
+from post_render import render_post, sanitize_html
+from search import strip_html
+from tables import db
+
+# Jumlah baris per SELECT saat ekspor dan per transaksi saat impor
+BATCH_SIZE = 500
+
+# Kolom yang diekspor per jenis; kolom turunan (body_html, avatar_hash, ...)
+# dihitung ulang saat impor
+EXPORT_COLUMNS = {
+    "user": ("users", ("id", "email", "password", "name", "is_verified")),
+    "post": ("blog_posts", ("id", "author_id", "title", "subtitle", "date", "body", "img_url")),
+    "comment": ("comments", ("id", "author_id", "post_id", "text")),
+}
+
+# Urutan ekspor dan urutan tulis saat impor
+KINDS = tuple(EXPORT_COLUMNS)
+
+content_cli = AppGroup("content", help="Ekspor / impor user, post, dan komentar sebagai JSON Lines.")
+
+
+def export_records(conn, batch_size=BATCH_SIZE):
+    """Semua user, lalu post, lalu komentar sebagai dict ``{"type": ..., ...}``.
+
+    Dibaca per batch dengan keyset (``id > terakhir``), jadi memori tetap
+    sama berapa pun jumlah barisnya.
+    """
+    for kind, (table, columns) in EXPORT_COLUMNS.items():
+        query = text(f"SELECT {', '.join(columns)} FROM {table} WHERE id > :last ORDER BY id LIMIT :limit")
+        last = 0
+        while True:
+            rows = conn.execute(query, {"last": last, "limit": batch_size}).all()
+            for row in rows:
+                yield {"type": kind, **row._asdict()}
+            if len(rows) < batch_size:
+                break
+            last = rows[-1].id
+
+
+class ContentImporter:
+    """Impor record dari ``export_records`` ke database ini.
+
+    Record dikumpulkan per jenis sampai ``batch_size``, lalu ditulis dalam satu
+    transaksi dengan executemany. User dicocokkan lewat email dan post lewat
+    judul (keduanya unik): yang sudah ada dipakai ulang (``on_conflict="skip"``)
+    atau diperbarui (``"update"``, hanya post). Id lama dipetakan ke id baru,
+    jadi urutan file harus user -> post -> komentar seperti hasil ekspor.
+    Komentar hanya diimpor untuk post yang baru dibuat, sehingga impor ulang
+    file yang sama tidak menggandakan komentar.
+    """
+
+    def __init__(self, conn, on_conflict="skip", batch_size=BATCH_SIZE):
+        self.conn = conn
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size
+        # Id lama -> id di database ini; yang disimpan hanya pasangan int
+        self.user_ids = {}
+        self.post_ids = {}
+        self.new_posts = set()
+        self.updated_posts = set()
+        self.counts = {"user": 0, "post": 0, "comment": 0, "skipped": 0}
+        self._pending = {kind: [] for kind in KINDS}
+
+    def add(self, record):
+        kind = record.get("type")
+        if kind not in self._pending:
+            raise click.ClickException(f"Jenis record tidak dikenal: {kind!r}")
+        batch = self._pending[kind]
+        batch.append(record)
+        if len(batch) >= self.batch_size:
+            self._flush(kind)
+
+    def finish(self):
+        for kind in self._pending:
+            self._flush(kind)
+        return self.counts
+
+    def _flush(self, kind):
+        records, self._pending[kind] = self._pending[kind], []
+        if records:
+            # Jenis sebelumnya ditulis dulu supaya id-nya sudah terpetakan
+            for earlier in KINDS[:KINDS.index(kind)]:
+                self._flush(earlier)
+            with self.conn.begin():
+                getattr(self, f"_import_{kind}s")(records)
+
+    def _existing(self, table, column, values):
+        query = text(f"SELECT id, {column} FROM {table} WHERE {column} IN :values").bindparams(
+            bindparam("values", expanding=True))
+        return {row[1]: row.id for row in self.conn.execute(query, {"values": list(values)})}
+
+    def _import_users(self, records):
+        # Tanpa email tidak ada yang bisa dicocokkan; post / komentarnya tanpa author
+        matchable = [record for record in records if record.get("email")]
+        by_email = {}
+        for record in matchable:
+            by_email.setdefault(record["email"], []).append(record["id"])
+        existing = self._existing("users", "email", by_email) if by_email else {}
+        new = [record for record in matchable
+               if record["email"] not in existing and by_email[record["email"]][0] == record["id"]]
+        if new:
+            self.conn.execute(
+                text("INSERT INTO users (email, password, name, is_verified, avatar_hash)"
+                     " VALUES (:email, :password, :name, :is_verified, :avatar_hash)"),
+                [{"email": record["email"], "password": record["password"], "name": record["name"],
+                  "is_verified": bool(record.get("is_verified")), "avatar_hash": email_hash(record["email"])}
+                 for record in new],
+            )
+            existing = self._existing("users", "email", by_email)
+        for email, old_ids in by_email.items():
+            for old_id in old_ids:
+                self.user_ids[old_id] = existing[email]
+        self.counts["user"] += len(new)
+        self.counts["skipped"] += len(records) - len(new)
+
+    def _post_row(self, record):
+        rendered = render_post(record["body"])
+        return {
+            "author_id": self.user_ids.get(record.get("author_id")),
+            "title": record["title"],
+            "subtitle": record["subtitle"],
+            "date": record.get("date") or date.today().strftime("%B %d, %Y"),
+            "body": record["body"],
+            "img_url": record["img_url"],
+            "body_html": rendered.html,
+            "excerpt": rendered.excerpt,
+            "word_count": rendered.word_count,
+            "reading_minutes": rendered.reading_minutes,
+        }
+
+    def _import_posts(self, records):
+        by_title = {}
+        for record in records:
+            by_title.setdefault(record["title"], []).append(record)
+        existing = self._existing("blog_posts", "title", by_title)
+        new = [group[0] for title, group in by_title.items() if title not in existing]
+        updates = [group[-1] for title, group in by_title.items() if title in existing]
+
+        if new:
+            self.conn.execute(
+                text("INSERT INTO blog_posts (author_id, title, subtitle, date, body, img_url, body_html,"
+                     " excerpt, word_count, reading_minutes) VALUES (:author_id, :title, :subtitle, :date,"
+                     " :body, :img_url, :body_html, :excerpt, :word_count, :reading_minutes)"),
+                [self._post_row(record) for record in new],
+            )
+        if updates and self.on_conflict == "update":
+            self.conn.execute(
+                text("UPDATE blog_posts SET author_id = :author_id, subtitle = :subtitle, date = :date,"
+                     " body = :body, img_url = :img_url, body_html = :body_html, excerpt = :excerpt,"
+                     " word_count = :word_count, reading_minutes = :reading_minutes WHERE title = :title"),
+                [self._post_row(record) for record in updates],
+            )
+
+        post_ids = self._existing("blog_posts", "title", by_title)
+        for title, group in by_title.items():
+            for record in group:
+                self.post_ids[record["id"]] = post_ids[title]
+        self.new_posts.update(post_ids[record["title"]] for record in new)
+        if self.on_conflict == "update":
+            self.updated_posts.update(existing.values())
+            self.counts["post"] += len(new) + len(updates)
+            self.counts["skipped"] += len(records) - len(new) - len(updates)
+        else:
+            self.counts["post"] += len(new)
+            self.counts["skipped"] += len(records) - len(new)
+
+        # Indeks pencarian ikut dalam transaksi yang sama (lihat search.index_post)
+        indexed = new + (updates if self.on_conflict == "update" else [])
+        if indexed:
+            self.conn.execute(
+                text("DELETE FROM posts_fts WHERE rowid = :id"),
+                [{"id": post_ids[record["title"]]} for record in indexed],
+            )
+            self.conn.execute(
+                text("INSERT INTO posts_fts (rowid, title, subtitle, body) VALUES (:id, :title, :subtitle, :body)"),
+                [{"id": post_ids[record["title"]], "title": record["title"], "subtitle": record["subtitle"],
+                  "body": strip_html(record["body"])} for record in indexed],
+            )
+
+    def _import_comments(self, records):
+        rows = [
+            {"text": sanitize_html(record["text"]), "author_id": self.user_ids.get(record.get("author_id")),
+             "post_id": self.post_ids[record["post_id"]]}
+            for record in records
+            if self.post_ids.get(record.get("post_id")) in self.new_posts
+        ]
+        if rows:
+            self.conn.execute(
+                text("INSERT INTO comments (text, author_id, post_id) VALUES (:text, :author_id, :post_id)"),
+                rows,
+            )
+            per_post = {}
+            for row in rows:
+                per_post[row["post_id"]] = per_post.get(row["post_id"], 0) + 1
+            self.conn.execute(
+                text(STATS_UPSERT_SQL),
+                [{"post_id": post_id, "views": 0, "comments": count} for post_id, count in per_post.items()],
+            )
+        self.counts["comment"] += len(rows)
+        self.counts["skipped"] += len(records) - len(rows)
+
+
+def import_records(records, on_conflict="skip", batch_size=BATCH_SIZE):
+    """Impor record (iterable, boleh generator) lalu segarkan indeks turunan."""
+    with db.engine.connect() as conn:
+        importer = ContentImporter(conn, on_conflict=on_conflict, batch_size=batch_size)
+        for record in records:
+            importer.add(record)
+        counts = importer.finish()
+
+    changed = importer.new_posts | importer.updated_posts
+    if changed:
+        # Satu rebuild untuk semua post baru, bukan pembaruan per post; post lama
+        # yang daftar terkaitnya berubah dibuang dari page cache oleh on_change
+        current_app.extensions["related_index"].rebuild()
+        # Tanpa request, url_for membuat URL absolut; page cache memakai path
+        current_app.extensions["page_cache"].invalidate(
+            url_for("blog.home", _external=False), url_for("blog.popular", _external=False),
+            *(url_for("blog.show_post", post_id=post_id, _external=False) for post_id in importer.updated_posts))
+        current_app.extensions["feeds"].invalidate()
+    return counts
+
+
+def _read_lines(stream):
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise click.ClickException(f"Baris {number} bukan JSON yang valid: {e}")
+
+
+@content_cli.command("export")
+@click.option("-o", "--output", type=click.File("w", encoding="utf-8"), default="-",
+              help="File tujuan (default: stdout).")
+def export_command(output):
+    """Tulis semua user, post, dan komentar sebagai JSON Lines (berisi hash password)."""
+    count = 0
+    with db.engine.connect() as conn:
+        for record in export_records(conn):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    click.echo(f"{count} record diekspor.", err=True)
+
+
+@content_cli.command("import")
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option("--on-conflict", type=click.Choice(["skip", "update"]), default="skip",
+              help="Post dengan judul yang sudah ada: dilewati atau diperbarui.")
+@click.option("--batch-size", type=int, default=BATCH_SIZE, show_default=True,
+              help="Jumlah baris per transaksi.")
+def import_command(source, on_conflict, batch_size):
+    """Impor JSON Lines hasil `flask content export`."""
+    counts = import_records(_read_lines(source), on_conflict=on_conflict, batch_size=batch_size)
+    click.echo(f"{counts['user']} user, {counts['post']} post, {counts['comment']} komentar diimpor; "
+               f"{counts['skipped']} dilewati.")
@@ -0,0 +1,161 @@
+import logging
+import sqlite3
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
+
+from avatars import email_hash
+from post_render import render_post, sanitize_html
+from related import rebuild as rebuild_related
+from search import CREATE_INDEX_SQL, strip_html
+from tables import PostStat, PostTerms, RelatedPost, db
+
+# Pragma yang dipasang di setiap koneksi SQLite baru. WAL membuat pembaca
+# tidak menunggu penulis, busy_timeout membuat penulis menunggu giliran
+# (bukan langsung "database is locked").
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,  # milidetik
+    "cache_size": -20000,  # negatif = KiB, jadi ~20 MB per koneksi
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+@event.listens_for(Engine, "connect")
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+# ====================== MIGRASI ====================== #
+# Setiap migrasi harus idempotent (aman dijalankan ulang pada database yang
+# sebagian sudah diubah), karena database lama dibuat dengan db.create_all()
+# tanpa catatan versi.
+
+def _has_column(conn, table, column):
+    return any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+
+def add_column(conn, table, column, ddl):
+    if not _has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _base_schema(conn):
+    db.metadata.create_all(bind=conn)
+
+
+def _users_is_verified(conn):
+    add_column(conn, "users", "is_verified", "BOOLEAN NOT NULL DEFAULT 0")
+
+
+def _foreign_key_indexes(conn):
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_comments_post_id ON comments (post_id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_comments_author_id ON comments (author_id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_blog_posts_author_id ON blog_posts (author_id)"))
+
+
+def _search_index(conn):
+    conn.execute(text(CREATE_INDEX_SQL))
+    conn.execute(text("DELETE FROM posts_fts"))
+    posts = conn.execute(text("SELECT id, title, subtitle, body FROM blog_posts")).all()
+    for post in posts:
+        conn.execute(
+            text("INSERT INTO posts_fts (rowid, title, subtitle, body) VALUES (:id, :title, :subtitle, :body)"),
+            {"id": post.id, "title": post.title, "subtitle": post.subtitle, "body": strip_html(post.body)},
+        )
+
+
+def _users_avatar_hash(conn):
+    add_column(conn, "users", "avatar_hash", "VARCHAR(32)")
+    users = conn.execute(text("SELECT id, email FROM users WHERE avatar_hash IS NULL")).all()
+    for user in users:
+        conn.execute(
+            text("UPDATE users SET avatar_hash = :hash WHERE id = :id"),
+            {"hash": email_hash(user.email), "id": user.id},
+        )
+
+
+def _rendered_posts(conn):
+    for column, ddl in (("body_html", "TEXT"), ("excerpt", "TEXT"), ("word_count", "INTEGER"),
+                        ("reading_minutes", "INTEGER")):
+        add_column(conn, "blog_posts", column, ddl)
+    for post in conn.execute(text("SELECT id, body FROM blog_posts")).all():
+        rendered = render_post(post.body)
+        conn.execute(
+            text("UPDATE blog_posts SET body_html = :html, excerpt = :excerpt, word_count = :words,"
+                 " reading_minutes = :minutes WHERE id = :id"),
+            {"html": rendered.html, "excerpt": rendered.excerpt, "words": rendered.word_count,
+             "minutes": rendered.reading_minutes, "id": post.id},
+        )
+    # Komentar lama juga dibersihkan, sama seperti komentar baru
+    for comment in conn.execute(text("SELECT id, text FROM comments")).all():
+        conn.execute(text("UPDATE comments SET text = :text WHERE id = :id"),
+                     {"text": sanitize_html(comment.text), "id": comment.id})
+
+
+def _related_posts(conn):
+    RelatedPost.__table__.create(bind=conn, checkfirst=True)
+    PostTerms.__table__.create(bind=conn, checkfirst=True)
+    rebuild_related(conn)
+
+
+def _post_stats(conn):
+    PostStat.__table__.create(bind=conn, checkfirst=True)
+    # Jumlah komentar yang sudah ada; view mulai dihitung dari nol
+    conn.execute(text(
+        "INSERT OR IGNORE INTO post_stats (post_id, views, comments)"
+        " SELECT blog_posts.id, 0, (SELECT COUNT(*) FROM comments WHERE comments.post_id = blog_posts.id)"
+        " FROM blog_posts"
+    ))
+
+
+MIGRATIONS = [
+    (1, "base schema", _base_schema),
+    (2, "users.is_verified", _users_is_verified),
+    (3, "foreign key indexes", _foreign_key_indexes),
+    (4, "full-text search index", _search_index),
+    (5, "users.avatar_hash", _users_avatar_hash),
+    (6, "pre-rendered post bodies", _rendered_posts),
+    (7, "related posts index", _related_posts),
+    (8, "post view / comment counters", _post_stats),
+]
+
+
+def migrate():
+    """Jalankan migrasi yang belum tercatat di tabel schema_migrations.
+
+    Dipanggil saat aplikasi start (butuh app context). Di SQLite semua migrasi
+    berjalan dalam satu transaksi ``BEGIN IMMEDIATE``, jadi kalau beberapa
+    worker gunicorn start bersamaan hanya satu yang benar-benar mengubah schema.
+    """
+    applied_now = []
+    with db.engine.connect() as conn, conn.begin():
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version INTEGER PRIMARY KEY,"
+            " name VARCHAR(250) NOT NULL,"
+            " applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+        for version, name, migration in MIGRATIONS:
+            if version in applied:
+                continue
+            migration(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                {"version": version, "name": name},
+            )
+            applied_now.append(version)
+
+    if applied_now:
+        logging.info(f"Migrasi database dijalankan: {applied_now}")
+    return applied_now
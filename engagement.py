@@ -0,0 +1,124 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy import text
+
+from tables import db
+
+# Satu statement untuk semua post yang berubah sejak flush terakhir (executemany).
+# Post yang sudah dihapus dilewati supaya barisnya tidak muncul lagi.
+UPSERT_SQL = """
+INSERT INTO post_stats (post_id, views, comments)
+SELECT :post_id, :views, :comments WHERE EXISTS (SELECT 1 FROM blog_posts WHERE id = :post_id)
+ON CONFLICT (post_id) DO UPDATE SET
+    views = views + excluded.views,
+    comments = comments + excluded.comments
+"""
+
+
+def counts_views(f):
+    """Hitung satu view untuk ``post_id`` setiap GET yang dijawab 200 / 304,
+    termasuk yang dilayani page cache (pasang di atas ``cached_page``)."""
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        response = make_response(f(*args, **kwargs))
+        if request.method == "GET" and response.status_code in (200, 304):
+            current_app.extensions["engagement"].record(kwargs["post_id"], views=1)
+        return response
+
+    return decorated_function
+
+
+class EngagementCounters:
+    """Penghitung view dan komentar per post, dijumlahkan di memori proses.
+
+    Request hanya menambah angka di dict (tanpa query, tanpa lock SQLite);
+    thread flusher menulis semua selisih ke tabel post_stats dalam satu
+    transaksi setiap ``STATS_FLUSH_INTERVAL`` detik, dan sekali lagi saat
+    proses berhenti. ``STATS_FLUSH_INTERVAL=0`` mematikan thread, jadi
+    angka baru tertulis saat ``flush()`` dipanggil. ``on_flush`` dipanggil
+    (di dalam app context) setiap kali ada angka yang tertulis.
+    """
+
+    def __init__(self, app=None, on_flush=None):
+        self.on_flush = on_flush
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pid = None
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get("STATS_FLUSH_INTERVAL", 10)
+        app.extensions["engagement"] = self
+
+    def record(self, post_id, views=0, comments=0):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Angka yang ter-copy dari proses induk saat fork milik induk
+                self._pid = os.getpid()
+                self._pending = {}
+                self._thread = None
+            counts = self._pending.setdefault(post_id, [0, 0])
+            counts[0] += views
+            counts[1] += comments
+            if self.interval and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="engagement-flush", daemon=True)
+                self._thread.start()
+                atexit.register(self._flush_at_exit)
+
+    def clear(self):
+        # Buang angka yang belum ditulis (dipakai test)
+        with self._lock:
+            self._pending = {}
+
+    def pending(self):
+        with self._lock:
+            return {post_id: tuple(counts) for post_id, counts in self._pending.items()}
+
+    def flush(self):
+        """Tulis semua angka yang tertunda; mengembalikan jumlah post yang ditulis."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        rows = [{"post_id": post_id, "views": views, "comments": comments}
+                for post_id, (views, comments) in pending.items()]
+        with self.app.app_context():
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(text(UPSERT_SQL), rows)
+            except Exception:
+                # Kembalikan ke buffer supaya dicoba lagi di flush berikutnya
+                with self._lock:
+                    for post_id, (views, comments) in pending.items():
+                        counts = self._pending.setdefault(post_id, [0, 0])
+                        counts[0] += views
+                        counts[1] += comments
+                raise
+            if self.on_flush is not None:
+                self.on_flush()
+        return len(rows)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("Gagal menulis penghitung post_stats")
+
+    def _flush_at_exit(self):
+        if self._pid == os.getpid():
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("Gagal menulis penghitung post_stats saat berhenti")
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func
+
+from page_cache import BYPASS_ENVIRON_KEY, site_version
+from queries import feed_page, most_read
+from tables import BlogPost, Comment, RelatedPost, User, db
+
+MANIFEST_NAME = ".export-manifest.json"
+
+# Halaman tanpa data dari DB; cukup dirender ulang kalau template / aset berubah
+STATIC_PAGES = ("/about", "/contact")
+
+# Test client milik proses worker export (diisi oleh _init_worker)
+_client = None
+
+
+def output_file(path):
+    # "/" -> index.html, "/post/3" -> post/3/index.html (cocok dengan
+    # `try_files $uri $uri/index.html @flask` di nginx). Hanya halaman pertama
+    # versi anonim yang diekspor; request dengan query string, selain GET/HEAD,
+    # atau dengan cookie sesi harus diteruskan ke Flask, lihat
+    # deploy/nginx-static-export.conf
+    return os.path.join(path.strip("/"), "index.html") if path != "/" else "index.html"
+
+
+def _digest(*parts):
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def page_sources(app):
+    """Hash sumber setiap halaman, dihitung dari DB tanpa merender apa pun."""
+    version = site_version(app)
+    sources = {path: _digest(version, path) for path in STATIC_PAGES}
+
+    feed = feed_page()
+    sources["/"] = _digest(version, [tuple(row) for row in feed.posts], feed.older)
+    sources["/popular"] = _digest(version, [tuple(row) for row in most_read()])
+
+    comments = dict(
+        (post_id, (count, last_id))
+        for post_id, count, last_id in db.session.query(
+            Comment.post_id, func.count(Comment.id), func.max(Comment.id)
+        ).group_by(Comment.post_id)
+    )
+    # Blok "Baca juga": berubah kalau daftar terkait atau judul post terkaitnya berubah
+    related = {}
+    for row in db.session.query(
+        RelatedPost.post_id, BlogPost.id, BlogPost.title, BlogPost.subtitle, BlogPost.reading_minutes,
+    ).join(BlogPost, RelatedPost.related_id == BlogPost.id).order_by(RelatedPost.post_id, RelatedPost.rank):
+        related.setdefault(row[0], []).append(tuple(row[1:]))
+    posts = db.session.query(
+        BlogPost.id, BlogPost.title, BlogPost.subtitle, BlogPost.date, BlogPost.img_url,
+        BlogPost.body_html, BlogPost.reading_minutes, User.name,
+    ).outerjoin(User, BlogPost.author_id == User.id)
+    for row in posts:
+        sources[f"/post/{row.id}"] = _digest(version, tuple(row), comments.get(row.id), related.get(row.id))
+    return sources
+
+
+def _init_worker(app):
+    global _client
+    # Koneksi database milik proses induk tidak boleh dipakai setelah fork
+    with app.app_context():
+        db.engine.dispose(close=False)
+    _client = app.test_client()
+
+
+def render_page(path):
+    # Dirender sebagai pengunjung anonim, persis seperti yang dilihat pembaca,
+    # tapi tidak dari page cache (bisa saja lebih tua dari isi DB)
+    response = _client.get(path, environ_base={BYPASS_ENVIRON_KEY: True})
+    return path, response.status_code, response.get_data()
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    with os.fdopen(fd, "wb") as out:
+        out.write(data)
+    os.replace(temp_path, path)
+
+
+def _render_all(app, paths, workers):
+    if workers and "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(app,)) as pool:
+            yield from pool.map(render_page, paths, chunksize=8)
+    else:
+        global _client
+        _client = app.test_client()
+        for path in paths:
+            yield render_page(path)
+
+
+def export_site(app, output, workers=None, force=False):
+    """Render halaman publik ke ``output``; hanya halaman yang sumbernya berubah.
+
+    Manifest (``.export-manifest.json``) menyimpan hash sumber dan hash hasil
+    render setiap halaman. Halaman yang post-nya sudah dihapus ikut dihapus.
+    """
+    manifest_path = os.path.join(output, MANIFEST_NAME)
+    previous = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)["pages"]
+
+    sources = page_sources(app)
+    stale = [path for path, source in sources.items() if previous.get(path, {}).get("source") != source]
+    pages = {path: entry for path, entry in previous.items() if path in sources}
+    result = {"rendered": [], "unchanged": [], "removed": [], "failed": []}
+
+    for path, status, body in _render_all(app, stale, os.cpu_count() if workers is None else workers):
+        if status != 200:
+            result["failed"].append(path)
+            pages.pop(path, None)
+            continue
+        digest = hashlib.sha256(body).hexdigest()
+        target = os.path.join(output, output_file(path))
+        if pages.get(path, {}).get("output") == digest and os.path.exists(target):
+            result["unchanged"].append(path)
+        else:
+            _write_atomic(target, body)
+            result["rendered"].append(path)
+        pages[path] = {"source": sources[path], "output": digest, "file": output_file(path)}
+
+    for path in set(previous) - set(sources):
+        target = os.path.join(output, previous[path]["file"])
+        if os.path.exists(target):
+            os.unlink(target)
+        result["removed"].append(path)
+
+    _write_atomic(manifest_path, json.dumps({"pages": pages}, indent=1, sort_keys=True).encode("utf-8"))
+    return result
+
+
+@click.command("export")
+@click.option("--output", "-o", default="site", show_default=True, help="Folder tujuan HTML statis.")
+@click.option("--workers", "-w", type=int, default=None, help="Jumlah proses render (0 = tanpa pool).")
+@click.option("--force", is_flag=True, help="Render ulang semua halaman.")
+@with_appcontext
+def export_command(output, workers, force):
+    """Ekspor halaman publik (beranda, post, about, contact) menjadi HTML statis."""
+    result = export_site(current_app._get_current_object(), output, workers, force)
+    click.echo(
+        f"{len(result['rendered'])} halaman ditulis, {len(result['unchanged'])} tidak berubah,"
+        f" {len(result['removed'])} dihapus, {len(result['failed'])} gagal."
+    )
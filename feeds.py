@@ -0,0 +1,156 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from flask import g, make_response, request, url_for
+
+from tables import BlogPost, User, db
+
+# Jumlah postingan terbaru di dalam feed
+FEED_SIZE = 20
+
+FEED_TYPES = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "json": "application/feed+json; charset=utf-8",
+}
+
+
+def parse_post_date(value):
+    # Kolom date berisi string seperti "July 04, 2025" (date.strftime("%B %d, %Y"))
+    try:
+        return datetime.strptime(value.strip(), "%B %d, %Y").replace(tzinfo=timezone.utc)
+    except (AttributeError, ValueError):
+        return None
+
+
+def feed_posts(limit=FEED_SIZE):
+    return (
+        db.session.query(
+            BlogPost.id, BlogPost.title, BlogPost.subtitle, BlogPost.date,
+            BlogPost.excerpt, BlogPost.body_html, User.name.label("author_name"),
+        )
+        .outerjoin(User, BlogPost.author_id == User.id)
+        .order_by(BlogPost.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def build_rss(posts, title, home_url, feed_url):
+    items = []
+    for post in posts:
+        url = url_for("blog.show_post", post_id=post.id, _external=True)
+        published = parse_post_date(post.date)
+        items.append(
+            "<item>"
+            f"<title>{escape(post.title)}</title>"
+            f"<link>{escape(url)}</link>"
+            f'<guid isPermaLink="true">{escape(url)}</guid>'
+            + (f"<pubDate>{format_datetime(published)}</pubDate>" if published else "")
+            + (f"<dc:creator>{escape(post.author_name)}</dc:creator>" if post.author_name else "")
+            + f"<description>{escape(post.excerpt or post.subtitle)}</description>"
+            f"<content:encoded>{escape(post.body_html or '')}</content:encoded>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"'
+        ' xmlns:content="http://purl.org/rss/1.0/modules/content/"'
+        ' xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        "<channel>"
+        f"<title>{escape(title)}</title>"
+        f"<link>{escape(home_url)}</link>"
+        f"<description>{escape(title)}</description>"
+        f'<atom:link href="{escape(feed_url)}" rel="self" type="application/rss+xml"/>'
+        + "".join(items)
+        + "</channel></rss>"
+    ).encode("utf-8")
+
+
+def build_json_feed(posts, title, home_url, feed_url):
+    items = []
+    for post in posts:
+        url = url_for("blog.show_post", post_id=post.id, _external=True)
+        item = {
+            "id": url,
+            "url": url,
+            "title": post.title,
+            "summary": post.excerpt or post.subtitle,
+            "content_html": post.body_html or "",
+        }
+        published = parse_post_date(post.date)
+        if published:
+            item["date_published"] = published.isoformat()
+        if post.author_name:
+            item["authors"] = [{"name": post.author_name}]
+        items.append(item)
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": title,
+        "home_page_url": home_url,
+        "feed_url": feed_url,
+        "items": items,
+    }
+    return json.dumps(feed, ensure_ascii=False).encode("utf-8")
+
+
+class FeedCache:
+    """RSS dan JSON Feed yang dirender sekali lalu disimpan sebagai bytes.
+
+    Isi feed hanya berubah saat postingan ditambah, diedit, atau dihapus, jadi
+    bytes + ETag kuat (SHA-256 isinya) disimpan di cache tanpa batas waktu dan
+    baru dibuang oleh ``invalidate()``. Polling dengan ``If-None-Match`` yang
+    cocok dijawab 304 tanpa query DB.
+    """
+
+    def __init__(self, cache, title, max_age=300):
+        self.cache = cache
+        self.title = title
+        self.max_age = max_age
+
+    def init_app(self, app):
+        app.extensions["feeds"] = self
+
+    def _generation(self):
+        generation = self.cache.get("feed-gen")
+        if generation is None:
+            generation = time.time()
+            self.cache.set("feed-gen", generation, timeout=0)
+        return generation
+
+    def _key(self, kind):
+        # URL di dalam feed absolut, jadi dipisah per host
+        return f"feed:{kind}:{request.host}:{self._generation()!r}"
+
+    def _build(self, kind):
+        posts = feed_posts()
+        home_url = url_for("blog.home", _external=True)
+        if kind == "rss":
+            body = build_rss(posts, self.title, home_url, url_for("blog.rss_feed", _external=True))
+        else:
+            body = build_json_feed(posts, self.title, home_url, url_for("blog.json_feed", _external=True))
+        return {"body": body, "etag": hashlib.sha256(body).hexdigest(), "built_at": datetime.now(timezone.utc)}
+
+    def response(self, kind):
+        key = self._key(kind)
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = self._build(kind)
+            self.cache.set(key, entry, timeout=0)
+        g.compress_key = key
+        g.compress_timeout = 0
+
+        response = make_response(entry["body"])
+        response.headers["Content-Type"] = FEED_TYPES[kind]
+        response.set_etag(entry["etag"])
+        response.last_modified = entry["built_at"]
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response.make_conditional(request)
+
+    def invalidate(self):
+        # Generation baru membuat feed semua host basi sekaligus
+        self.cache.set("feed-gen", time.time(), timeout=0)
@@ -1,18 +1,122 @@
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
 from git import Repo
 
 git_path = "."
 
 
-def git_push(commit_message):
-    try:
-        repo = Repo(git_path)
-        origin = repo.remote(name="origin")
-        origin.pull()
-        print("pulled")
+def commit_and_push(commit_message, path=git_path):
+    repo = Repo(path)
+    origin = repo.remote(name="origin")
+    origin.pull()
 
-        repo.git.add(all=True)
+    repo.git.add(all=True)
+    # Jangan buat commit kosong kalau tidak ada perubahan sejak backup terakhir
+    if repo.is_dirty(untracked_files=True):
         repo.index.commit(commit_message)
-        origin.push()
-        print("successfully pushed")
-    except:
-        print("Some error occured while pushing the code")
\ No newline at end of file
+    origin.push().raise_if_error()
+
+
+def backup_message(messages):
+    # Gabungkan beberapa perubahan beruntun menjadi satu pesan commit
+    unique = list(dict.fromkeys(messages))
+    summary = "; ".join(unique)
+    if len(messages) > 1:
+        summary = f"{summary} ({len(messages)} changes)"
+    return f"{summary} -- autobackup"
+
+
+class BackupWorker:
+    """Backup git di thread latar belakang, bukan di dalam request.
+
+    Setiap ``enqueue()`` hanya menaruh pesan ke antrean. Thread worker menunggu
+    sampai tidak ada perubahan baru selama ``debounce`` detik (paling lama
+    ``max_delay`` detik), lalu membuat satu commit + push untuk semua perubahan
+    tersebut. Push yang gagal diulang dengan backoff eksponensial, dan hasil
+    terakhir bisa dibaca lewat ``status``.
+    """
+
+    def __init__(self, path=git_path, debounce=10.0, max_delay=60.0, max_retries=5, backoff=2.0):
+        self.path = path
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.status = {
+            "pending": 0,
+            "last_success": None,
+            "last_failure": None,
+            "last_error": None,
+            "last_message": None,
+        }
+
+    def enqueue(self, message):
+        self._ensure_started()
+        self._queue.put(message)
+        self.status["pending"] = self._queue.unfinished_tasks
+
+    def flush(self, timeout=None):
+        # Tunggu sampai semua perubahan di antrean selesai diproses
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout
+            )
+
+    def _ensure_started(self):
+        # Thread tidak ikut ter-copy saat gunicorn fork, jadi cek juga pid-nya
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="git-backup", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        messages = [self._queue.get()]
+        started = time.monotonic()
+        while True:
+            remaining = min(self.debounce, started + self.max_delay - time.monotonic())
+            if remaining <= 0:
+                return messages
+            try:
+                messages.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                return messages
+
+    def _run(self):
+        while True:
+            messages = self._collect()
+            try:
+                self._backup(backup_message(messages))
+            finally:
+                for _ in messages:
+                    self._queue.task_done()
+                self.status["pending"] = self._queue.unfinished_tasks
+
+    def _backup(self, commit_message):
+        for attempt in range(self.max_retries):
+            try:
+                commit_and_push(commit_message, self.path)
+            except Exception as e:
+                self.status["last_failure"] = datetime.now(timezone.utc).isoformat()
+                self.status["last_error"] = str(e)
+                logging.warning(f"Git backup gagal (percobaan {attempt + 1}/{self.max_retries}): {e}")
+                if attempt + 1 < self.max_retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+            else:
+                self.status["last_success"] = datetime.now(timezone.utc).isoformat()
+                self.status["last_error"] = None
+                self.status["last_message"] = commit_message
+                logging.info(f"Git backup berhasil: {commit_message}")
+                return True
+        logging.error(f"Git backup menyerah setelah {self.max_retries} percobaan: {commit_message}")
+        return False
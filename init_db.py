@@ -1,6 +1,10 @@
-from app import app
+# Schema dibuat / dimigrasi otomatis oleh create_app() (lihat database.migrate);
+# script ini hanya mengisi data contoh.
+from app import create_app
 from tables import db, BlogPost, User
 
+app = create_app()
+
 with app.app_context():
     # Tambah user dummy (cek dulu biar tidak dobel)
     if not User.query.first():
@@ -0,0 +1,282 @@
+import base64
+import json
+import logging
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import click
+from flask.cli import AppGroup
+from flask_mail import Message
+
+# Status baris di tabel mail_outbox
+QUEUED, SENDING, SENT, DEAD = "queued", "sending", "sent", "dead"
+
+# Baris "sending" yang lebih tua dari ini dianggap milik proses yang mati
+CLAIM_TIMEOUT = 600
+
+# Email terkirim disimpan sebentar untuk audit, lalu dihapus
+SENT_RETENTION = 7 * 24 * 3600
+
+mail_cli = AppGroup("mail-queue", help="Kelola antrean email keluar.")
+
+
+def serialize_message(msg, attachments=()):
+    # Lampiran dari file di disk disimpan sebagai path (dibaca saat dikirim),
+    # lampiran yang sudah berupa bytes disimpan sebagai base64
+    payload = {
+        "subject": msg.subject,
+        "recipients": list(msg.recipients),
+        "body": msg.body,
+        "html": msg.html,
+        "sender": msg.sender,
+        "cc": list(msg.cc),
+        "bcc": list(msg.bcc),
+        "reply_to": msg.reply_to,
+        "attachments": [
+            {"filename": filename, "content_type": content_type, "path": path}
+            for filename, content_type, path in attachments
+        ],
+    }
+    for attachment in msg.attachments:
+        payload["attachments"].append({
+            "filename": attachment.filename,
+            "content_type": attachment.content_type,
+            "data": base64.b64encode(attachment.data).decode("ascii"),
+        })
+    return json.dumps(payload)
+
+
+def deserialize_message(data):
+    payload = json.loads(data)
+    sender = payload["sender"]
+    msg = Message(
+        subject=payload["subject"],
+        recipients=payload["recipients"],
+        body=payload["body"],
+        html=payload["html"],
+        sender=tuple(sender) if isinstance(sender, list) else sender,
+        cc=payload["cc"],
+        bcc=payload["bcc"],
+        reply_to=payload["reply_to"],
+    )
+    for attachment in payload["attachments"]:
+        if "path" in attachment:
+            with open(attachment["path"], "rb") as f:
+                content = f.read()
+        else:
+            content = base64.b64decode(attachment["data"])
+        msg.attach(attachment["filename"], attachment["content_type"], content)
+    return msg
+
+
+class MailQueue:
+    """Antrean email keluar yang persisten di file SQLite.
+
+    Request cukup memanggil ``enqueue()`` (satu INSERT lokal), lalu thread
+    pengirim mengambil email per batch dan mengirim semuanya lewat satu koneksi
+    SMTP (``mail.connect()``). Pengiriman yang gagal dijadwalkan ulang dengan
+    backoff eksponensial; setelah ``MAIL_QUEUE_MAX_ATTEMPTS`` kali statusnya
+    menjadi ``dead`` dan tidak dicoba lagi.
+    """
+
+    def __init__(self, app=None, mail=None):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app, mail)
+
+    def init_app(self, app, mail):
+        self.app = app
+        self.mail = mail
+        self.path = app.config.get("MAIL_QUEUE_PATH") or os.path.join(app.instance_path, "mail_queue.sqlite")
+        self.batch_size = app.config.get("MAIL_QUEUE_BATCH_SIZE", 20)
+        self.max_attempts = app.config.get("MAIL_QUEUE_MAX_ATTEMPTS", 5)
+        self.backoff = app.config.get("MAIL_QUEUE_BACKOFF", 30)
+        self.poll_interval = app.config.get("MAIL_QUEUE_POLL_INTERVAL", 5)
+        # "thread": kirim dari thread di dalam worker web,
+        # "none": dikirim proses terpisah (`flask mail-queue work`)
+        self.worker = app.config.get("MAIL_QUEUE_WORKER", "thread")
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._write() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS mail_outbox ("
+                " id INTEGER PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL,"
+                " claimed_at REAL,"
+                " last_error TEXT,"
+                " created_at REAL NOT NULL,"
+                " sent_at REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS mail_outbox_due ON mail_outbox (status, next_attempt_at)"
+            )
+
+        app.extensions["mail_queue"] = self
+        app.cli.add_command(mail_cli)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def enqueue(self, msg, attachments=()):
+        now = time.time()
+        with self._write() as conn:
+            cursor = conn.execute(
+                "INSERT INTO mail_outbox (payload, status, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+                (serialize_message(msg, attachments), QUEUED, now, now),
+            )
+        if self.worker == "thread":
+            self._ensure_started()
+            self._wakeup.set()
+        return cursor.lastrowid
+
+    def counts(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM mail_outbox GROUP BY status")
+        return dict(rows.fetchall())
+
+    def _claim(self):
+        now = time.time()
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE mail_outbox SET status = ? WHERE status = ? AND claimed_at < ?",
+                (QUEUED, SENDING, now - CLAIM_TIMEOUT),
+            )
+            rows = conn.execute(
+                "SELECT id, payload, attempts FROM mail_outbox"
+                " WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (QUEUED, now, self.batch_size),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE mail_outbox SET status = ?, claimed_at = ? WHERE id = ?",
+                [(SENDING, now, row[0]) for row in rows],
+            )
+        return rows
+
+    def _mark_sent(self, mail_id):
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE mail_outbox SET status = ?, sent_at = ?, last_error = NULL WHERE id = ?",
+                (SENT, time.time(), mail_id),
+            )
+
+    def _mark_failed(self, mail_id, attempts, error):
+        attempts += 1
+        status = DEAD if attempts >= self.max_attempts else QUEUED
+        next_attempt_at = time.time() + self.backoff * 2 ** (attempts - 1)
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE mail_outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?"
+                " WHERE id = ?",
+                (status, attempts, next_attempt_at, str(error), mail_id),
+            )
+        if status == DEAD:
+            logging.error(f"Email #{mail_id} dipindah ke dead-letter setelah {attempts} percobaan: {error}")
+        else:
+            logging.warning(f"Email #{mail_id} gagal dikirim (percobaan {attempts}): {error}")
+
+    def send_batch(self):
+        """Kirim satu batch email yang sudah jatuh tempo. Mengembalikan jumlah baris yang diproses."""
+        rows = self._claim()
+        if not rows:
+            return 0
+
+        pending = list(rows)
+        with self.app.app_context():
+            try:
+                with self.mail.connect() as conn:
+                    while pending:
+                        mail_id, payload, attempts = pending.pop(0)
+                        try:
+                            conn.send(deserialize_message(payload))
+                        except smtplib.SMTPServerDisconnected as e:
+                            self._mark_failed(mail_id, attempts, e)
+                            raise
+                        except (OSError, smtplib.SMTPException, AssertionError) as e:
+                            # Misalnya penerima ditolak atau lampiran hilang:
+                            # hanya email ini yang gagal, koneksi tetap dipakai
+                            self._mark_failed(mail_id, attempts, e)
+                        else:
+                            self._mark_sent(mail_id)
+            except (OSError, smtplib.SMTPException) as e:
+                # Koneksi SMTP gagal / terputus: sisa batch dijadwalkan ulang
+                for mail_id, _, attempts in pending:
+                    self._mark_failed(mail_id, attempts, e)
+        return len(rows)
+
+    def purge_sent(self):
+        with self._write() as conn:
+            conn.execute(
+                "DELETE FROM mail_outbox WHERE status = ? AND sent_at < ?",
+                (SENT, time.time() - SENT_RETENTION),
+            )
+
+    def run(self, stop=None):
+        while stop is None or not stop.is_set():
+            try:
+                while self.send_batch():
+                    pass
+                self.purge_sent()
+            except Exception:
+                logging.exception("Antrean email gagal diproses")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _ensure_started(self):
+        # Thread tidak ikut ter-copy saat gunicorn fork, jadi cek juga pid-nya
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self.run, name="mail-queue", daemon=True)
+                self._thread.start()
+
+
+@mail_cli.command("send")
+def send_command():
+    """Kirim semua email yang sudah jatuh tempo, lalu keluar."""
+    from flask import current_app
+
+    queue = current_app.extensions["mail_queue"]
+    total = 0
+    while True:
+        processed = queue.send_batch()
+        if not processed:
+            break
+        total += processed
+    click.echo(f"{total} email diproses, status antrean: {queue.counts()}")
+
+
+@mail_cli.command("work")
+def work_command():
+    """Jalankan pengirim email sebagai proses terpisah."""
+    from flask import current_app
+
+    current_app.extensions["mail_queue"].run()
@@ -0,0 +1,229 @@
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Jumlah durasi terakhir per endpoint yang disimpan untuk menghitung persentil
+SAMPLES_PER_ENDPOINT = 1000
+
+request_logger = logging.getLogger("blog.request")
+
+# Atribut bawaan LogRecord; sisanya (dari extra=...) ikut ditulis ke JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu objek JSON per baris: waktu, level, logger, pesan, dan field tambahan."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class BackgroundLogHandler(QueueHandler):
+    """QueueHandler yang menulis log lewat thread QueueListener.
+
+    Request hanya menaruh record ke antrean; penulisan (dan rotasi) file
+    dilakukan thread listener. Thread tidak ikut ter-copy saat gunicorn fork,
+    jadi listener dibuat ulang di setiap proses saat pertama kali dipakai.
+    """
+
+    def __init__(self, *handlers):
+        super().__init__(queue.Queue(-1))
+        self.handlers = handlers
+        self._lock = threading.Lock()
+        self._pid = None
+        self._listener = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self.queue = queue.Queue(-1)
+                self._listener = QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+                self._listener.start()
+
+    def emit(self, record):
+        self._ensure_started()
+        super().emit(record)
+
+    def flush(self):
+        # Tunggu sampai semua record di antrean sudah ditulis
+        if self._pid == os.getpid():
+            self.queue.join()
+            for handler in self.handlers:
+                handler.flush()
+
+    def close(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+            self._pid = None
+        super().close()
+
+
+def setup_logging(path, level=logging.INFO, max_bytes=10 * 1024 * 1024, backup_count=5):
+    """Pasang logging JSON-lines berotasi di root logger, ditulis di thread terpisah.
+
+    Memanggil ulang untuk file yang sama (create_app kedua) memakai handler
+    yang sudah terpasang.
+    """
+    root = logging.getLogger()
+    for handler in root.handlers:
+        if isinstance(handler, BackgroundLogHandler) and any(
+            getattr(h, "baseFilename", None) == os.path.abspath(path) for h in handler.handlers
+        ):
+            return handler
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+
+    handler = BackgroundLogHandler(file_handler)
+    root.setLevel(level)
+    root.addHandler(handler)
+    return handler
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank; sorted_values tidak boleh kosong
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.durations = deque(maxlen=SAMPLES_PER_ENDPOINT)
+        self.sql_counts = deque(maxlen=SAMPLES_PER_ENDPOINT)
+        self.sql_ms = deque(maxlen=SAMPLES_PER_ENDPOINT)
+        self.statuses = Counter()
+        self.cache = Counter()
+
+    def summary(self):
+        durations = sorted(self.durations)
+        sql_counts = sorted(self.sql_counts)
+        return {
+            "count": self.count,
+            "duration_ms": {
+                "p50": round(percentile(durations, 0.50), 2),
+                "p95": round(percentile(durations, 0.95), 2),
+                "p99": round(percentile(durations, 0.99), 2),
+                "max": round(durations[-1], 2),
+            },
+            "sql_queries": {
+                "p50": percentile(sql_counts, 0.50),
+                "p95": percentile(sql_counts, 0.95),
+                "max": sql_counts[-1],
+            },
+            "sql_ms_avg": round(sum(self.sql_ms) / len(self.sql_ms), 2),
+            "status": {str(status): count for status, count in sorted(self.statuses.items())},
+            "cache": dict(self.cache),
+        }
+
+
+class RequestMetrics:
+    """Catat durasi, status, page cache, dan query SQL setiap request.
+
+    Jumlah dan waktu query dihitung lewat event ``before/after_cursor_execute``
+    SQLAlchemy ke ``g`` milik request yang sedang berjalan. Setiap request
+    ditulis sebagai satu baris log ``blog.request`` dan diringkas per endpoint
+    (p50/p95/p99) di memori proses ini untuk ``/metrics``.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(_EndpointStats)
+        self.started_at = time.time()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        # Listener berlaku untuk semua engine; app kedua tidak memasangnya lagi
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        app.extensions["request_metrics"] = self
+
+    def _before_request(self):
+        g.request_started = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+
+    def _after_request(self, response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        duration_ms = (time.perf_counter() - started) * 1000
+        endpoint = request.endpoint or "<unmatched>"
+        fields = {
+            "method": request.method,
+            "route": request.url_rule.rule if request.url_rule else None,
+            "endpoint": endpoint,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 2),
+            "cache": g.get("page_cache"),
+            "sql_queries": g.get("sql_count", 0),
+            "sql_ms": round(g.get("sql_time", 0.0) * 1000, 2),
+        }
+        self.record(fields)
+        request_logger.info(f"{request.method} {request.path} {response.status_code}", extra=fields)
+        return response
+
+    def record(self, fields):
+        with self._lock:
+            stats = self._stats[fields["endpoint"]]
+            stats.count += 1
+            stats.durations.append(fields["duration_ms"])
+            stats.sql_counts.append(fields["sql_queries"])
+            stats.sql_ms.append(fields["sql_ms"])
+            stats.statuses[fields["status"]] += 1
+            if fields["cache"]:
+                stats.cache[fields["cache"]] += 1
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {endpoint: stats.summary() for endpoint, stats in sorted(self._stats.items())}
+        # Angka ini per proses: setiap worker gunicorn punya ringkasannya sendiri
+        return {"pid": os.getpid(), "since": self.started_at, "endpoints": endpoints}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    # Query dari thread latar belakang (tanpa app context) tidak dihitung
+    if started is not None and has_app_context() and "sql_count" in g:
+        g.sql_count += 1
+        g.sql_time += time.perf_counter() - started
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import math
+import os
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+from flask_login import current_user
+
+# Kelas pengunjung yang mendapat salinan cache masing-masing
+VIEWERS = ("anon", "user", "admin")
+
+# Request dengan key ini di environ selalu dirender ulang (dipakai `flask export`)
+BYPASS_ENVIRON_KEY = "page_cache.bypass"
+
+
+def viewer_class():
+    if not current_user.is_authenticated:
+        return "anon"
+    return "admin" if current_user.id == 1 else "user"
+
+
+def templates_version(template_folder):
+    # Waktu modifikasi template terbaru; berubah setiap kali deploy mengganti
+    # template, sehingga ETag lama ikut basi walau konten DB tidak berubah
+    latest = 0
+    for root, _, files in os.walk(template_folder):
+        for name in files:
+            latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+    return int(latest)
+
+
+def site_version(app):
+    # Bagian yang sama di semua halaman: template dan nama aset ber-hash.
+    # `flask assets build` mengganti manifest, jadi HTML lama yang merujuk
+    # aset yang sudah dihapus prune_dist ikut basi
+    assets = app.extensions.get("assets")
+    parts = [templates_version(app.template_folder), assets.manifest if assets else None]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def site_modified(app):
+    # Pasangan site_version untuk Last-Modified: template atau manifest terbaru
+    assets = app.extensions.get("assets")
+    latest = templates_version(app.template_folder)
+    if assets is not None and os.path.exists(assets.manifest_path):
+        latest = max(latest, int(os.path.getmtime(assets.manifest_path)))
+    return latest
+
+
+class PageCache:
+    """Cache HTML hasil render per path, dipisah per kelas pengunjung.
+
+    Setiap path punya "generation" di cache; invalidate(path) cukup mengganti
+    generation tersebut sehingga semua varian (termasuk query string seperti
+    ?before=) langsung basi tanpa harus menghapus key satu per satu.
+
+    Generation itu juga dipakai sebagai validator HTTP (ETag dan Last-Modified),
+    jadi request ``If-None-Match`` / ``If-Modified-Since`` yang cocok dijawab
+    304 sebelum view, query DB, atau render template dijalankan.
+    """
+
+    def __init__(self, cache, timeout=120, version="", modified=0, app=None):
+        self.cache = cache
+        self.timeout = timeout
+        self.version = version
+        self.modified = modified
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.version = site_version(app)[:16]
+        self.modified = site_modified(app)
+        app.extensions["page_cache"] = self
+
+    def generation(self, path):
+        key = f"page-gen:{path}"
+        generation = self.cache.get(key)
+        if generation is None:
+            generation = time.time()
+            self.cache.set(key, generation, timeout=0)
+        return generation
+
+    def _key(self, viewer, generation):
+        query = request.query_string.decode("latin-1")
+        return f"page:{viewer}:{request.path}:{generation!r}:{query}"
+
+    def _validators(self, viewer, generation):
+        user_id = current_user.get_id() if viewer != "anon" else ""
+        etag = f"{generation!r}-{self.version}-{viewer}{user_id}"
+        # Dibulatkan ke atas: Last-Modified tidak boleh lebih tua dari isinya
+        last_modified = datetime.fromtimestamp(math.ceil(max(generation, self.modified)), tz=timezone.utc)
+        return etag, last_modified
+
+    def _not_modified(self, etag, last_modified):
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(etag)
+        if request.if_modified_since:
+            return last_modified <= request.if_modified_since
+        return False
+
+    def cached(self, viewers=VIEWERS, timeout=None):
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                return self.serve(f, args, kwargs, viewers, timeout)
+
+            return decorated_function
+
+        return decorator
+
+    def serve(self, f, args, kwargs, viewers=VIEWERS, timeout=None):
+        """Jawab request ini dari cache (atau 304), atau jalankan view ``f``."""
+        viewer = viewer_class()
+        # POST, pengunjung di luar `viewers`, halaman yang masih
+        # membawa flash message, dan export statis selalu dirender langsung
+        if (request.method != "GET" or viewer not in viewers or "_flashes" in session
+                or request.environ.get(BYPASS_ENVIRON_KEY)):
+            g.page_cache = "bypass"
+            return f(*args, **kwargs)
+
+        generation = self.generation(request.path)
+        etag, last_modified = self._validators(viewer, generation)
+        if self._not_modified(etag, last_modified):
+            g.page_cache = "not-modified"
+            response = current_app.response_class(status=304)
+        else:
+            key = self._key(viewer, generation)
+            # Hasil kompresi halaman ini ikut disimpan (lihat compression.py)
+            g.compress_key = key
+            g.compress_timeout = timeout or self.timeout
+            body = self.cache.get(key)
+            if body is not None:
+                g.page_cache = "hit"
+                response = make_response(body)
+            else:
+                g.page_cache = "miss"
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if response.mimetype == "text/html":
+                    if response.is_streamed:
+                        response.response = self._store_when_done(
+                            response.iter_encoded(), key, timeout or self.timeout)
+                    else:
+                        self.cache.set(key, response.get_data(), timeout=timeout or self.timeout)
+
+        response.set_etag(etag, weak=True)
+        # Last-Modified hanya per detik: selama detik itu belum lewat, write
+        # berikutnya bisa mendapat Last-Modified yang sama, jadi cukup ETag
+        if time.time() >= last_modified.timestamp():
+            response.last_modified = last_modified
+        return response
+
+    def _store_when_done(self, chunks, key, timeout):
+        # Halaman streaming disimpan setelah potongan terakhir terkirim; kalau
+        # render gagal di tengah jalan, tidak ada yang disimpan
+        backend = self.cache.cache
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        backend.set(key, b"".join(parts), timeout=timeout)
+
+    def invalidate(self, *paths):
+        for path in paths:
+            self.cache.set(f"page-gen:{path}", time.time(), timeout=0)
+
+
+def cached_page(viewers=VIEWERS, timeout=None):
+    """Seperti ``PageCache.cached``, memakai PageCache milik current_app.
+
+    Untuk view di blueprint, yang didefinisikan sebelum app (dan PageCache-nya)
+    dibuat oleh create_app().
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            return current_app.extensions["page_cache"].serve(f, args, kwargs, viewers, timeout)
+
+        return decorated_function
+
+    return decorator
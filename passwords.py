@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class PasswordHasherBusy(Exception):
+    """Antrean hashing penuh atau hasilnya tidak datang tepat waktu."""
+
+
+def normalize_method(method):
+    # "pbkdf2:sha256" disimpan werkzeug sebagai "pbkdf2:sha256:<iterasi>",
+    # jadi bandingkan dengan bentuk lengkapnya
+    parts = method.split(":")
+    if parts[0] == "pbkdf2":
+        if len(parts) == 1:
+            parts.append("sha256")
+        if len(parts) == 2:
+            parts.append(str(DEFAULT_PBKDF2_ITERATIONS))
+    return ":".join(parts)
+
+
+class PasswordHasher:
+    """Hash / cek password di process pool terbatas, bukan di thread request.
+
+    pbkdf2 memakan CPU penuh selama puluhan milidetik; kalau dijalankan di
+    worker web, serbuan login membuat semua worker sibuk dan halaman biasa
+    ikut lambat. Di sini paling banyak ``PASSWORD_HASH_WORKERS`` proses yang
+    meng-hash sekaligus, dan request yang antreannya penuh langsung ditolak
+    (``PasswordHasherBusy``). ``PASSWORD_HASH_WORKERS = 0`` menjalankan hashing
+    langsung di proses ini (untuk test / development).
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = normalize_method(app.config.get("PASSWORD_HASH_METHOD", "pbkdf2:sha256"))
+        self.salt_length = app.config.get("PASSWORD_SALT_LENGTH", 16)
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS", 2)
+        # Jumlah hashing yang boleh menunggu giliran per worker web
+        self.max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING", max(self.workers, 1) * 4)
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT", 10)
+        app.extensions["password_hasher"] = self
+
+    def _ensure_started(self):
+        # Process pool tidak boleh dipakai bersama setelah gunicorn fork
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+
+        self._ensure_started()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy("Terlalu banyak hashing password yang mengantre")
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHasherBusy("Hashing password terlalu lama")
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        # Hash lama (misalnya pbkdf2:sha256 dengan salt 8 karakter) diganti
+        # dengan parameter sekarang setelah login berhasil
+        method, _, rest = pwhash.partition("$")
+        salt = rest.partition("$")[0]
+        return method != self.method or len(salt) != self.salt_length
+
+    def close(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._pid = None
+
+
+class LoginThrottle:
+    """Batas percobaan login per IP dan per akun dalam jendela waktu tetap.
+
+    Counter disimpan di cache bersama (``cache.inc`` atomik di SQLiteCache),
+    jadi batasnya berlaku untuk semua worker. Dicek sebelum password di-hash,
+    sehingga percobaan berlebih tidak memakan CPU sama sekali.
+    """
+
+    def __init__(self, cache, ip_limit=20, account_limit=5, period=300):
+        self.cache = cache
+        self.ip_limit = ip_limit
+        self.account_limit = account_limit
+        self.period = period
+
+    def init_app(self, app):
+        self.ip_limit = app.config.get("LOGIN_LIMIT_PER_IP", self.ip_limit)
+        self.account_limit = app.config.get("LOGIN_LIMIT_PER_ACCOUNT", self.account_limit)
+        self.period = app.config.get("LOGIN_LIMIT_PERIOD", self.period)
+        app.extensions["login_throttle"] = self
+
+    def _key(self, kind, value):
+        window = int(time.time() // self.period)
+        return f"login-throttle:{kind}:{value}:{window}"
+
+    def _hit(self, key):
+        # add() memasang timeout; inc() di SQLiteCache mempertahankannya.
+        # inc() hanya ada di backend, bukan di objek Cache Flask-Caching.
+        backend = self.cache.cache
+        backend.add(key, 0, timeout=self.period * 2)
+        return backend.inc(key) or 0
+
+    def allow(self, ip, account=None):
+        """Catat satu percobaan; False kalau IP atau akun sudah melewati batas."""
+        allowed = self._hit(self._key("ip", ip)) <= self.ip_limit
+        if account is not None:
+            allowed = self._hit(self._key("account", account.strip().lower())) <= self.account_limit and allowed
+        return allowed
+
+    def reset(self, account):
+        # Login berhasil: salah ketik sebelumnya tidak dihitung lagi
+        self.cache.delete(self._key("account", account.strip().lower()))
@@ -0,0 +1,227 @@
+import math
+import re
+from collections import namedtuple
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+try:
+    from pygments import highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:  # blok kode tetap tampil, hanya tanpa warna
+    highlight = None
+
+# Kecepatan baca rata-rata (kata per menit) untuk estimasi waktu baca
+WORDS_PER_MINUTE = 200
+EXCERPT_WORDS = 40
+
+RenderedPost = namedtuple("RenderedPost", ["html", "text", "excerpt", "word_count", "reading_minutes"])
+
+ALLOWED_TAGS = {
+    "a", "abbr", "b", "blockquote", "br", "caption", "cite", "code", "del", "div", "em", "figcaption",
+    "figure", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "i", "img", "ins", "kbd", "li", "mark", "ol",
+    "p", "pre", "q", "s", "small", "span", "strike", "strong", "sub", "sup", "table", "tbody", "td",
+    "tfoot", "th", "thead", "tr", "u", "ul",
+}
+VOID_TAGS = {"br", "hr", "img"}
+# Tag yang dibuang bersama seluruh isinya
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "template", "noscript", "textarea", "select"}
+ALLOWED_ATTRS = {
+    "*": {"class", "title", "style"},
+    "a": {"href", "target", "rel"},
+    "img": {"src", "alt", "width", "height"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan", "scope"},
+    "ol": {"start"},
+}
+URL_ATTRS = {"href", "src"}
+ALLOWED_SCHEMES = {"", "http", "https", "mailto"}
+# Properti CSS yang dipakai CKEditor (perataan teks, ukuran / posisi gambar)
+ALLOWED_CSS = {
+    "text-align", "float", "width", "height", "margin", "margin-left", "margin-right",
+    "border", "border-width", "border-style", "color", "background-color", "font-size",
+}
+BLOCK_TAGS = {"p", "div", "br", "li", "pre", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "blockquote", "figcaption"}
+
+
+def _clean_style(style):
+    declarations = []
+    for declaration in style.split(";"):
+        name, _, value = declaration.partition(":")
+        name, value = name.strip().lower(), value.strip()
+        if name in ALLOWED_CSS and value and not re.search(r"url\(|expression|[<>\\]", value, re.I):
+            declarations.append(f"{name}: {value}")
+    return "; ".join(declarations)
+
+
+def _clean_url(tag, url):
+    url = url.strip()
+    scheme = urlsplit(url).scheme.lower()
+    if scheme in ALLOWED_SCHEMES:
+        return url
+    if tag == "img" and url.lower().startswith("data:image/") and not url.lower().startswith("data:image/svg"):
+        return url
+    return None
+
+
+def _highlight_code(code, language):
+    if highlight is None or not language:
+        return escape(code)
+    try:
+        lexer = get_lexer_by_name(language)
+    except ClassNotFound:
+        return escape(code)
+    return highlight(code, lexer, HtmlFormatter(nowrap=True))
+
+
+class _PostRenderer(HTMLParser):
+    def __init__(self, code_highlight=True, lazy_images=True):
+        super().__init__(convert_charrefs=True)
+        self.code_highlight = code_highlight
+        self.lazy_images = lazy_images
+        self.out = []
+        self.text = []
+        self.open_tags = []
+        self._dropping = []
+        self._code = None  # [bahasa, potongan teks] selama di dalam <pre>
+
+    def _attrs(self, tag, attrs):
+        allowed = ALLOWED_ATTRS["*"] | ALLOWED_ATTRS.get(tag, set())
+        cleaned = {}
+        for name, value in attrs:
+            name = name.lower()
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRS:
+                value = _clean_url(tag, value)
+            elif name == "style":
+                value = _clean_style(value)
+            if value:
+                cleaned[name] = value
+        if tag == "a" and cleaned.get("target") == "_blank":
+            cleaned["rel"] = "noopener noreferrer"
+        if tag == "img" and self.lazy_images:
+            cleaned["loading"] = "lazy"
+            cleaned["decoding"] = "async"
+        return "".join(f' {name}="{escape(value)}"' for name, value in cleaned.items())
+
+    def handle_starttag(self, tag, attrs):
+        if self._dropping:
+            if tag in DROP_CONTENT_TAGS:
+                self._dropping.append(tag)
+            return
+        if tag in DROP_CONTENT_TAGS:
+            self._dropping.append(tag)
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+
+        if self._code is not None:
+            # Isi <pre> dikumpulkan sebagai teks polos lalu di-highlight
+            if tag == "br":
+                self._code[1].append("\n")
+            elif tag == "code" and not self._code[0]:
+                self._code[0] = _language(attrs)
+            return
+        if tag not in ALLOWED_TAGS:
+            return
+
+        if tag == "pre" and self.code_highlight:
+            self._code = [_language(attrs), []]
+            return
+        self.out.append(f"<{tag}{self._attrs(tag, attrs)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._dropping:
+            if tag == self._dropping[-1]:
+                self._dropping.pop()
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+
+        if self._code is not None:
+            if tag == "pre":
+                language, parts = self._code
+                self._code = None
+                code = "".join(parts)
+                css_class = f' class="language-{escape(language)}"' if language else ""
+                self.out.append(f'<pre class="highlight"><code{css_class}>{_highlight_code(code, language)}</code></pre>')
+            return
+        if tag not in self.open_tags:
+            return
+        # Tutup juga tag yang lupa ditutup di dalamnya
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.out.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._dropping:
+            return
+        self.text.append(data)
+        if self._code is not None:
+            self._code[1].append(data)
+        else:
+            self.out.append(escape(data, quote=False))
+
+    def close(self):
+        super().close()
+        if self._code is not None:
+            self.handle_endtag("pre")
+        while self.open_tags:
+            self.out.append(f"</{self.open_tags.pop()}>")
+
+
+def _language(attrs):
+    # CKEditor codesnippet: <code class="language-python">
+    for name, value in attrs:
+        if name == "class" and value:
+            match = re.search(r"language-([\w+#-]+)", value)
+            if match:
+                return match.group(1).lower()
+    return None
+
+
+def sanitize_html(html, code_highlight=False):
+    """HTML dari pengguna tanpa script / atribut event / URL javascript:."""
+    renderer = _PostRenderer(code_highlight=code_highlight, lazy_images=False)
+    renderer.feed(html or "")
+    renderer.close()
+    return "".join(renderer.out)
+
+
+def render_post(html):
+    """Olah body CKEditor sekali saat disimpan.
+
+    Hasilnya HTML yang sudah disanitasi, blok kode yang sudah diberi warna
+    (Pygments), gambar ``loading="lazy"``, plus teks polos, ringkasan, jumlah
+    kata, dan estimasi waktu baca.
+    """
+    renderer = _PostRenderer()
+    renderer.feed(html or "")
+    renderer.close()
+
+    text = re.sub(r"\s+", " ", "".join(renderer.text)).strip()
+    words = text.split()
+    excerpt = " ".join(words[:EXCERPT_WORDS])
+    if len(words) > EXCERPT_WORDS:
+        excerpt += "…"
+    word_count = len(re.findall(r"\w+", text))
+    reading_minutes = max(1, math.ceil(word_count / WORDS_PER_MINUTE))
+    return RenderedPost("".join(renderer.out), text, excerpt, word_count, reading_minutes)
+
+
+def pygments_css(selector=".highlight"):
+    if highlight is None:
+        return ""
+    return HtmlFormatter().get_style_defs(selector)
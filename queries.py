@@ -0,0 +1,112 @@
+from collections import namedtuple
+
+from sqlalchemy.orm import joinedload
+
+from tables import BlogPost, Comment, PostStat, RelatedPost, User, db
+
+# Jumlah komentar per halaman di bawah post
+COMMENTS_PER_PAGE = 20
+
+# Jumlah postingan per halaman di beranda
+POSTS_PER_PAGE = 10
+
+# Satu halaman feed: baris preview + cursor ke halaman lebih lama / lebih baru
+FeedPage = namedtuple("FeedPage", ["posts", "older", "newer"])
+
+
+def comments_for_post(post_id, page=1, per_page=COMMENTS_PER_PAGE):
+    # Hanya komentar milik post ini (pakai index comments.post_id),
+    # terbaru dulu, dan author ikut di-load dalam satu query (tanpa N+1)
+    return (
+        Comment.query.filter_by(post_id=post_id)
+        .options(joinedload(Comment.author))
+        .order_by(Comment.id.desc())
+        .paginate(page=page, per_page=per_page, error_out=False)
+    )
+
+
+def _feed_query():
+    # Hanya kolom yang ditampilkan di beranda (tanpa body), author di-join
+    return db.session.query(
+        BlogPost.id,
+        BlogPost.title,
+        BlogPost.subtitle,
+        BlogPost.date,
+        BlogPost.reading_minutes,
+        User.name.label("author_name"),
+    ).outerjoin(User, BlogPost.author_id == User.id)
+
+
+def _has_posts(condition):
+    return db.session.query(BlogPost.id).filter(condition).first() is not None
+
+
+def feed_page(before=None, after=None, per_page=POSTS_PER_PAGE):
+    # Keyset pagination: "before" = postingan dengan id < before (lebih lama),
+    # "after" = postingan dengan id > after (lebih baru). Tidak pakai OFFSET,
+    # jadi biaya query tetap sama di halaman mana pun.
+    query = _feed_query()
+
+    if after is not None:
+        rows = (
+            query.filter(BlogPost.id > after)
+            .order_by(BlogPost.id.asc())
+            .limit(per_page + 1)
+            .all()
+        )
+        has_newer = len(rows) > per_page
+        posts = rows[:per_page][::-1]
+        if not posts:
+            return FeedPage(posts, None, None)
+        has_older = _has_posts(BlogPost.id < posts[-1].id)
+    else:
+        if before is not None:
+            query = query.filter(BlogPost.id < before)
+        rows = query.order_by(BlogPost.id.desc()).limit(per_page + 1).all()
+        has_older = len(rows) > per_page
+        posts = rows[:per_page]
+        if not posts:
+            return FeedPage(posts, None, None)
+        has_newer = before is not None and _has_posts(BlogPost.id > posts[0].id)
+
+    return FeedPage(
+        posts,
+        posts[-1].id if has_older else None,
+        posts[0].id if has_newer else None,
+    )
+
+
+def related_posts(post_id):
+    # Satu lookup di primary key related_posts (post_id, rank); similarity
+    # sudah dihitung saat post disimpan (lihat related.py)
+    return (
+        db.session.query(BlogPost.id, BlogPost.title, BlogPost.subtitle, BlogPost.reading_minutes)
+        .join(RelatedPost, RelatedPost.related_id == BlogPost.id)
+        .filter(RelatedPost.post_id == post_id)
+        .order_by(RelatedPost.rank)
+        .all()
+    )
+
+
+def most_read(limit=POSTS_PER_PAGE):
+    # Kolom sama dengan beranda, diurutkan dari post_stats (index di views)
+    return (
+        _feed_query()
+        .join(PostStat, PostStat.post_id == BlogPost.id)
+        .filter(PostStat.views > 0)
+        .order_by(PostStat.views.desc(), BlogPost.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def post_stats(order_by="views"):
+    # Semua post untuk halaman /stats; post tanpa baris post_stats dianggap 0
+    views = db.func.coalesce(PostStat.views, 0).label("views")
+    comments = db.func.coalesce(PostStat.comments, 0).label("comments")
+    return (
+        db.session.query(BlogPost.id, BlogPost.title, BlogPost.date, views, comments)
+        .outerjoin(PostStat, PostStat.post_id == BlogPost.id)
+        .order_by((comments if order_by == "comments" else views).desc(), BlogPost.id.desc())
+        .all()
+    )
@@ -0,0 +1,339 @@
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from collections import Counter
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import text
+
+from search import strip_html
+from tables import db
+
+try:
+    import numpy as np
+except ImportError:  # tabel related_posts tidak diisi, halaman post tanpa "Baca juga"
+    np = None
+
+# Jumlah post terkait yang disimpan per post
+RELATED_K = 5
+
+# Judul dan subjudul lebih menentukan topik daripada isi
+TITLE_WEIGHT = 3
+SUBTITLE_WEIGHT = 2
+
+# Istilah yang muncul di lebih dari separuh post tidak membedakan apa-apa
+# (dan justru paling mahal dihitung), jadi dibuang
+MAX_DF = 0.5
+
+STOPWORDS = {
+    "ada", "adalah", "agar", "akan", "aku", "anda", "apa", "atau", "bagi", "bahwa", "banyak", "belum",
+    "bisa", "dalam", "dan", "dari", "dengan", "di", "dia", "hanya", "harus", "ini", "itu", "jadi",
+    "jika", "juga", "kami", "kalau", "karena", "ke", "kita", "lagi", "lebih", "mereka", "oleh", "pada",
+    "para", "saat", "saja", "sangat", "saya", "sebagai", "sudah", "tapi", "tetapi", "tidak", "untuk",
+    "yang", "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on",
+    "or", "that", "the", "this", "to", "was", "with",
+}
+
+related_cli = AppGroup("related", help="Kelola indeks post terkait (TF-IDF).")
+
+# Penanda di antrean RelatedIndex untuk rebuild penuh
+_REBUILD = object()
+
+
+def post_terms(title, subtitle, body_text):
+    """Jumlah kemunculan tiap istilah di satu post (judul / subjudul diberi bobot)."""
+    terms = Counter()
+    for weight, value in ((TITLE_WEIGHT, title), (SUBTITLE_WEIGHT, subtitle), (1, body_text)):
+        for token in re.findall(r"\w+", (value or "").lower()):
+            if len(token) > 1 and not token.isdigit() and token not in STOPWORDS:
+                terms[token] += weight
+    return terms
+
+
+class TermMatrix:
+    """Matriks TF-IDF (baris = post) dalam bentuk sparse CSR + CSC di array NumPy.
+
+    ``scores(i)`` menghitung cosine similarity post ke-i dengan semua post
+    hanya lewat posting list istilah yang dimiliki post itu, tanpa matriks
+    dense dan tanpa membandingkan pasangan yang tidak berbagi istilah.
+    """
+
+    def __init__(self, documents):
+        # documents: [(post_id, {istilah: jumlah}), ...]
+        self.ids = np.array([post_id for post_id, _ in documents], dtype=np.int64)
+        self.index = {int(post_id): i for i, post_id in enumerate(self.ids)}
+        n = len(documents)
+
+        vocab = {}
+        rows, cols, counts = [], [], []
+        for i, (_, terms) in enumerate(documents):
+            for term, count in terms.items():
+                rows.append(i)
+                cols.append(vocab.setdefault(term, len(vocab)))
+                counts.append(count)
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        counts = np.array(counts, dtype=np.float64)
+
+        df = np.bincount(cols, minlength=len(vocab))
+        keep = df[cols] <= max(2, MAX_DF * n)
+        rows, cols, counts = rows[keep], cols[keep], counts[keep]
+
+        # tf sublinear x idf (smooth), lalu tiap baris dinormalisasi (L2)
+        idf = np.log((1 + n) / (1 + df)) + 1
+        weights = (1 + np.log(counts)) * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n))
+        norms[norms == 0] = 1
+        weights /= norms[rows]
+
+        # CSR: baris sudah berurutan
+        self.row_ptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n))))
+        self.cols, self.weights = cols, weights
+        # CSC: posting list per istilah
+        order = np.argsort(cols, kind="stable")
+        self.post_rows, self.post_weights = rows[order], weights[order]
+        self.col_ptr = np.concatenate(([0], np.cumsum(np.bincount(cols, minlength=len(vocab)))))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def scores(self, i):
+        start, end = self.row_ptr[i], self.row_ptr[i + 1]
+        cols, weights = self.cols[start:end], self.weights[start:end]
+        starts = self.col_ptr[cols]
+        lengths = self.col_ptr[cols + 1] - starts
+        # Indeks semua entri posting list istilah-istilah tersebut, tanpa loop Python
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        postings = np.arange(lengths.sum()) + offsets
+        scores = np.bincount(
+            self.post_rows[postings],
+            weights=self.post_weights[postings] * np.repeat(weights, lengths),
+            minlength=len(self),
+        )
+        scores[i] = 0
+        return scores
+
+    def top(self, scores, k):
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        # Skor sama: post yang lebih baru lebih dulu
+        ranked = sorted(candidates, key=lambda j: (-scores[j], -self.ids[j]))
+        return [(int(self.ids[j]), float(scores[j])) for j in ranked]
+
+
+def _post_text(row):
+    return post_terms(row.title, row.subtitle, strip_html(row.body))
+
+
+def _load_matrix(conn):
+    documents = [
+        (row.post_id, json.loads(row.terms))
+        for row in conn.execute(text("SELECT post_id, terms FROM post_terms ORDER BY post_id"))
+    ]
+    return TermMatrix(documents)
+
+
+def _related_lists(conn):
+    lists = {}
+    for row in conn.execute(text("SELECT post_id, related_id FROM related_posts ORDER BY post_id, rank")):
+        lists.setdefault(row.post_id, []).append(row.related_id)
+    return lists
+
+
+def _write_related(conn, post_id, related):
+    conn.execute(text("DELETE FROM related_posts WHERE post_id = :id"), {"id": post_id})
+    if related:
+        conn.execute(
+            text("INSERT INTO related_posts (post_id, rank, related_id, score)"
+                 " VALUES (:post_id, :rank, :related_id, :score)"),
+            [{"post_id": post_id, "rank": rank, "related_id": related_id, "score": score}
+             for rank, (related_id, score) in enumerate(related)],
+        )
+
+
+def rebuild(conn, k=RELATED_K):
+    """Hitung ulang istilah semua post dan seluruh tabel related_posts."""
+    conn.execute(text("DELETE FROM post_terms"))
+    conn.execute(text("DELETE FROM related_posts"))
+    documents = [
+        (row.id, _post_text(row))
+        for row in conn.execute(text("SELECT id, title, subtitle, body FROM blog_posts ORDER BY id"))
+    ]
+    if documents:
+        conn.execute(
+            text("INSERT INTO post_terms (post_id, terms) VALUES (:post_id, :terms)"),
+            [{"post_id": post_id, "terms": json.dumps(terms)} for post_id, terms in documents],
+        )
+    if np is None or not documents:
+        return 0
+
+    matrix = TermMatrix(documents)
+    rows = []
+    for i, post_id in enumerate(matrix.ids):
+        for rank, (related_id, score) in enumerate(matrix.top(matrix.scores(i), k)):
+            rows.append({"post_id": int(post_id), "rank": rank, "related_id": related_id, "score": score})
+    if rows:
+        conn.execute(
+            text("INSERT INTO related_posts (post_id, rank, related_id, score)"
+                 " VALUES (:post_id, :rank, :related_id, :score)"),
+            rows,
+        )
+    return len(documents)
+
+
+def update(conn, post_id, k=RELATED_K):
+    """Perbarui indeks setelah satu post ditambah, diedit, atau dihapus.
+
+    Hanya baris yang terpengaruh yang dihitung dan ditulis ulang: post itu
+    sendiri, post yang daftarnya memuat post itu, dan post yang skornya dengan
+    post itu kini masuk k besar. Baris lain tidak dihitung ulang walaupun IDF
+    sedikit bergeser; selisih kecil itu dibereskan oleh rebuild penuh berkala.
+    Mengembalikan id post yang daftar terkaitnya berubah.
+    """
+    post = conn.execute(
+        text("SELECT id, title, subtitle, body FROM blog_posts WHERE id = :id"), {"id": post_id}
+    ).first()
+    conn.execute(text("DELETE FROM post_terms WHERE post_id = :id"), {"id": post_id})
+    if post is not None:
+        conn.execute(
+            text("INSERT INTO post_terms (post_id, terms) VALUES (:post_id, :terms)"),
+            {"post_id": post_id, "terms": json.dumps(_post_text(post))},
+        )
+    if np is None:
+        return set()
+
+    current = {}
+    for row in conn.execute(text("SELECT post_id, related_id, score FROM related_posts")):
+        current.setdefault(row.post_id, []).append((row.related_id, row.score))
+    affected = {other for other, related in current.items() if any(r == post_id for r, _ in related)}
+
+    if post is None:
+        _write_related(conn, post_id, [])
+        affected.discard(post_id)
+        matrix = _load_matrix(conn) if affected else None
+    else:
+        matrix = _load_matrix(conn)
+        scores = matrix.scores(matrix.index[post_id])
+        affected.add(post_id)
+        for j in np.flatnonzero(scores > 0):
+            other = int(matrix.ids[j])
+            related = current.get(other, [])
+            if len(related) < k or scores[j] > min(score for _, score in related):
+                affected.add(other)
+
+    for other in affected:
+        i = matrix.index.get(other)
+        _write_related(conn, other, matrix.top(matrix.scores(i), k) if i is not None else [])
+    return affected | {post_id}
+
+
+class RelatedIndex:
+    """Indeks post terkait yang diperbarui di thread latar belakang.
+
+    ``schedule(post_id)`` dipanggil setelah post ditambah / diedit / dihapus;
+    thread worker menjalankan ``update()`` untuk post-post tersebut, dan rebuild
+    penuh setiap ``RELATED_REBUILD_AFTER`` pembaruan (atau lewat
+    ``rebuild_async()`` / ``flask related rebuild``). Halaman post hanya
+    membaca tabel related_posts, tidak pernah menghitung similarity.
+    ``RELATED_WORKER=none`` menjalankan pembaruan langsung di request.
+    """
+
+    def __init__(self, app=None, on_change=None):
+        self.on_change = on_change
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._updates = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.k = app.config.get("RELATED_POSTS", RELATED_K)
+        self.worker = app.config.get("RELATED_WORKER", "thread")
+        self.rebuild_after = app.config.get("RELATED_REBUILD_AFTER", 100)
+        app.extensions["related_index"] = self
+        app.cli.add_command(related_cli)
+
+    def schedule(self, post_id):
+        if self.worker == "none":
+            self._process([post_id])
+        else:
+            self._ensure_started()
+            self._queue.put(post_id)
+
+    def rebuild_async(self):
+        self._ensure_started()
+        self._queue.put(_REBUILD)
+
+    def flush(self, timeout=None):
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def _ensure_started(self):
+        # Thread tidak ikut ter-copy saat gunicorn fork, jadi cek juga pid-nya
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="related-index", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            # Ambil semua yang sudah mengantre supaya edit beruntun diproses sekali
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._process(items)
+            except Exception:
+                logging.exception("Gagal memperbarui indeks post terkait")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _process(self, items):
+        with self.app.app_context():
+            post_ids = list(dict.fromkeys(item for item in items if item is not _REBUILD))
+            self._updates += len(post_ids)
+            if _REBUILD in items or self._updates >= self.rebuild_after:
+                self.rebuild()
+                return
+            changed = set()
+            with db.engine.begin() as conn:
+                for post_id in post_ids:
+                    changed |= update(conn, post_id, self.k)
+            if self.on_change is not None:
+                self.on_change(changed)
+
+    def rebuild(self):
+        """Rebuild penuh; ``on_change`` menerima post yang daftar terkaitnya berubah."""
+        with db.engine.begin() as conn:
+            before = _related_lists(conn)
+            count = rebuild(conn, self.k)
+            after = _related_lists(conn)
+        self._updates = 0
+        logging.info(f"Indeks post terkait dibangun ulang: {count} post")
+        if self.on_change is not None:
+            changed = {post_id for post_id in before.keys() | after.keys()
+                       if before.get(post_id) != after.get(post_id)}
+            self.on_change(changed)
+        return count
+
+
+@related_cli.command("rebuild")
+@with_appcontext
+def rebuild_command():
+    """Hitung ulang seluruh tabel related_posts."""
+    count = current_app.extensions["related_index"].rebuild()
+    click.echo(f"{count} post diindeks." if np is not None else "NumPy tidak terpasang; hanya istilah yang disimpan.")
@@ -0,0 +1,151 @@
+import re
+from collections import namedtuple
+from html import escape
+from html.parser import HTMLParser
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import DDL, event, text
+
+from tables import BlogPost, db
+
+# Jumlah hasil pencarian per halaman
+SEARCH_PER_PAGE = 10
+
+# Penanda sementara untuk highlight; diganti <mark> setelah teks di-escape
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+# Bobot BM25 per kolom: judul > subjudul > isi
+_BM25_WEIGHTS = "10.0, 5.0, 1.0"
+
+SearchResults = namedtuple("SearchResults", ["query", "results", "page", "has_next"])
+
+CREATE_INDEX_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "title, subtitle, body, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+search_cli = AppGroup("search", help="Kelola indeks pencarian postingan.")
+
+# Indeks FTS5 ikut dibuat / dihapus bersama tabel lain oleh create_all / drop_all
+event.listen(db.Model.metadata, "after_create", DDL(CREATE_INDEX_SQL))
+event.listen(db.Model.metadata, "before_drop", DDL("DROP TABLE IF EXISTS posts_fts"))
+
+
+class _TextExtractor(HTMLParser):
+    _skip_tags = {"script", "style"}
+    _block_tags = {"p", "div", "br", "li", "pre", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "blockquote"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._skip_tags:
+            self._skipping += 1
+        elif tag in self._block_tags:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self._skip_tags and self._skipping:
+            self._skipping -= 1
+        elif tag in self._block_tags:
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def strip_html(html):
+    # Teks polos dari HTML CKEditor (tanpa tag, script, dan style)
+    extractor = _TextExtractor()
+    extractor.feed(html or "")
+    extractor.close()
+    return re.sub(r"\s+", " ", "".join(extractor.parts)).strip()
+
+
+def index_post(post):
+    # Dipanggil sebelum commit supaya indeks ikut dalam transaksi yang sama
+    remove_post(post.id)
+    db.session.execute(
+        text("INSERT INTO posts_fts (rowid, title, subtitle, body) VALUES (:id, :title, :subtitle, :body)"),
+        {"id": post.id, "title": post.title, "subtitle": post.subtitle, "body": strip_html(post.body)},
+    )
+
+
+def remove_post(post_id):
+    db.session.execute(text("DELETE FROM posts_fts WHERE rowid = :id"), {"id": post_id})
+
+
+def rebuild_index(batch_size=500):
+    db.session.execute(text("DELETE FROM posts_fts"))
+    count = 0
+    for post in BlogPost.query.order_by(BlogPost.id).yield_per(batch_size):
+        index_post(post)
+        count += 1
+    db.session.commit()
+    return count
+
+
+def match_query(query):
+    # Input pengguna diubah menjadi token yang di-quote supaya karakter
+    # khusus FTS5 (", *, AND, NEAR, ...) tidak bisa membuat query error.
+    # Token terakhir dicari sebagai prefix ("pemrog" -> "pemrograman").
+    tokens = re.findall(r"\w+", query, re.UNICODE)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"' for token in tokens) + "*"
+
+
+def _highlight(fragment):
+    return escape(fragment or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def search_posts(query, page=1, per_page=SEARCH_PER_PAGE):
+    match = match_query(query)
+    if match is None:
+        return SearchResults(query, [], page, False)
+
+    rows = db.session.execute(
+        text(
+            "SELECT p.id, p.date, u.name AS author_name,"
+            " highlight(posts_fts, 0, :start, :end) AS title,"
+            " highlight(posts_fts, 1, :start, :end) AS subtitle,"
+            " snippet(posts_fts, 2, :start, :end, '…', 24) AS snippet"
+            " FROM posts_fts"
+            " JOIN blog_posts p ON p.id = posts_fts.rowid"
+            " LEFT JOIN users u ON u.id = p.author_id"
+            " WHERE posts_fts MATCH :match"
+            f" ORDER BY bm25(posts_fts, {_BM25_WEIGHTS})"
+            " LIMIT :limit OFFSET :offset"
+        ),
+        {
+            "start": _MARK_START,
+            "end": _MARK_END,
+            "match": match,
+            "limit": per_page + 1,
+            "offset": (page - 1) * per_page,
+        },
+    ).all()
+
+    results = [
+        dict(
+            id=row.id,
+            date=row.date,
+            author_name=row.author_name,
+            title=_highlight(row.title),
+            subtitle=_highlight(row.subtitle),
+            snippet=_highlight(row.snippet),
+        )
+        for row in rows[:per_page]
+    ]
+    return SearchResults(query, results, page, len(rows) > per_page)
+
+
+@search_cli.command("rebuild")
+def rebuild_command():
+    """Bangun ulang indeks pencarian dari semua postingan."""
+    db.session.execute(text(CREATE_INDEX_SQL))
+    click.echo(f"{rebuild_index()} postingan diindeks.")
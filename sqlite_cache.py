@@ -0,0 +1,235 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from flask_caching.backends.base import BaseCache
+
+# Jangan tulis ulang kolom `accessed` lebih sering dari ini (detik), supaya
+# pembacaan cache tidak selalu berubah menjadi transaksi tulis
+TOUCH_INTERVAL = 1.0
+
+# Lama menunggu lock tulis worker lain sebelum menyerah (milidetik)
+BUSY_TIMEOUT_MS = 5000
+
+# Setelah melewati batas, entri dibuang sampai tersisa 90% dari batas
+PRUNE_RATIO = 0.9
+
+
+class SQLiteCache(BaseCache):
+    """Backend Flask-Caching yang disimpan di satu file SQLite.
+
+    Semua worker gunicorn membuka file yang sama, jadi cache (dan invalidasinya)
+    dipakai bersama tanpa server eksternal. Setiap tulis berjalan dalam satu
+    transaksi ``BEGIN IMMEDIATE`` sehingga atomik antar proses, dan ukuran cache
+    dibatasi jumlah entri (``threshold``) serta total byte (``max_bytes``)
+    dengan membuang entri yang paling lama tidak diakses (LRU).
+    """
+
+    def __init__(self, path, threshold=500, max_bytes=64 * 1024 * 1024, default_timeout=300):
+        BaseCache.__init__(self, default_timeout=default_timeout)
+        self.path = path
+        self._threshold = threshold
+        self._max_bytes = max_bytes
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._write() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " expires REAL NOT NULL,"
+                " accessed REAL NOT NULL,"
+                " size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+            # Jumlah entri dan byte dijaga trigger, supaya _prune tidak perlu
+            # COUNT(*) / SUM(size) atas seluruh tabel setiap kali menulis
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_totals ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0),"
+                " entries INTEGER NOT NULL,"
+                " bytes INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_totals_insert AFTER INSERT ON cache BEGIN"
+                " UPDATE cache_totals SET entries = entries + 1, bytes = bytes + NEW.size; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_totals_delete AFTER DELETE ON cache BEGIN"
+                " UPDATE cache_totals SET entries = entries - 1, bytes = bytes - OLD.size; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_totals_update AFTER UPDATE OF size ON cache BEGIN"
+                " UPDATE cache_totals SET bytes = bytes - OLD.size + NEW.size; END"
+            )
+            if conn.execute("SELECT 1 FROM cache_totals").fetchone() is None:
+                # File cache dari versi sebelum ada cache_totals: hitung sekali saja
+                conn.execute(
+                    "INSERT INTO cache_totals (id, entries, bytes)"
+                    " SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+                )
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        path = config.get("CACHE_SQLITE_PATH") or os.path.join(app.instance_path, "cache.sqlite")
+        kwargs.update(
+            dict(
+                threshold=config["CACHE_THRESHOLD"],
+                max_bytes=config.get("CACHE_SQLITE_MAX_BYTES", 64 * 1024 * 1024),
+            )
+        )
+        return cls(path, *args, **kwargs)
+
+    # Satu koneksi per thread, dan dibuka ulang setelah fork (pid berubah)
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Baris yang tergusur INSERT OR REPLACE juga memicu trigger DELETE
+            conn.execute("PRAGMA recursive_triggers=ON")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _expires(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else 0
+
+    def _prune(self, conn):
+        now = time.time()
+        conn.execute("DELETE FROM cache WHERE expires > 0 AND expires <= ?", (now,))
+
+        count, total = conn.execute("SELECT entries, bytes FROM cache_totals").fetchone()
+        if count <= self._threshold and total <= self._max_bytes:
+            return
+
+        target_count = int(self._threshold * PRUNE_RATIO)
+        target_bytes = int(self._max_bytes * PRUNE_RATIO)
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed"):
+            if count <= target_count and total <= target_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires, accessed FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires, accessed = row
+        now = time.time()
+        if expires and expires <= now:
+            return None
+        if now - accessed > TOUCH_INTERVAL:
+            self._touch(conn, key, now)
+        return pickle.loads(value)
+
+    def _touch(self, conn, key, now):
+        # Tanpa menunggu lock: kalau worker lain sedang menulis, urutan LRU
+        # boleh meleset sedikit, tapi cache hit tidak boleh ikut tertahan
+        conn.execute("PRAGMA busy_timeout = 0")
+        try:
+            conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+
+    def _store(self, conn, key, value, timeout, replace=True):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        cursor = conn.execute(
+            f"{verb} INTO cache (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)",
+            (key, data, self._expires(timeout), time.time(), len(data)),
+        )
+        return cursor.rowcount == 1
+
+    def set(self, key, value, timeout=None):
+        with self._write() as conn:
+            self._store(conn, key, value, timeout)
+            self._prune(conn)
+        return True
+
+    def set_many(self, mapping, timeout=None):
+        with self._write() as conn:
+            for key, value in mapping.items():
+                self._store(conn, key, value, timeout)
+            self._prune(conn)
+        return list(mapping.keys())
+
+    def add(self, key, value, timeout=None):
+        with self._write() as conn:
+            conn.execute(
+                "DELETE FROM cache WHERE key = ? AND expires > 0 AND expires <= ?",
+                (key, time.time()),
+            )
+            added = self._store(conn, key, value, timeout, replace=False)
+            if added:
+                self._prune(conn)
+        return added
+
+    def has(self, key):
+        row = self._connection().execute(
+            "SELECT expires FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None and (not row[0] or row[0] > time.time())
+
+    def delete(self, key):
+        with self._write() as conn:
+            return conn.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount > 0
+
+    def delete_many(self, *keys):
+        with self._write() as conn:
+            conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+        return list(keys)
+
+    def clear(self):
+        with self._write() as conn:
+            conn.execute("DELETE FROM cache")
+        return True
+
+    def inc(self, key, delta=1):
+        # Baca-ubah-tulis di dalam satu transaksi supaya aman antar worker
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT value, expires FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] and row[1] <= time.time()):
+                value, expires = delta, 0
+            else:
+                value, expires = pickle.loads(row[0]) + delta, row[1]
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, data, expires, time.time(), len(data)),
+            )
+        return value
+
+    def dec(self, key, delta=1):
+        return self.inc(key, -delta)
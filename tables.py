@@ -1,29 +1,48 @@
-from flask import Flask
+from datetime import datetime
+
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
-app = Flask(__name__)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///blog.db"
-db = SQLAlchemy(app)
+from avatars import email_hash
+from post_render import render_post, sanitize_html
+
+# Dipasang ke app oleh create_app() (db.init_app)
+db = SQLAlchemy()
 
 
 class BlogPost(db.Model):
     __tablename__ = "blog_posts"
     id = db.Column(db.Integer, primary_key=True)
     author = relationship("User", back_populates="posts")
-    author_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    author_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
     title = db.Column(db.String(250), unique=True, nullable=False)
     subtitle = db.Column(db.String(250), nullable=False)
     date = db.Column(db.String(250), nullable=False)
     body = db.Column(db.Text, nullable=False)
     img_url = db.Column(db.String(250), nullable=False)
 
+    # Hasil post_render.render_post(body), diisi otomatis setiap kali body di-set
+    body_html = db.Column(db.Text)
+    excerpt = db.Column(db.Text)
+    word_count = db.Column(db.Integer)
+    reading_minutes = db.Column(db.Integer)
+
     # Blog to comments -- one to many
     comments = relationship("Comment", back_populates="post")
 
 
+@event.listens_for(BlogPost.body, "set")
+def _render_body(target, value, oldvalue, initiator):
+    rendered = render_post(value)
+    target.body_html = rendered.html
+    target.excerpt = rendered.excerpt
+    target.word_count = rendered.word_count
+    target.reading_minutes = rendered.reading_minutes
+
+
 class User(UserMixin, db.Model):
     __tablename__ = "users"
     id = db.Column(db.Integer, primary_key=True)
@@ -40,6 +59,14 @@ class User(UserMixin, db.Model):
     # TAMBAHKAN KOLOM INI
     is_verified = db.Column(db.Boolean, nullable=False, default=False)
 
+    # MD5 email untuk avatar, diisi otomatis setiap kali email di-set
+    avatar_hash = db.Column(db.String(32))
+
+
+@event.listens_for(User.email, "set")
+def _set_avatar_hash(target, value, oldvalue, initiator):
+    target.avatar_hash = email_hash(value)
+
 
 class Comment(db.Model):
     __tablename__ = "comments"
@@ -48,8 +75,62 @@ class Comment(db.Model):
 
     # Comments to Uesrs -- many to one
     author = relationship("User", back_populates="comments")
-    author_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    author_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
 
     # Comments to blog -- many to one
     post = relationship("BlogPost", back_populates="comments")
-    post_id = db.Column(db.Integer, db.ForeignKey("blog_posts.id"))
\ No newline at end of file
+    post_id = db.Column(db.Integer, db.ForeignKey("blog_posts.id"), index=True)
+
+
+@event.listens_for(Comment.text, "set", retval=True)
+def _sanitize_comment(target, value, oldvalue, initiator):
+    # Komentar ditampilkan dengan |safe, jadi dibersihkan saat disimpan
+    return sanitize_html(value)
+
+
+class RelatedPost(db.Model):
+    # k post paling mirip per post (related.py), rank 0 = paling mirip
+    __tablename__ = "related_posts"
+    post_id = db.Column(db.Integer, primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    related_id = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Float, nullable=False)
+
+
+class PostTerms(db.Model):
+    # Jumlah istilah per post (JSON), bahan TF-IDF untuk pembaruan inkremental
+    __tablename__ = "post_terms"
+    post_id = db.Column(db.Integer, primary_key=True)
+    terms = db.Column(db.Text, nullable=False)
+
+
+class PostStat(db.Model):
+    # Jumlah view dan komentar per post, ditulis per batch oleh engagement.py
+    __tablename__ = "post_stats"
+    post_id = db.Column(db.Integer, primary_key=True)
+    views = db.Column(db.Integer, nullable=False, default=0, index=True)
+    comments = db.Column(db.Integer, nullable=False, default=0)
+
+
+class UploadBlob(db.Model):
+    # Isi file yang diupload, disimpan sekali per SHA-256 (content-addressed)
+    __tablename__ = "upload_blobs"
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    # Path relatif terhadap static/uploads/blobs
+    path = db.Column(db.String(250), nullable=False)
+    ftp_uploaded = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class Upload(db.Model):
+    # Siapa mengupload file apa (nama asli) -> blob yang berisi file tersebut
+    __tablename__ = "uploads"
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
+    filename = db.Column(db.String(250), nullable=False)
+    mimetype = db.Column(db.String(100))
+    sha256 = db.Column(db.String(64), db.ForeignKey("upload_blobs.sha256"), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    blob = relationship("UploadBlob")
@@ -0,0 +1,12 @@
+import os
+import tempfile
+
+# tests/helpers.py membuat app dengan profil "test" (cache di memori, tanpa
+# SMTP / FTP / git / thread latar belakang); yang perlu di-set di sini hanya
+# lokasi file sementara, sebelum test module mana pun membuat app
+_test_dir = tempfile.mkdtemp(prefix="blog-test-")
+os.environ.setdefault("BLOG_CONFIG", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(_test_dir, "test.db"))
+os.environ.setdefault("MAIL_QUEUE_PATH", os.path.join(_test_dir, "mail_queue.sqlite"))
+os.environ.setdefault("AVATAR_FOLDER", os.path.join(_test_dir, "avatars"))
+os.environ.setdefault("LOG_FILE", os.path.join(_test_dir, "app.log"))
@@ -0,0 +1,49 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import cache, create_app
+from tables import db
+
+# Satu app profil "test" untuk seluruh test suite (lokasi file sementaranya
+# diatur tests/conftest.py lewat env)
+app = create_app("test")
+user_cache = app.extensions["user_cache"]
+
+
+def count_queries(func):
+    """Jalankan ``func`` dan kembalikan ``(hasilnya, daftar SQL yang dieksekusi)``."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        return func(), statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+class AppTestCase(unittest.TestCase):
+    """Schema baru, cache kosong, dan test client untuk setiap test.
+
+    Subclass memanggil ``super().setUp()`` lalu mengisi data sendiri di dalam
+    ``with app.app_context():``.
+    """
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            cache.clear()
+            user_cache.clear()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+        user_cache.clear()
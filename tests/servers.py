@@ -0,0 +1,109 @@
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    # Cukup perintah SMTP yang dipakai smtplib / Flask-Mail tanpa TLS dan login
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost SMTP stand-in")
+        envelope = {}
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                envelope = {"from": command[10:].strip("<>"), "to": []}
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                envelope["to"].append(command[8:].strip("<>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b""):
+                        break
+                    lines.append(data)
+                envelope["data"] = b"".join(lines)
+                with server.lock:
+                    server.messages.append(envelope)
+                self.reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Server SMTP lokal untuk test: menyimpan email yang diterima di ``messages``."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class FTPStandIn:
+    """Server FTP lokal (pyftpdlib) untuk test; ``logins`` menghitung sesi yang login."""
+
+    def __init__(self, root, user="test", password="rahasia"):
+        from pyftpdlib.authorizers import DummyAuthorizer
+        from pyftpdlib.handlers import FTPHandler
+        from pyftpdlib.servers import ThreadedFTPServer
+
+        self.root = root
+        self.user = user
+        self.password = password
+        self.logins = 0
+        stand_in = self
+
+        authorizer = DummyAuthorizer()
+        authorizer.add_user(user, password, root, perm="elradfmw")
+
+        class Handler(FTPHandler):
+            def on_login(self, username):
+                stand_in.logins += 1
+
+        Handler.authorizer = authorizer
+        self.server = ThreadedFTPServer(("127.0.0.1", 0), Handler)
+
+    @property
+    def port(self):
+        return self.server.address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, kwargs={"handle_exit": False}, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.close_all()
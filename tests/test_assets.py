@@ -0,0 +1,110 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask import Flask, render_template_string, url_for
+
+from assets import AssetPipeline, Image, brotli, prune_dist
+
+
+class AssetPipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.static = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.static, "css"))
+        os.makedirs(os.path.join(self.static, "uploads"))
+        with open(os.path.join(self.static, "css", "styles.css"), "w") as f:
+            f.write("body { color: #333; }\n" * 200)
+        with open(os.path.join(self.static, "uploads", "file.css"), "w") as f:
+            f.write("/* upload pengguna, bukan aset */")
+        if Image is not None:
+            os.makedirs(os.path.join(self.static, "assets", "img"))
+            Image.new("RGB", (400, 200), "navy").save(os.path.join(self.static, "assets", "img", "home-bg.jpg"))
+
+        self.app = Flask(__name__, static_folder=self.static, static_url_path="/static")
+        self.app.config["ASSETS_IMAGE_WIDTH"] = 100
+        self.app.config["ASSETS_BUILD_ON_START"] = True
+        self.assets = AssetPipeline(self.app)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.static)
+
+    def test_url_for_returns_fingerprinted_name(self):
+        with self.app.test_request_context():
+            url = url_for("static", filename="css/styles.css")
+            self.assertRegex(url, r"^/static/dist/css/styles\.[0-9a-f]{12}\.css$")
+            # Nama dengan slash di depan (seperti di template lama) juga dikenali
+            self.assertEqual(url_for("static", filename="/css/styles.css"), url)
+            self.assertEqual(url_for("static", filename="css/missing.css"), "/static/css/missing.css")
+            self.assertNotIn("uploads/file.css", self.assets.manifest["files"])
+
+    def test_fingerprinted_file_is_immutable_and_precompressed(self):
+        with self.app.test_request_context():
+            url = url_for("static", filename="css/styles.css")
+
+        response = self.client.get(url, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.mimetype, "text/css")
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertIn("max-age=31536000", response.headers["Cache-Control"])
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(gzip.decompress(response.data), b"body { color: #333; }\n" * 200)
+        response.close()
+
+        response = self.client.get(url)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertTrue(response.data.startswith(b"body"))
+        response.close()
+
+        if brotli is not None:
+            response = self.client.get(url, headers={"Accept-Encoding": "gzip, br"})
+            self.assertEqual(response.headers["Content-Encoding"], "br")
+            self.assertEqual(brotli.decompress(response.data), b"body { color: #333; }\n" * 200)
+            response.close()
+
+    def test_prune_removes_outdated_files(self):
+        dist = os.path.join(self.static, "dist")
+        old = self.assets.manifest["files"]["css/styles.css"]
+        with open(os.path.join(self.static, "css", "styles.css"), "a") as f:
+            f.write("a { color: red; }\n")
+        manifest = self.assets.build()
+        new = manifest["files"]["css/styles.css"]
+
+        removed = prune_dist(dist, manifest, self.static)
+        self.assertIn(os.path.join(self.static, old), removed)
+        self.assertIn(os.path.join(self.static, old + ".gz"), removed)
+        self.assertFalse(os.path.exists(os.path.join(self.static, old)))
+        self.assertTrue(os.path.exists(os.path.join(self.static, new)))
+        self.assertTrue(os.path.exists(os.path.join(self.static, new + ".gz")))
+        self.assertTrue(os.path.exists(os.path.join(dist, "manifest.json")))
+        for variants in manifest["variants"].values():
+            for path in variants.values():
+                self.assertTrue(os.path.exists(os.path.join(self.static, path)))
+        self.assertEqual(prune_dist(dist, manifest, self.static), [])
+
+    def test_rebuild_is_stable(self):
+        first = dict(self.assets.manifest["files"])
+        self.assertEqual(self.assets.build()["files"], first)
+
+    @unittest.skipIf(Image is None, "Pillow tidak terpasang")
+    def test_header_image_variants(self):
+        variants = self.assets.manifest["variants"]["assets/img/home-bg.jpg"]
+        with Image.open(os.path.join(self.static, variants["jpeg"])) as image:
+            self.assertEqual(image.size, (100, 50))
+        with Image.open(os.path.join(self.static, variants["webp"])) as image:
+            self.assertEqual(image.format, "WEBP")
+
+        with self.app.test_request_context():
+            style = render_template_string("{{ header_background('assets/img/home-bg.jpg') }}")
+            self.assertIn(f"url('/static/{variants['jpeg']}')", style)
+            self.assertIn("type('image/webp')", style)
+            self.assertEqual(
+                render_template_string("{{ header_background('assets/img/none.jpg') }}"),
+                "background-image: url('/static/assets/img/none.jpg');",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
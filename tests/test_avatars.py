@@ -0,0 +1,71 @@
+import os
+import unittest
+
+from app import cache
+from avatars import email_hash, identicon_svg
+from tables import BlogPost, Comment, User, db
+from tests.helpers import app
+
+user_cache = app.extensions["user_cache"]
+
+
+class AvatarTestCase(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            cache.clear()
+            user_cache.clear()
+            author = User(email=" Penulis@Example.com", password="x", name="Penulis", is_verified=True)
+            post = BlogPost(title="Post Satu", subtitle="Sub", date="July 4, 2025",
+                            body="<p>Isi</p>", img_url="https://example.com/a.jpg", author=author)
+            db.session.add_all([author, post, Comment(text="Halo", author=author, post=post)])
+            db.session.commit()
+            self.user_id = author.id
+            self.post_id = post.id
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+        app.config["AVATAR_PROVIDER"] = "local"
+
+    def test_hash_stored_and_updated_with_email(self):
+        with app.app_context():
+            user = User.query.get(self.user_id)
+            self.assertEqual(user.avatar_hash, email_hash("penulis@example.com"))
+            user.email = "baru@example.com"
+            db.session.commit()
+            self.assertEqual(User.query.get(self.user_id).avatar_hash, email_hash("baru@example.com"))
+
+    def test_post_page_uses_local_avatar(self):
+        response = self.app.get(f"/post/{self.post_id}")
+        self.assertIn(f"/avatar/{email_hash('penulis@example.com')}.svg".encode(), response.data)
+        self.assertNotIn(b"gravatar.com", response.data)
+
+    def test_gravatar_provider_uses_https(self):
+        app.config["AVATAR_PROVIDER"] = "gravatar"
+        response = self.app.get(f"/post/{self.post_id}")
+        self.assertIn(f"https://www.gravatar.com/avatar/{email_hash('penulis@example.com')}?".encode(), response.data)
+
+    def test_avatar_endpoint_serves_cached_svg(self):
+        avatar_hash = email_hash("penulis@example.com")
+        response = self.app.get(f"/avatar/{avatar_hash}.svg")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "image/svg+xml")
+        self.assertEqual(response.get_data(as_text=True), identicon_svg(avatar_hash))
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertIn("max-age=31536000", response.headers["Cache-Control"])
+        response.close()
+        self.assertTrue(os.path.exists(os.path.join(app.config["AVATAR_FOLDER"], avatar_hash[:2], f"{avatar_hash}.svg")))
+
+        self.assertEqual(self.app.get("/avatar/bukan-hash.svg").status_code, 404)
+
+    def test_identicon_is_deterministic(self):
+        self.assertEqual(identicon_svg("0" * 32), identicon_svg("0" * 32))
+        self.assertNotEqual(identicon_svg(email_hash("a@example.com")), identicon_svg(email_hash("b@example.com")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from git import Repo
+
+from git_handle import BackupWorker
+
+
+class BackupWorkerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.tmpdir, "remote.git")
+        self.work_path = os.path.join(self.tmpdir, "work")
+        Repo.init(self.remote_path, bare=True)
+
+        self.work = Repo.clone_from(self.remote_path, self.work_path)
+        with self.work.config_writer() as config:
+            config.set_value("user", "name", "Test")
+            config.set_value("user", "email", "test@example.com")
+        self.write("README", "awal")
+        self.work.git.add(all=True)
+        self.work.index.commit("initial")
+        self.work.git.push("-u", "origin", "HEAD")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, content):
+        with open(os.path.join(self.work_path, name), "w") as f:
+            f.write(content)
+
+    def remote_log(self):
+        return list(Repo(self.remote_path).iter_commits())
+
+    def test_burst_of_edits_becomes_one_pushed_commit(self):
+        worker = BackupWorker(self.work_path, debounce=0.2)
+        for i, message in enumerate(["Added a post", "Edited a post", "Edited a post"]):
+            self.write(f"post{i}.txt", message)
+            worker.enqueue(message)
+        self.assertTrue(worker.flush(timeout=10))
+
+        commits = self.remote_log()
+        self.assertEqual(len(commits), 2)
+        self.assertEqual(commits[0].message, "Added a post; Edited a post (3 changes) -- autobackup")
+        self.assertIsNotNone(worker.status["last_success"])
+        self.assertEqual(worker.status["pending"], 0)
+
+    def test_no_changes_means_no_empty_commit(self):
+        worker = BackupWorker(self.work_path, debounce=0.05)
+        worker.enqueue("Edited a post")
+        self.assertTrue(worker.flush(timeout=10))
+        self.assertEqual(len(self.remote_log()), 1)
+
+    def test_failed_push_is_retried_then_reported(self):
+        self.work.remote("origin").set_url(os.path.join(self.tmpdir, "tidak-ada.git"))
+        worker = BackupWorker(self.work_path, debounce=0.05, max_retries=2, backoff=0.01)
+        self.write("post.txt", "isi")
+        worker.enqueue("Added a post")
+        self.assertTrue(worker.flush(timeout=10))
+        self.assertIsNone(worker.status["last_success"])
+        self.assertIsNotNone(worker.status["last_error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
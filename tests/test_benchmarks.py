@@ -0,0 +1,26 @@
+from benchmarks.bench_routes import run_benchmarks
+from tests.helpers import AppTestCase, app
+
+
+class BenchmarkSmokeTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.csrf = app.config.get('WTF_CSRF_ENABLED', True)
+
+    def tearDown(self):
+        app.config['WTF_CSRF_ENABLED'] = self.csrf
+        super().tearDown()
+
+    def test_report_per_route(self):
+        routes = ["home", "home_uncached", "show_post", "login"]
+        results = run_benchmarks(app, users=3, posts=5, comments=20, requests=5, routes=routes)
+
+        self.assertEqual(sorted(results), sorted(routes))
+        for name, summary in results.items():
+            self.assertEqual(summary["requests"], 5, name)
+            self.assertEqual(summary["errors"], 0, name)
+            self.assertIn("p95", summary["latency_ms"])
+            self.assertIn("sql_queries", summary)
+        # Beranda dari page cache tidak menyentuh DB setelah request pertama
+        self.assertEqual(results["home"]["sql_queries"]["p50"], 0)
+        self.assertEqual(results["login"]["statuses"], {"302": 5})
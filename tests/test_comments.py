@@ -0,0 +1,48 @@
+import unittest
+
+from tables import BlogPost, Comment, User, db
+from tests.helpers import AppTestCase, app, count_queries
+
+
+class ShowPostCommentsTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        with app.app_context():
+            author = User(email="penulis@example.com", password="x", name="Penulis", is_verified=True)
+            reader = User(email="pembaca@example.com", password="x", name="Pembaca", is_verified=True)
+            first = BlogPost(title="Post Satu", subtitle="Sub", date="July 4, 2025",
+                             body="<p>Isi</p>", img_url="https://example.com/a.jpg", author=author)
+            second = BlogPost(title="Post Dua", subtitle="Sub", date="July 5, 2025",
+                              body="<p>Isi</p>", img_url="https://example.com/b.jpg", author=author)
+            db.session.add_all([author, reader, first, second])
+            db.session.commit()
+            self.post_id = first.id
+
+            for i in range(30):
+                db.session.add(Comment(text=f"komentar-{i}", author=reader, post=first))
+                db.session.add(Comment(text=f"lain-{i}", author=reader, post=second))
+            db.session.commit()
+
+    def test_only_comments_of_requested_post_newest_first(self):
+        response = self.app.get(f"/post/{self.post_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"komentar-29", response.data)
+        self.assertNotIn(b"lain-", response.data)
+        self.assertLess(response.data.index(b"komentar-29"), response.data.index(b"komentar-28"))
+        # Halaman pertama hanya berisi COMMENTS_PER_PAGE komentar terbaru
+        self.assertNotIn(b"komentar-9<", response.data)
+
+        response = self.app.get(f"/post/{self.post_id}?page=2")
+        self.assertIn(b"komentar-9<", response.data)
+
+    def test_query_count_does_not_grow_with_comments(self):
+        _, statements = count_queries(lambda: self.app.get(f"/post/{self.post_id}"))
+        # post, jumlah + satu halaman komentar, author post, post terkait
+        self.assertLessEqual(len(statements), 5)
+
+    def test_missing_post_returns_404(self):
+        self.assertEqual(self.app.get("/post/999").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
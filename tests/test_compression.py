@@ -0,0 +1,121 @@
+import gzip
+import unittest
+from unittest import mock
+
+from werkzeug.datastructures import Accept
+
+from app import cache
+from compression import brotli, choose_encoding
+from tables import BlogPost, User, db
+from tests.helpers import app
+
+compressor = app.extensions["compression"]
+request_metrics = app.extensions["request_metrics"]
+
+
+class CompressionTestCase(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            cache.clear()
+            admin = User(email="admin@example.com", password="x", name="Admin", is_verified=True)
+            post = BlogPost(title="Post Panjang", subtitle="Sub", date="July 4, 2025",
+                            body="<p>" + "kalimat panjang " * 500 + "</p>",
+                            img_url="https://example.com/a.jpg", author=admin)
+            db.session.add_all([admin, post])
+            db.session.commit()
+            self.post_id = post.id
+
+    def tearDown(self):
+        app.config['STREAM_TEMPLATES'] = False
+        app.config['WTF_CSRF_ENABLED'] = True
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding(Accept([("gzip", 1)])), "gzip")
+        self.assertIsNone(choose_encoding(Accept([("identity", 1)])))
+        self.assertEqual(choose_encoding(Accept([("gzip", 1), ("br", 0.5)])), "gzip")
+        if brotli is not None:
+            self.assertEqual(choose_encoding(Accept([("gzip", 1), ("br", 1)])), "br")
+
+    def test_html_is_gzipped(self):
+        plain = self.app.get(f"/post/{self.post_id}")
+        self.assertNotIn("Content-Encoding", plain.headers)
+
+        response = self.app.get(f"/post/{self.post_id}", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+
+    @unittest.skipIf(brotli is None, "brotli tidak terpasang")
+    def test_brotli_preferred(self):
+        response = self.app.get("/", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        self.assertIn(b"Post Panjang", brotli.decompress(response.data))
+
+    def test_small_responses_untouched(self):
+        with self.app.session_transaction() as session:
+            session["_user_id"] = "1"
+        response = self.app.get("/clear-cache", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.data, "Cache dibersihkan".encode())
+
+    def test_cached_page_compressed_once(self):
+        with mock.patch.object(compressor, "compress", wraps=compressor.compress) as compress:
+            first = self.app.get(f"/post/{self.post_id}", headers={"Accept-Encoding": "gzip"})
+            second = self.app.get(f"/post/{self.post_id}", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(first.data, second.data)
+
+    def test_rerendered_page_not_served_from_old_compressed_copy(self):
+        url = f"/post/{self.post_id}"
+        self.app.get(url, headers={"Accept-Encoding": "gzip"})
+        # Body halaman hilang dari cache (evict / expire), hasil kompresinya masih ada
+        backend = cache.cache
+        for key in [key for key in backend._cache if "page:anon:" in key and ":gzip" not in key]:
+            backend.delete(key)
+        with app.app_context():
+            db.session.get(BlogPost, self.post_id).title = "Judul Baru"
+            db.session.commit()
+
+        response = self.app.get(url, headers={"Accept-Encoding": "gzip"})
+        self.assertIn(b"Judul Baru", gzip.decompress(response.data))
+
+    def test_strong_feed_etag_gets_encoding_suffix(self):
+        plain_etag = self.app.get("/feed.xml").get_etag()[0]
+        response = self.app.get("/feed.xml", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.get_etag(), (f"{plain_etag}-gzip", False))
+
+        gzip_etag = f'"{plain_etag}-gzip"'
+        again = self.app.get("/feed.xml", headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+        self.assertEqual(again.status_code, 304)
+        # ETag versi gzip tidak cocok untuk klien tanpa kompresi
+        self.assertEqual(self.app.get("/feed.xml", headers={"If-None-Match": gzip_etag}).status_code, 200)
+
+    def test_streamed_page_compressed_and_cached(self):
+        app.config['STREAM_TEMPLATES'] = True
+        # Token CSRF di form komentar memuat timestamp per detik, jadi dua
+        # render bisa berbeda; matikan supaya body bisa dibandingkan
+        app.config['WTF_CSRF_ENABLED'] = False
+        request_metrics.reset()
+        body = self.app.get(f"/post/{self.post_id}").data
+        self.assertIn(b"Post Panjang", body)
+        self.assertNotIn(b"csrf_token", body)
+
+        # Setelah stream selesai halaman sudah masuk page cache
+        cached = self.app.get(f"/post/{self.post_id}")
+        self.assertEqual(cached.data, body)
+        stats = request_metrics.snapshot()["endpoints"]["blog.show_post"]
+        self.assertEqual(stats["cache"], {"miss": 1, "hit": 1})
+
+        cache.clear()
+        streamed = self.app.get(f"/post/{self.post_id}", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(streamed.headers["Content-Encoding"], "gzip")
+        self.assertNotIn("Content-Length", streamed.headers)
+        self.assertEqual(gzip.decompress(streamed.data), body)
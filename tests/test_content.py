@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+import unittest
+
+from app import cache
+from content import export_records, import_records
+from related import np
+from search import search_posts
+from tables import BlogPost, Comment, PostStat, User, db
+from tests.helpers import app
+
+user_cache = app.extensions["user_cache"]
+
+
+class ContentTestCase(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        with app.app_context():
+            db.create_all()
+            cache.clear()
+            user_cache.clear()
+            admin = User(email="admin@example.com", password="hash-admin", name="Admin", is_verified=True)
+            reader = User(email="pembaca@example.com", password="hash-pembaca", name="Pembaca")
+            posts = [
+                BlogPost(title=f"Post {i}", subtitle="Sub", date="July 4, 2025",
+                         body=f"<p>Isi post {i} tentang kopi</p>", img_url="https://example.com/a.jpg", author=admin)
+                for i in range(5)
+            ]
+            db.session.add_all([admin, reader] + posts)
+            db.session.flush()
+            db.session.add_all([Comment(text=f"komentar {i}", author=reader, post=posts[i % 2]) for i in range(3)])
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def export(self, batch_size=2):
+        with app.app_context(), db.engine.connect() as conn:
+            return list(export_records(conn, batch_size=batch_size))
+
+    def reset_database(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.create_all()
+            # Sudah ada satu user lain, jadi id hasil impor bergeser
+            db.session.add(User(email="lain@example.com", password="x", name="Lain"))
+            db.session.commit()
+
+    def test_export_streams_all_rows_in_order(self):
+        records = self.export()
+        self.assertEqual([record["type"] for record in records], ["user"] * 2 + ["post"] * 5 + ["comment"] * 3)
+        self.assertEqual(records[0]["password"], "hash-admin")
+        self.assertNotIn("body_html", records[2])
+
+    def test_import_remaps_ids_and_fills_derived_columns(self):
+        records = self.export()
+        self.reset_database()
+        with app.app_context():
+            counts = import_records(records, batch_size=2)
+            self.assertEqual(counts, {"user": 2, "post": 5, "comment": 3, "skipped": 0})
+
+            admin = User.query.filter_by(email="admin@example.com").one()
+            self.assertNotEqual(admin.id, records[0]["id"])
+            self.assertEqual(admin.avatar_hash, User(email="admin@example.com").avatar_hash)
+            post = BlogPost.query.filter_by(title="Post 0").one()
+            self.assertEqual(post.author_id, admin.id)
+            self.assertTrue(post.body_html)
+            self.assertEqual(sorted(c.text for c in post.comments), ["komentar 0", "komentar 2"])
+            self.assertEqual(db.session.get(PostStat, post.id).comments, 2)
+            self.assertEqual(len(search_posts("kopi").results), 5)
+
+    def test_reimport_skips_existing_titles(self):
+        records = self.export()
+        with app.app_context():
+            counts = import_records(records)
+            self.assertEqual(counts, {"user": 0, "post": 0, "comment": 0, "skipped": 10})
+            self.assertEqual(BlogPost.query.count(), 5)
+            self.assertEqual(Comment.query.count(), 3)
+
+    def test_update_mode_overwrites_post(self):
+        records = self.export()
+        records[2]["body"] = "<p>Isi baru</p>"
+        with app.app_context():
+            counts = import_records(records, on_conflict="update")
+            self.assertEqual(counts["post"], 5)
+            self.assertEqual(counts["comment"], 0)
+            post = BlogPost.query.filter_by(title="Post 0").one()
+            self.assertEqual(post.body, "<p>Isi baru</p>")
+            self.assertIn("Isi baru", post.body_html)
+
+    def test_import_invalidates_cached_home_page(self):
+        client = app.test_client()
+        self.assertNotIn(b"Post Impor", client.get("/").data)
+        records = [{"type": "post", "id": 99, "author_id": None, "title": "Post Impor", "subtitle": "Sub",
+                    "date": "July 5, 2025", "body": "<p>Isi</p>", "img_url": "https://example.com/b.jpg"}]
+        with app.app_context():
+            import_records(records)
+        self.assertIn(b"Post Impor", client.get("/").data)
+
+    @unittest.skipIf(np is None, "numpy tidak terpasang")
+    def test_import_invalidates_posts_whose_related_list_changed(self):
+        client = app.test_client()
+        with app.app_context():
+            post = BlogPost(title="Kopi Gayo", subtitle="Sub", date="July 4, 2025", body="<p>Arabika gayo</p>",
+                            img_url="https://example.com/a.jpg")
+            db.session.add(post)
+            db.session.commit()
+            post_id = post.id
+            app.extensions["related_index"].rebuild()
+        etag = client.get(f"/post/{post_id}").headers["ETag"]
+        records = [{"type": "post", "id": 99, "author_id": None, "title": "Kopi Gayo Aceh", "subtitle": "Sub",
+                    "date": "July 5, 2025", "body": "<p>Arabika gayo dari Aceh</p>",
+                    "img_url": "https://example.com/b.jpg"}]
+        with app.app_context():
+            import_records(records)
+        response = client.get(f"/post/{post_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Kopi Gayo Aceh", response.data)
+
+    def test_cli_round_trip(self):
+        runner = app.test_cli_runner()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "arsip.jsonl")
+            result = runner.invoke(args=["content", "export", "-o", path])
+            self.assertEqual(result.exit_code, 0, result.output)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(len([json.loads(line) for line in f]), 10)
+
+            self.reset_database()
+            result = runner.invoke(args=["content", "import", path])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("5 post", result.output)
+
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("bukan json\n")
+            result = runner.invoke(args=["content", "import", path])
+            self.assertNotEqual(result.exit_code, 0)
+            self.assertIn("Baris 11", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from flask import Flask
+from sqlalchemy import inspect, text
+
+from avatars import email_hash
+from database import MIGRATIONS, migrate
+from tables import db
+
+# Schema lama (sebelum is_verified dan index), seperti dibuat create_all dulu
+LEGACY_SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(100) UNIQUE, password VARCHAR(100), name VARCHAR(1000));
+CREATE TABLE blog_posts (
+    id INTEGER PRIMARY KEY, author_id INTEGER REFERENCES users (id), title VARCHAR(250) NOT NULL UNIQUE,
+    subtitle VARCHAR(250) NOT NULL, date VARCHAR(250) NOT NULL, body TEXT NOT NULL, img_url VARCHAR(250) NOT NULL
+);
+CREATE TABLE comments (
+    id INTEGER PRIMARY KEY, text TEXT NOT NULL,
+    author_id INTEGER REFERENCES users (id), post_id INTEGER REFERENCES blog_posts (id)
+);
+INSERT INTO users (id, email, password, name) VALUES (1, 'admin@example.com', 'x', 'Admin');
+INSERT INTO blog_posts VALUES (1, 1, 'Hello World', 'My First Post', 'July 4, 2025', '<p>Konten <b>pertama</b></p>', 'x');
+"""
+
+
+class MigrationTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        with sqlite3.connect(self.path) as conn:
+            conn.executescript(LEGACY_SCHEMA)
+
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{self.path}"
+        db.init_app(self.app)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def test_migrates_legacy_database(self):
+        with self.app.app_context():
+            self.assertEqual(migrate(), [version for version, _, _ in MIGRATIONS])
+
+            inspector = inspect(db.engine)
+            self.assertIn("is_verified", [col["name"] for col in inspector.get_columns("users")])
+            with db.engine.connect() as conn:
+                avatar_hash = conn.execute(text("SELECT avatar_hash FROM users WHERE id = 1")).scalar()
+            self.assertEqual(avatar_hash, email_hash("admin@example.com"))
+            self.assertIn("upload_blobs", inspector.get_table_names())
+            indexes = {index["name"] for table in ("comments", "blog_posts") for index in inspector.get_indexes(table)}
+            self.assertTrue({"ix_comments_post_id", "ix_comments_author_id", "ix_blog_posts_author_id"} <= indexes)
+
+            with db.engine.connect() as conn:
+                match = conn.execute(text("SELECT rowid FROM posts_fts WHERE posts_fts MATCH 'pertama'")).scalar()
+                plan = conn.execute(text("EXPLAIN QUERY PLAN SELECT * FROM comments WHERE post_id = 1")).all()
+            self.assertEqual(match, 1)
+            self.assertIn("ix_comments_post_id", " ".join(row[-1] for row in plan))
+
+    def test_migrate_is_idempotent(self):
+        with self.app.app_context():
+            migrate()
+            self.assertEqual(migrate(), [])
+            with db.engine.connect() as conn:
+                versions = conn.execute(text("SELECT version FROM schema_migrations ORDER BY version")).scalars().all()
+        self.assertEqual(versions, [version for version, _, _ in MIGRATIONS])
+
+    def test_connection_pragmas(self):
+        with self.app.app_context(), db.engine.connect() as conn:
+            self.assertEqual(conn.exec_driver_sql("PRAGMA journal_mode").scalar(), "wal")
+            self.assertEqual(conn.exec_driver_sql("PRAGMA synchronous").scalar(), 1)  # NORMAL
+            self.assertEqual(conn.exec_driver_sql("PRAGMA busy_timeout").scalar(), 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+from tables import BlogPost, PostStat, User, db
+from tests.helpers import AppTestCase, app, count_queries
+
+engagement = app.extensions["engagement"]
+
+
+class EngagementTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        app.config['WTF_CSRF_ENABLED'] = False
+        with app.app_context():
+            admin = User(email="admin@example.com", password="x", name="Admin", is_verified=True)
+            reader = User(email="pembaca@example.com", password="x", name="Pembaca", is_verified=True)
+            posts = [
+                BlogPost(title=f"Post {i}", subtitle="Sub", date="July 4, 2025", body="<p>Isi</p>",
+                         img_url="https://example.com/a.jpg", author=admin)
+                for i in range(3)
+            ]
+            db.session.add_all([admin, reader] + posts)
+            db.session.commit()
+            self.post_ids = [post.id for post in posts]
+        engagement.clear()
+
+    def tearDown(self):
+        app.config['WTF_CSRF_ENABLED'] = True
+        engagement.clear()
+        super().tearDown()
+
+    def stats(self):
+        with app.app_context():
+            return {row.post_id: (row.views, row.comments) for row in PostStat.query}
+
+    def test_views_are_buffered_without_writes(self):
+        responses, statements = count_queries(
+            lambda: [self.app.get(f"/post/{self.post_ids[0]}") for _ in range(3)]
+        )
+        self.assertEqual([r.status_code for r in responses], [200, 200, 200])
+        writes = [s for s in statements if not s.lstrip().upper().startswith("SELECT")]
+        self.assertEqual(writes, [])
+        self.assertEqual(engagement.pending(), {self.post_ids[0]: (3, 0)})
+        self.assertEqual(self.stats(), {})
+
+    def test_flush_adds_to_existing_counts(self):
+        engagement.record(self.post_ids[0], views=2)
+        engagement.record(self.post_ids[1], views=1, comments=1)
+        self.assertEqual(engagement.flush(), 2)
+        engagement.record(self.post_ids[0], views=3)
+        engagement.flush()
+
+        self.assertEqual(self.stats(), {self.post_ids[0]: (5, 0), self.post_ids[1]: (1, 1)})
+        self.assertEqual(engagement.pending(), {})
+        self.assertEqual(engagement.flush(), 0)
+
+    def test_cache_hits_and_not_modified_are_counted(self):
+        url = f"/post/{self.post_ids[0]}"
+        etag = self.app.get(url).headers["ETag"]
+        self.app.get(url)
+        self.assertEqual(self.app.get(url, headers={"If-None-Match": etag}).status_code, 304)
+        self.app.get("/post/999")
+
+        self.assertEqual(engagement.pending(), {self.post_ids[0]: (3, 0)})
+
+    def test_comment_is_counted(self):
+        with self.app.session_transaction() as session:
+            session["_user_id"] = "2"
+        self.app.post(f"/post/{self.post_ids[1]}", data={"body": "Bagus", "submit": "Submit Comment"})
+
+        self.assertEqual(engagement.pending()[self.post_ids[1]][1], 1)
+
+    def test_deleted_post_is_not_recreated(self):
+        engagement.record(self.post_ids[2], views=4)
+        with self.app.session_transaction() as session:
+            session["_user_id"] = "1"
+        self.app.get(f"/delete/{self.post_ids[2]}")
+        engagement.flush()
+
+        self.assertNotIn(self.post_ids[2], self.stats())
+
+    def test_popular_orders_by_views(self):
+        engagement.record(self.post_ids[0], views=1)
+        engagement.record(self.post_ids[2], views=5)
+        engagement.flush()
+
+        data = self.app.get("/popular").get_data(as_text=True)
+        self.assertLess(data.index("Post 2"), data.index("Post 0"))
+        self.assertNotIn("Post 1", data)
+
+    def test_flush_invalidates_popular_page(self):
+        engagement.record(self.post_ids[0], views=1)
+        engagement.flush()
+        etag = self.app.get("/popular").headers["ETag"]
+        self.assertEqual(self.app.get("/popular", headers={"If-None-Match": etag}).status_code, 304)
+
+        engagement.record(self.post_ids[2], views=5)
+        engagement.flush()
+        response = self.app.get("/popular", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_data(as_text=True)
+        self.assertLess(data.index("Post 2"), data.index("Post 0"))
+
+    def test_stats_page_for_admin(self):
+        engagement.record(self.post_ids[1], views=7)
+        with self.app.session_transaction() as session:
+            session["_user_id"] = "2"
+        self.assertEqual(self.app.get("/stats").status_code, 403)
+
+        with self.app.session_transaction() as session:
+            session["_user_id"] = "1"
+        response = self.app.get("/stats")
+        self.assertEqual(response.status_code, 200)
+        # Angka worker ini ditulis sebelum halaman dirender
+        self.assertEqual(self.stats()[self.post_ids[1]], (7, 0))
+        self.assertIn(b"Post 1", response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
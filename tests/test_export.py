@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import cache
+from export import MANIFEST_NAME, export_site
+from tables import BlogPost, Comment, RelatedPost, User, db
+from tests.helpers import app
+
+
+class ExportTestCase(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.output = tempfile.mkdtemp()
+        with app.app_context():
+            db.create_all()
+            cache.clear()
+            author = User(email="penulis@example.com", password="x", name="Penulis", is_verified=True)
+            posts = [
+                BlogPost(title=f"Post {i}", subtitle="Sub", date="July 4, 2025", body=f"<p>Isi post {i}</p>",
+                         img_url="https://example.com/a.jpg", author=author)
+                for i in range(3)
+            ]
+            db.session.add_all([author] + posts)
+            db.session.commit()
+            self.post_ids = [post.id for post in posts]
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+        shutil.rmtree(self.output)
+
+    def export(self, **kwargs):
+        with app.app_context():
+            return export_site(app, self.output, workers=kwargs.pop("workers", 0), **kwargs)
+
+    def read(self, *parts):
+        with open(os.path.join(self.output, *parts), encoding="utf-8") as f:
+            return f.read()
+
+    def test_exports_public_pages(self):
+        result = self.export()
+        self.assertEqual(
+            sorted(result["rendered"]),
+            sorted(["/", "/about", "/contact", "/popular"] + [f"/post/{post_id}" for post_id in self.post_ids]),
+        )
+        self.assertIn("Post 2", self.read("index.html"))
+        self.assertIn("Isi post 0", self.read("post", str(self.post_ids[0]), "index.html"))
+        self.assertTrue(os.path.exists(os.path.join(self.output, "about", "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.output, MANIFEST_NAME)))
+
+    def test_only_changed_pages_rerendered(self):
+        self.export()
+        self.assertEqual(self.export()["rendered"], [])
+
+        with app.app_context():
+            author = User.query.first()
+            db.session.add(Comment(text="Komentar baru", author=author, post_id=self.post_ids[1]))
+            db.session.commit()
+        result = self.export()
+        self.assertEqual(result["rendered"], [f"/post/{self.post_ids[1]}"])
+        self.assertIn("Komentar baru", self.read("post", str(self.post_ids[1]), "index.html"))
+
+    def test_related_list_change_rerenders_post(self):
+        self.export()
+        with app.app_context():
+            db.session.add(RelatedPost(post_id=self.post_ids[0], rank=0, related_id=self.post_ids[2], score=0.5))
+            db.session.commit()
+        result = self.export()
+        self.assertEqual(result["rendered"], [f"/post/{self.post_ids[0]}"])
+        self.assertIn("Baca juga", self.read("post", str(self.post_ids[0]), "index.html"))
+
+    def test_deleted_post_page_removed(self):
+        self.export()
+        with app.app_context():
+            db.session.delete(BlogPost.query.get(self.post_ids[0]))
+            db.session.commit()
+        result = self.export()
+        self.assertEqual(result["removed"], [f"/post/{self.post_ids[0]}"])
+        self.assertIn("/", result["rendered"])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "post", str(self.post_ids[0]), "index.html")))
+
+    def test_process_pool_rendering(self):
+        result = self.export(workers=2)
+        self.assertEqual(len(result["rendered"]), 7)
+        self.assertEqual(result["failed"], [])
+        self.assertIn("Isi post 1", self.read("post", str(self.post_ids[1]), "index.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
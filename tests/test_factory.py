@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import app as app_module
+from app import create_app
+from config import TestConfig
+from tables import BlogPost, db
+from tests.helpers import AppTestCase, app
+
+
+class FactoryTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.mkdtemp()
+
+        class OtherConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(self.tmpdir, "other.db")
+            MAIL_QUEUE_PATH = os.path.join(self.tmpdir, "mail_queue.sqlite")
+            COMPRESS_MIN_SIZE = 99999
+            USER_CACHE_TTL = 1
+            RELATED_POSTS = 2
+
+        self.other = create_app(OtherConfig)
+
+    def tearDown(self):
+        with self.other.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.tmpdir)
+        super().tearDown()
+
+    def test_import_does_not_build_an_app(self):
+        self.assertFalse(hasattr(app_module, "app"))
+
+    def test_second_app_does_not_rewire_the_first(self):
+        for name in ("page_cache", "feeds", "compression", "mail_queue", "assets", "request_metrics",
+                     "password_hasher", "login_throttle", "user_cache", "related_index", "engagement"):
+            self.assertIsNot(app.extensions[name], self.other.extensions[name], name)
+
+        self.assertIs(app.extensions["mail_queue"].app, app)
+        self.assertIs(self.other.extensions["mail_queue"].app, self.other)
+        self.assertNotEqual(app.extensions["mail_queue"].path, self.other.extensions["mail_queue"].path)
+        self.assertEqual(app.extensions["compression"].min_size, 500)
+        self.assertEqual(app.extensions["user_cache"].ttl, 60)
+        self.assertEqual(self.other.extensions["user_cache"].ttl, 1)
+        self.assertIs(app.extensions["related_index"].app, app)
+        self.assertEqual(self.other.extensions["related_index"].k, 2)
+
+    def test_module_names_follow_current_app(self):
+        with self.other.test_request_context():
+            self.assertIs(app_module.page_cache._get_current_object(), self.other.extensions["page_cache"])
+        with app.test_request_context():
+            self.assertIs(app_module.page_cache._get_current_object(), app.extensions["page_cache"])
+
+    def test_apps_serve_their_own_database(self):
+        with self.other.app_context():
+            db.session.add(BlogPost(title="Hanya di app lain", subtitle="Sub", date="July 4, 2025",
+                                    body="<p>Isi</p>", img_url="https://example.com/a.jpg"))
+            db.session.commit()
+
+        self.assertIn(b"Hanya di app lain", self.other.test_client().get("/").data)
+        self.assertNotIn(b"Hanya di app lain", self.app.get("/").data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from queries import feed_page
+from tables import BlogPost, User, db
+from tests.helpers import AppTestCase, app
+
+
+class HomeFeedTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        with app.app_context():
+            author = User(email="penulis@example.com", password="x", name="Penulis", is_verified=True)
+            db.session.add(author)
+            for i in range(1, 26):
+                db.session.add(BlogPost(title=f"Judul {i}", subtitle=f"Sub {i}", date="July 4, 2025",
+                                        body="<p>isi panjang</p>", img_url="https://example.com/a.jpg",
+                                        author=author))
+            db.session.commit()
+
+    def test_keyset_pages_walk_forward_and_back(self):
+        with app.app_context():
+            first = feed_page(per_page=10)
+            self.assertEqual([p.id for p in first.posts], list(range(25, 15, -1)))
+            self.assertIsNone(first.newer)
+            self.assertEqual(first.older, 16)
+
+            second = feed_page(before=first.older, per_page=10)
+            self.assertEqual([p.id for p in second.posts], list(range(15, 5, -1)))
+            self.assertEqual((second.newer, second.older), (15, 6))
+
+            last = feed_page(before=second.older, per_page=10)
+            self.assertEqual([p.id for p in last.posts], [5, 4, 3, 2, 1])
+            self.assertIsNone(last.older)
+
+            back = feed_page(after=last.newer, per_page=10)
+            self.assertEqual([p.id for p in back.posts], [p.id for p in second.posts])
+
+    def test_preview_rows_carry_author_name_without_body(self):
+        with app.app_context():
+            post = feed_page(per_page=1).posts[0]
+        self.assertEqual(post.author_name, "Penulis")
+        self.assertNotIn("body", post._fields)
+
+    def test_home_renders_pager_links(self):
+        response = self.app.get("/")
+        self.assertIn(b"Judul 25", response.data)
+        self.assertNotIn(b"Judul 15<", response.data)
+        self.assertIn(b"/?before=16", response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+from feeds import parse_post_date
+from tables import BlogPost, User, db
+from tests.helpers import AppTestCase, app, count_queries
+
+feeds = app.extensions["feeds"]
+
+
+class FeedTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        with app.app_context():
+            author = User(email="admin@example.com", password="x", name="Admin", is_verified=True)
+            db.session.add_all([
+                author,
+                BlogPost(title="Post Lama", subtitle="Sub", date="July 04, 2025", body="<p>Isi lama</p>",
+                         img_url="https://example.com/a.jpg", author=author),
+                BlogPost(title="Post <Baru> & Segar", subtitle="Sub", date="August 1, 2025",
+                         body="<p>Isi baru</p>", img_url="https://example.com/b.jpg", author=author),
+            ])
+            db.session.commit()
+
+    def test_parse_post_date(self):
+        self.assertEqual(parse_post_date("July 04, 2025"), datetime(2025, 7, 4, tzinfo=timezone.utc))
+        self.assertIsNone(parse_post_date("kemarin"))
+
+    def test_rss_feed(self):
+        response = self.app.get("/feed.xml")
+        self.assertEqual(response.mimetype, "application/rss+xml")
+        items = ET.fromstring(response.data).findall("./channel/item")
+        self.assertEqual([item.findtext("title") for item in items], ["Post <Baru> & Segar", "Post Lama"])
+        self.assertEqual(items[1].findtext("pubDate"), "Fri, 04 Jul 2025 00:00:00 +0000")
+        self.assertEqual(items[1].findtext("description"), "Isi lama")
+
+    def test_json_feed(self):
+        feed = json.loads(self.app.get("/feed.json").data)
+        self.assertEqual(feed["version"], "https://jsonfeed.org/version/1.1")
+        self.assertEqual(feed["items"][0]["title"], "Post <Baru> & Segar")
+        self.assertEqual(feed["items"][0]["date_published"], "2025-08-01T00:00:00+00:00")
+        self.assertEqual(feed["items"][0]["content_html"], "<p>Isi baru</p>")
+
+    def test_cached_bytes_and_strong_etag(self):
+        first = self.app.get("/feed.xml")
+        etag = first.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        cached, statements = count_queries(lambda: self.app.get("/feed.xml"))
+        self.assertEqual(cached.data, first.data)
+        self.assertEqual(statements, [])
+
+        not_modified, statements = count_queries(
+            lambda: self.app.get("/feed.xml", headers={"If-None-Match": etag})
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(statements, [])
+
+    def test_compressed_feed_keeps_strong_etag(self):
+        first = self.app.get("/feed.xml", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(first.headers["Content-Encoding"], "gzip")
+        etag = first.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        not_modified, statements = count_queries(
+            lambda: self.app.get("/feed.xml", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(statements, [])
+
+    def test_invalidated_after_post_change(self):
+        etag = self.app.get("/feed.json").headers["ETag"]
+        with app.app_context():
+            BlogPost.query.filter_by(title="Post Lama").one().title = "Post Lama (edit)"
+            db.session.commit()
+            feeds.invalidate()
+
+        response = self.app.get("/feed.json", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Post Lama (edit)", response.get_data(as_text=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+from flask import Flask
+from flask_mail import Mail, Message
+
+from mail_queue import MailQueue
+from tests.servers import SMTPStandIn
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class MailQueueTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def make_queue(self, port, **config):
+        app = Flask(__name__, instance_path=self.tmpdir)
+        app.config.update(
+            MAIL_SERVER="127.0.0.1",
+            MAIL_PORT=port,
+            MAIL_DEFAULT_SENDER=("Sahal's Blog", "blog@example.com"),
+            MAIL_QUEUE_WORKER="none",
+            MAIL_QUEUE_BACKOFF=0,
+            **config,
+        )
+        mail = Mail(app)
+        queue = MailQueue(app, mail)
+        return app, queue
+
+    def test_batch_is_sent_over_one_connection(self):
+        with SMTPStandIn() as server:
+            app, queue = self.make_queue(server.port)
+            attachment = os.path.join(self.tmpdir, "lampiran.pdf")
+            with open(attachment, "wb") as f:
+                f.write(b"%PDF isi")
+            with app.app_context():
+                for i in range(3):
+                    queue.enqueue(
+                        Message(subject=f"Halo {i}", recipients=[f"user{i}@example.com"], html="<p>hai</p>"),
+                        attachments=[("lampiran.pdf", "application/pdf", attachment)],
+                    )
+            self.assertEqual(queue.send_batch(), 3)
+
+        self.assertEqual(server.connections, 1)
+        self.assertEqual([m["to"] for m in server.messages],
+                         [["user0@example.com"], ["user1@example.com"], ["user2@example.com"]])
+        self.assertIn(b"lampiran.pdf", server.messages[0]["data"])
+        self.assertEqual(queue.counts(), {"sent": 3})
+
+    def test_unreachable_server_retries_then_dead_letters(self):
+        app, queue = self.make_queue(free_port(), MAIL_QUEUE_MAX_ATTEMPTS=2)
+        with app.app_context():
+            queue.enqueue(Message(subject="Halo", recipients=["user@example.com"], body="hai"))
+
+        queue.send_batch()
+        self.assertEqual(queue.counts(), {"queued": 1})
+        queue.send_batch()
+        self.assertEqual(queue.counts(), {"dead": 1})
+        self.assertEqual(queue.send_batch(), 0)
+
+    def test_queue_survives_restart(self):
+        app, queue = self.make_queue(free_port())
+        with app.app_context():
+            queue.enqueue(Message(subject="Halo", recipients=["user@example.com"], body="hai"))
+        _, reopened = self.make_queue(free_port())
+        self.assertEqual(reopened.counts(), {"queued": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
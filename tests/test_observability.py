@@ -0,0 +1,67 @@
+import json
+import logging
+import unittest
+
+from observability import JsonFormatter, percentile
+from tables import BlogPost, User, db
+from tests.helpers import AppTestCase, app
+
+request_metrics = app.extensions["request_metrics"]
+
+
+class ObservabilityTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        with app.app_context():
+            admin = User(email="admin@example.com", password="x", name="Admin", is_verified=True)
+            db.session.add_all([admin] + [
+                BlogPost(title=f"Post {i}", subtitle="Sub", date="July 4, 2025", body="<p>Isi</p>",
+                         img_url="https://example.com/a.jpg", author=admin)
+                for i in range(3)
+            ])
+            db.session.commit()
+        request_metrics.reset()
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.99), 7)
+
+    def test_json_formatter_includes_extra_fields(self):
+        record = logging.LogRecord("blog.request", logging.INFO, __file__, 1, "GET %s", ("/",), None)
+        record.status = 200
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual((entry["message"], entry["status"], entry["level"]), ("GET /", 200, "INFO"))
+
+    def test_request_metrics_and_log_line(self):
+        self.app.get("/")
+        self.app.get("/")  # kedua kalinya dari page cache
+
+        home = request_metrics.snapshot()["endpoints"]["blog.home"]
+        self.assertEqual(home["count"], 2)
+        self.assertEqual(home["cache"], {"miss": 1, "hit": 1})
+        self.assertGreater(home["sql_queries"]["max"], 0)
+        self.assertEqual(home["sql_queries"]["p50"], 0)
+        self.assertEqual(home["status"], {"200": 2})
+
+        log_handler = app.extensions["log_handler"]
+        log_handler.flush()
+        with open(log_handler.handlers[0].baseFilename, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if '"blog.request"' in line]
+        last = lines[-1]
+        self.assertEqual((last["route"], last["endpoint"], last["status"], last["cache"]), ("/", "blog.home", 200, "hit"))
+        self.assertIn("duration_ms", last)
+        self.assertEqual(last["sql_queries"], 0)
+
+    def test_metrics_endpoint_for_admin(self):
+        self.app.get("/about")
+        with self.app.session_transaction() as session:
+            session["_user_id"] = "1"
+        data = self.app.get("/metrics").get_json()
+        self.assertEqual(set(data["endpoints"]["blog.about"]["duration_ms"]), {"p50", "p95", "p99", "max"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from unittest import mock
+
+import page_cache as page_cache_module
+from tables import BlogPost, User, db
+from tests.helpers import AppTestCase, app, count_queries
+
+assets = app.extensions["assets"]
+page_cache = app.extensions["page_cache"]
+
+
+class PageCacheTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        app.config['WTF_CSRF_ENABLED'] = False
+        with app.app_context():
+            admin = User(email="admin@example.com", password="x", name="Admin", is_verified=True)
+            reader = User(email="pembaca@example.com", password="x", name="Pembaca", is_verified=True)
+            post = BlogPost(title="Post Cache", subtitle="Sub", date="July 4, 2025",
+                            body="<p>Isi</p>", img_url="https://example.com/a.jpg", author=admin)
+            db.session.add_all([admin, reader, post])
+            db.session.commit()
+            self.post_id = post.id
+            self.reader_id = reader.id
+
+    def tearDown(self):
+        super().tearDown()
+        app.config['WTF_CSRF_ENABLED'] = True
+
+    def test_anonymous_hit_skips_sql(self):
+        self.app.get("/")
+        _, statements = count_queries(lambda: self.app.get("/"))
+        self.assertEqual(statements, [])
+
+    def test_admin_and_anonymous_get_separate_copies(self):
+        self.assertNotIn(b"Buat Postingan Blog Baru", self.app.get("/").data)
+        with self.app.session_transaction() as sess:
+            sess['_user_id'] = "1"
+        self.assertIn(b"Buat Postingan Blog Baru", self.app.get("/").data)
+
+    def test_new_comment_invalidates_post_page(self):
+        path = f"/post/{self.post_id}"
+        self.app.get(path)
+        with self.app.session_transaction() as sess:
+            sess['_user_id'] = str(self.reader_id)
+        self.app.post(path, data={"body": "komentar baru"})
+        with self.app.session_transaction() as sess:
+            sess.clear()
+        self.assertIn(b"komentar baru", self.app.get(path).data)
+
+    def test_matching_etag_returns_304_without_sql(self):
+        etag = self.app.get("/").headers["ETag"]
+        response, statements = count_queries(lambda: self.app.get("/", headers={"If-None-Match": etag}))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(statements, [])
+
+    def test_new_asset_manifest_invalidates_pages(self):
+        etag = self.app.get("/").headers["ETag"]
+        manifest = {"files": {"css/styles.css": "dist/css/styles.0123abcd.css"}, "variants": {}}
+        # Worker yang start ulang setelah `flask assets build`
+        with mock.patch.object(assets, "manifest", manifest):
+            page_cache.init_app(app)
+        try:
+            response = self.app.get("/", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["ETag"], etag)
+        finally:
+            page_cache.init_app(app)
+
+    def at(self, now):
+        # Jam page_cache (generation dan pengecekan Last-Modified) diatur test
+        clock = mock.Mock(wraps=page_cache_module.time)
+        clock.time.return_value = now
+        return mock.patch.object(page_cache_module, "time", clock)
+
+    def invalidate(self, path):
+        with app.test_request_context():
+            page_cache.invalidate(path)
+
+    def test_if_modified_since_is_supported(self):
+        with self.at(2000000000.2):
+            self.invalidate("/")
+        with self.at(2000000001.5):
+            last_modified = self.app.get("/").headers["Last-Modified"]
+            response = self.app.get("/", headers={"If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 304)
+
+        with self.at(2000000001.8):
+            self.invalidate("/")
+            response = self.app.get("/", headers={"If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_last_modified_within_the_generation_second(self):
+        with self.at(2000000000.2):
+            self.invalidate("/")
+        with self.at(2000000000.5):
+            response = self.app.get("/")
+        # Write berikutnya bisa jatuh di detik yang sama; klien cukup memakai ETag
+        self.assertNotIn("Last-Modified", response.headers)
+        self.assertIn("ETag", response.headers)
+
+    def test_write_changes_validators(self):
+        path = f"/post/{self.post_id}"
+        etag = self.app.get(path).headers["ETag"]
+        with app.test_request_context():
+            page_cache.invalidate(path)
+        response = self.app.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from unittest import mock
+
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from app import cache
+from passwords import LoginThrottle, PasswordHasher, normalize_method
+from tables import User, db
+from tests.helpers import app
+
+login_throttle = app.extensions["login_throttle"]
+password_hasher = app.extensions["password_hasher"]
+user_cache = app.extensions["user_cache"]
+
+
+class PasswordHasherTestCase(unittest.TestCase):
+    def test_legacy_hash_needs_rehash(self):
+        legacy = generate_password_hash("rahasia", method="pbkdf2:sha256", salt_length=8)
+        self.assertTrue(password_hasher.needs_rehash(legacy))
+        self.assertFalse(password_hasher.needs_rehash(password_hasher.hash("rahasia")))
+
+    def test_normalize_method_adds_default_iterations(self):
+        self.assertEqual(normalize_method("pbkdf2:sha256:1000"), "pbkdf2:sha256:1000")
+        self.assertTrue(normalize_method("pbkdf2:sha256").startswith("pbkdf2:sha256:"))
+
+    def test_hashing_in_process_pool(self):
+        pool_app = Flask(__name__)
+        pool_app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_METHOD="pbkdf2:sha256:1000")
+        hasher = PasswordHasher(pool_app)
+        try:
+            pwhash = hasher.hash("rahasia")
+            self.assertTrue(pwhash.startswith("pbkdf2:sha256:1000$"))
+            self.assertTrue(hasher.verify(pwhash, "rahasia"))
+            self.assertFalse(hasher.verify(pwhash, "salah"))
+        finally:
+            hasher.close()
+
+
+class LoginThrottleTestCase(unittest.TestCase):
+    def setUp(self):
+        with app.app_context():
+            cache.clear()
+
+    def test_account_and_ip_limits(self):
+        throttle = LoginThrottle(cache, ip_limit=4, account_limit=2, period=60)
+        with app.app_context():
+            self.assertTrue(throttle.allow("10.0.0.1", "a@example.com"))
+            self.assertTrue(throttle.allow("10.0.0.1", "A@example.com "))
+            self.assertFalse(throttle.allow("10.0.0.1", "a@example.com"))
+            # Akun lain dari IP yang sama masih boleh sampai batas IP
+            self.assertTrue(throttle.allow("10.0.0.1", "b@example.com"))
+            self.assertFalse(throttle.allow("10.0.0.1", "c@example.com"))
+            self.assertTrue(throttle.allow("10.0.0.2", "c@example.com"))
+
+            throttle.reset("a@example.com")
+            self.assertTrue(throttle.allow("10.0.0.3", "a@example.com"))
+
+
+class LoginViewTestCase(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        app.config['WTF_CSRF_ENABLED'] = False
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            cache.clear()
+            user_cache.clear()
+            legacy = generate_password_hash("rahasia", method="pbkdf2:sha256", salt_length=8)
+            db.session.add(User(email="lama@example.com", password=legacy, name="Lama", is_verified=True))
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+        app.config['WTF_CSRF_ENABLED'] = True
+
+    def login(self, password):
+        return self.app.post("/login", data={"email": "lama@example.com", "password": password})
+
+    def test_successful_login_rehashes_legacy_password(self):
+        response = self.login("rahasia")
+        self.assertEqual(response.status_code, 302)
+        with app.app_context():
+            pwhash = User.query.filter_by(email="lama@example.com").one().password
+        self.assertFalse(password_hasher.needs_rehash(pwhash))
+        with app.app_context():
+            self.assertTrue(password_hasher.verify(pwhash, "rahasia"))
+
+    def test_excess_attempts_rejected_before_hashing(self):
+        for _ in range(login_throttle.account_limit):
+            self.assertEqual(self.login("salah").status_code, 200)
+
+        with mock.patch.object(password_hasher, "verify") as verify:
+            response = self.login("rahasia")
+        self.assertEqual(response.status_code, 429)
+        verify.assert_not_called()
+
+    def test_ip_limit_uses_forwarded_for(self):
+        def login_from(ip, email):
+            return self.app.post("/login", data={"email": email, "password": "salah"},
+                                 headers={"X-Forwarded-For": ip})
+
+        with mock.patch.object(login_throttle, "ip_limit", 2):
+            for i in range(2):
+                self.assertEqual(login_from("203.0.113.1", f"user{i}@example.com").status_code, 200)
+            self.assertEqual(login_from("203.0.113.1", "user9@example.com").status_code, 429)
+            # Klien lain di belakang proxy yang sama tidak ikut terkunci
+            self.assertEqual(login_from("203.0.113.2", "user9@example.com").status_code, 200)
+
+    def test_clear_cache_cannot_reset_limits(self):
+        for _ in range(login_throttle.account_limit):
+            self.login("salah")
+        self.assertEqual(self.app.get("/clear-cache").status_code, 403)
+        self.assertEqual(self.login("rahasia").status_code, 429)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from app import cache
+from post_render import highlight, render_post, sanitize_html
+from tables import BlogPost, Comment, User, db
+from tests.helpers import app
+
+
+class RenderPostTestCase(unittest.TestCase):
+    def test_sanitize_drops_scripts_handlers_and_bad_urls(self):
+        html = sanitize_html(
+            '<p onclick="x()" style="text-align: center; background: url(x)">Halo'
+            '<script>alert(1)</script><a href="javascript:alert(1)">a</a>'
+            '<a href="https://example.com" target="_blank">b</a><iframe src="x">isi</iframe>'
+        )
+        self.assertEqual(
+            html,
+            '<p style="text-align: center">Halo<a>a</a>'
+            '<a href="https://example.com" target="_blank" rel="noopener noreferrer">b</a></p>',
+        )
+
+    def test_unknown_tags_keep_text_and_unclosed_tags_are_closed(self):
+        self.assertEqual(sanitize_html("<custom>teks</custom><b>tebal"), "teks<b>tebal</b>")
+        self.assertEqual(sanitize_html("1 < 2 &amp; 3"), "1 &lt; 2 &amp; 3")
+
+    def test_images_are_lazy_loaded(self):
+        html = render_post('<p><img src="/static/a.png" alt="A" onerror="x()"></p>').html
+        self.assertEqual(html, '<p><img src="/static/a.png" alt="A" loading="lazy" decoding="async"></p>')
+
+    @unittest.skipIf(highlight is None, "Pygments tidak terpasang")
+    def test_code_snippets_highlighted(self):
+        html = render_post('<pre><code class="language-python">def f():\n    return &lt;1&gt;</code></pre>').html
+        self.assertTrue(html.startswith('<pre class="highlight"><code class="language-python">'))
+        self.assertIn('<span class="k">def</span>', html)
+        self.assertIn("&lt;", html)
+        self.assertNotIn("<1>", html)
+
+    def test_excerpt_and_reading_time(self):
+        rendered = render_post("<p>" + "kata " * 450 + "</p><script>var x = 1;</script>")
+        self.assertEqual(rendered.word_count, 450)
+        self.assertEqual(rendered.reading_minutes, 3)
+        self.assertTrue(rendered.excerpt.endswith("kata…"))
+        self.assertEqual(len(rendered.excerpt.split()), 40)
+        self.assertEqual(render_post("<p>Singkat saja.</p>").excerpt, "Singkat saja.")
+
+
+class StoredRenderTestCase(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            cache.clear()
+            author = User(email="penulis@example.com", password="x", name="Penulis", is_verified=True)
+            post = BlogPost(title="Post Satu", subtitle="Sub", date="July 4, 2025",
+                            body="<p>Isi <b>pertama</b></p><script>alert('xss')</script>",
+                            img_url="https://example.com/a.jpg", author=author)
+            comment = Comment(text='<p>Komentar<img src=x onerror="alert(2)"></p>', author=author, post=post)
+            db.session.add_all([author, post, comment])
+            db.session.commit()
+            self.post_id = post.id
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_body_rendered_on_write(self):
+        with app.app_context():
+            post = BlogPost.query.get(self.post_id)
+            self.assertEqual(post.body_html, "<p>Isi <b>pertama</b></p>")
+            self.assertEqual((post.word_count, post.reading_minutes, post.excerpt), (2, 1, "Isi pertama"))
+
+            post.body = "<p>Isi baru yang lebih panjang</p>"
+            db.session.commit()
+            self.assertEqual(BlogPost.query.get(self.post_id).word_count, 5)
+
+    def test_post_page_serves_sanitized_html(self):
+        response = self.app.get(f"/post/{self.post_id}")
+        self.assertIn(b"<p>Isi <b>pertama</b></p>", response.data)
+        self.assertNotIn(b"alert(", response.data)
+        self.assertIn("1 menit baca".encode(), response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
-from app import app
 from flask import url_for
 from io import BytesIO
+from tests.helpers import app
 
 class RecommendBlogTestCase(unittest.TestCase):
     def setUp(self):
@@ -0,0 +1,145 @@
+import unittest
+from unittest import mock
+
+from app import cache
+from related import TermMatrix, np, post_terms, rebuild, update
+from tables import BlogPost, RelatedPost, User, db
+from tests.helpers import app
+
+related_index = app.extensions["related_index"]
+user_cache = app.extensions["user_cache"]
+
+
+@unittest.skipIf(np is None, "numpy tidak terpasang")
+class RelatedPostsTestCase(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            cache.clear()
+            user_cache.clear()
+            self.admin = User(email="admin@example.com", password="x", name="Admin", is_verified=True)
+            db.session.add(self.admin)
+            self.ids = {
+                key: self.add_post(title, body)
+                for key, title, body in [
+                    ("flask", "Belajar Flask", "<p>Routing Flask, template Jinja, dan blueprint Flask.</p>"),
+                    ("django", "Belajar Django", "<p>Routing Django, template Django, dan ORM.</p>"),
+                    ("jinja", "Template Jinja", "<p>Filter Jinja dan template turunan untuk Flask.</p>"),
+                    ("rendang", "Resep Rendang", "<p>Daging sapi, santan, dan bumbu rendang.</p>"),
+                    ("soto", "Resep Soto", "<p>Kuah soto, daging sapi, dan bumbu kuning.</p>"),
+                ]
+            }
+            with db.engine.begin() as conn:
+                rebuild(conn)
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_post(self, title, body):
+        post = BlogPost(title=title, subtitle="Catatan", date="July 4, 2025", body=body,
+                        img_url="https://example.com/a.jpg", author=self.admin)
+        db.session.add(post)
+        db.session.commit()
+        return post.id
+
+    def related(self, key):
+        with app.app_context():
+            rows = RelatedPost.query.filter_by(post_id=self.ids[key]).order_by(RelatedPost.rank)
+            return [row.related_id for row in rows]
+
+    def test_post_terms_weights_title_and_skips_stopwords(self):
+        terms = post_terms("Belajar Flask", "Catatan", "Flask dan yang 2025")
+        self.assertEqual(terms["flask"], 4)
+        self.assertEqual(terms["catatan"], 2)
+        self.assertNotIn("dan", terms)
+        self.assertNotIn("2025", terms)
+
+    def test_scores_match_dense_cosine(self):
+        documents = [(1, {"a": 3, "b": 1}), (2, {"a": 1, "c": 2}), (3, {"b": 2, "c": 1}), (4, {"d": 1})]
+        matrix = TermMatrix(documents)
+        vocab = ["a", "b", "c", "d"]
+        idf = np.log(5 / (1 + np.array([2, 2, 2, 1]))) + 1
+        dense = np.array([[(1 + np.log(t[v])) * idf[k] if v in t else 0 for k, v in enumerate(vocab)]
+                          for _, t in documents])
+        dense /= np.linalg.norm(dense, axis=1, keepdims=True)
+        expected = dense @ dense.T
+        np.fill_diagonal(expected, 0)
+        for i in range(len(documents)):
+            np.testing.assert_allclose(matrix.scores(i), expected[i])
+
+    def test_rebuild_groups_by_topic(self):
+        self.assertEqual(self.related("flask")[:2], [self.ids["jinja"], self.ids["django"]])
+        self.assertEqual(self.related("rendang")[0], self.ids["soto"])
+        self.assertNotIn(self.ids["flask"], self.related("flask"))
+
+    def test_incremental_update_only_touches_affected_rows(self):
+        with app.app_context():
+            new_id = self.add_post("Resep Rendang Padang", "<p>Rendang daging sapi dengan santan kental.</p>")
+            with db.engine.begin() as conn:
+                changed = update(conn, new_id)
+        self.ids["padang"] = new_id
+
+        self.assertIn(self.ids["rendang"], changed)
+        self.assertNotIn(self.ids["flask"], changed)
+        self.assertEqual(self.related("rendang")[0], new_id)
+        self.assertEqual(self.related("padang")[0], self.ids["rendang"])
+
+    def test_delete_removes_post_from_related_lists(self):
+        with self.app.session_transaction() as sess:
+            sess['_user_id'] = "1"
+        self.assertEqual(self.app.get(f"/delete/{self.ids['jinja']}").status_code, 302)
+
+        self.assertEqual(self.related("jinja"), [])
+        self.assertNotIn(self.ids["jinja"], self.related("flask"))
+
+    def test_post_page_lists_related_posts(self):
+        response = self.app.get(f"/post/{self.ids['rendang']}")
+        self.assertIn(b"Baca juga", response.data)
+        self.assertIn(b"Resep Soto", response.data)
+
+    def test_schedule_runs_inline_without_worker(self):
+        self.assertEqual(related_index.worker, "none")
+        with app.app_context():
+            post = db.session.get(BlogPost, self.ids["soto"])
+            post.body = "<p>ORM Django untuk resep.</p>"
+            post.title = "Soto Django"
+            db.session.commit()
+        related_index.schedule(self.ids["soto"])
+        self.assertEqual(self.related("soto")[0], self.ids["django"])
+
+    def test_thread_worker_invalidates_cached_post_page(self):
+        url = f"/post/{self.ids['rendang']}"
+        etag = self.app.get(url).headers["ETag"]
+        with app.app_context():
+            new_id = self.add_post("Resep Rendang Padang", "<p>Rendang daging sapi dengan santan kental.</p>")
+
+        with mock.patch.object(related_index, "worker", "thread"):
+            related_index.schedule(new_id)
+            self.assertTrue(related_index.flush(timeout=10))
+
+        response = self.app.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Resep Rendang Padang", response.data)
+
+    def test_rebuild_invalidates_changed_post_pages(self):
+        url = f"/post/{self.ids['rendang']}"
+        other_url = f"/post/{self.ids['flask']}"
+        etag = self.app.get(url).headers["ETag"]
+        other_etag = self.app.get(other_url).headers["ETag"]
+        with app.app_context():
+            new_id = self.add_post("Resep Rendang Padang", "<p>Rendang daging sapi dengan santan kental.</p>")
+            related_index.rebuild()
+
+        response = self.app.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f"/post/{new_id}".encode(), response.data)
+        # Daftar post Flask tidak berubah, jadi halamannya tetap valid
+        self.assertEqual(self.app.get(other_url, headers={"If-None-Match": other_etag}).status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
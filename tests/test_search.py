@@ -0,0 +1,68 @@
+import unittest
+
+from search import index_post, rebuild_index, remove_post, search_posts, strip_html
+from tables import BlogPost, User, db
+from tests.helpers import AppTestCase, app
+
+
+class SearchTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        with app.app_context():
+            author = User(email="penulis@example.com", password="x", name="Penulis", is_verified=True)
+            posts = [
+                BlogPost(title="Belajar Flask", subtitle="Framework web Python", date="July 4, 2025",
+                         body="<p>Routing dan template.</p>", img_url="https://example.com/a.jpg", author=author),
+                BlogPost(title="Catatan Harian", subtitle="Cerita", date="July 5, 2025",
+                         body="<p>Hari ini saya belajar <b>Flask</b> &lt;script&gt; di kampus.</p>"
+                              "<script>alert(1)</script>",
+                         img_url="https://example.com/b.jpg", author=author),
+            ]
+            db.session.add_all([author] + posts)
+            db.session.flush()
+            for post in posts:
+                index_post(post)
+            db.session.commit()
+
+    def test_strip_html_drops_tags_and_scripts(self):
+        self.assertEqual(strip_html("<p>Halo <b>dunia</b></p><script>x()</script><p>lagi</p>"), "Halo dunia lagi")
+
+    def test_title_match_ranks_above_body_match(self):
+        with app.app_context():
+            results = search_posts("flask").results
+        self.assertEqual([r["title"] for r in results][0], "Belajar <mark>Flask</mark>")
+        self.assertEqual(len(results), 2)
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        with app.app_context():
+            snippet = search_posts("kampus").results[0]["snippet"]
+        self.assertIn("<mark>kampus</mark>", snippet)
+        self.assertIn("&lt;script&gt;", snippet)
+        self.assertNotIn("alert", snippet)
+
+    def test_prefix_and_special_characters(self):
+        with app.app_context():
+            self.assertEqual(len(search_posts("fram").results), 1)
+            self.assertEqual(search_posts('("flask*').results[0]["id"], 1)
+            self.assertEqual(search_posts("  ").results, [])
+
+    def test_edit_and_delete_update_index(self):
+        with app.app_context():
+            post = BlogPost.query.get(1)
+            post.title = "Belajar Django"
+            index_post(post)
+            remove_post(2)
+            db.session.commit()
+            self.assertEqual(search_posts("flask").results, [])
+            self.assertEqual(search_posts("django").results[0]["id"], 1)
+            self.assertEqual(rebuild_index(), 2)
+            self.assertEqual(len(search_posts("belajar").results), 2)
+
+    def test_search_page_renders_paged_results(self):
+        response = self.app.get("/search?q=flask")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"<mark>Flask</mark>", response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
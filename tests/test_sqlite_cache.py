@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from sqlite_cache import SQLiteCache
+
+
+def _write_from_child(path):
+    SQLiteCache(path).set("dari-child", {"pid": os.getpid()})
+
+
+class SQLiteCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "cache.sqlite")
+        self.cache = SQLiteCache(self.path, threshold=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_set_get_delete(self):
+        self.assertTrue(self.cache.set("a", b"<html>"))
+        self.assertEqual(self.cache.get("a"), b"<html>")
+        self.assertTrue(self.cache.delete("a"))
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_timeout_expires_entries(self):
+        self.cache.set("sebentar", 1, timeout=0.05)
+        self.cache.set("selamanya", 2, timeout=0)
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("sebentar"))
+        self.assertFalse(self.cache.has("sebentar"))
+        self.assertEqual(self.cache.get("selamanya"), 2)
+
+    def test_add_only_sets_missing_keys(self):
+        self.assertTrue(self.cache.add("k", 1))
+        self.assertFalse(self.cache.add("k", 2))
+        self.assertEqual(self.cache.get("k"), 1)
+
+    def test_inc_is_shared_between_instances(self):
+        other = SQLiteCache(self.path)
+        self.assertEqual(self.cache.inc("hits"), 1)
+        self.assertEqual(other.inc("hits"), 2)
+        self.assertEqual(self.cache.get("hits"), 2)
+
+    def test_lru_eviction_keeps_recently_used_entries(self):
+        for i in range(10):
+            self.cache.set(f"k{i}", i)
+        # Tandai k0 sebagai baru diakses, lalu lewati batas threshold
+        self.cache._connection().execute("UPDATE cache SET accessed = ? WHERE key = 'k0'", (time.time() + 60,))
+        self.cache.set("k10", 10)
+        self.assertEqual(self.cache.get("k0"), 0)
+        self.assertIsNone(self.cache.get("k1"))
+        count = self.cache._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        self.assertLessEqual(count, 10)
+
+    def test_total_size_is_bounded(self):
+        cache = SQLiteCache(self.path, threshold=1000, max_bytes=10_000)
+        for i in range(20):
+            cache.set(f"blob{i}", b"x" * 1000)
+        total = cache._connection().execute("SELECT SUM(size) FROM cache").fetchone()[0]
+        self.assertLessEqual(total, 10_000)
+        self.assertIsNotNone(cache.get("blob19"))
+
+    def test_running_totals_match_table(self):
+        other = SQLiteCache(self.path, threshold=10)
+        for i in range(15):
+            self.cache.set(f"k{i}", "x" * i)
+        self.cache.set("k14", "lebih panjang")
+        other.inc("hits")
+        other.inc("hits")
+        self.cache.add("k14", "diabaikan")
+        self.cache.delete("k13")
+        self.cache.set_many({"a": 1, "b": 2})
+
+        conn = self.cache._connection()
+        totals = conn.execute("SELECT entries, bytes FROM cache_totals").fetchone()
+        actual = conn.execute("SELECT COUNT(*), SUM(size) FROM cache").fetchone()
+        self.assertEqual(totals, actual)
+        self.cache.clear()
+        self.assertEqual(conn.execute("SELECT entries, bytes FROM cache_totals").fetchone(), (0, 0))
+
+    def test_set_does_not_scan_whole_table(self):
+        statements = []
+        self.cache._connection().set_trace_callback(statements.append)
+        self.cache.set("a", 1)
+        self.assertFalse([sql for sql in statements if "COUNT(" in sql or "SUM(" in sql])
+
+    def test_hit_does_not_wait_for_write_lock(self):
+        self.cache.set("a", 1)
+        self.cache._connection().execute("UPDATE cache SET accessed = 0")
+        other = SQLiteCache(self.path)
+        with other._write():
+            start = time.monotonic()
+            self.assertEqual(self.cache.get("a"), 1)
+            self.assertLess(time.monotonic() - start, 1)
+        # Koneksi kembali menunggu lock untuk tulis biasa
+        self.assertEqual(self.cache._connection().execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+
+    def test_visible_across_processes(self):
+        process = multiprocessing.get_context("spawn").Process(target=_write_from_child, args=(self.path,))
+        process.start()
+        process.join(10)
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.cache.get("dari-child")["pid"], process.pid)
+
+
+if __name__ == "__main__":
+    unittest.main()
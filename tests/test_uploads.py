@@ -0,0 +1,149 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from tables import Upload, UploadBlob, User, db
+from uploads import CHUNK_SIZE, FTPPool, spool_upload, store_blob
+from tests.helpers import AppTestCase, app
+
+try:
+    import pyftpdlib  # noqa: F401
+except ImportError:
+    pyftpdlib = None
+
+
+class SpoolUploadTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_streams_hash_and_size_in_one_pass(self):
+        content = os.urandom(CHUNK_SIZE * 3 + 17)
+        upload = spool_upload(FileStorage(io.BytesIO(content), "besar.pdf"), self.tmpdir, "besar.pdf")
+        self.assertEqual(upload.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(upload.size, len(content))
+        with open(upload.path, "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(os.listdir(self.tmpdir), ["besar.pdf"])
+
+    def test_identical_content_is_stored_once(self):
+        first = store_blob(FileStorage(io.BytesIO(b"isi sama"), "a.pdf"), self.tmpdir, ".pdf")
+        second = store_blob(FileStorage(io.BytesIO(b"isi sama"), "b.pdf"), self.tmpdir, ".pdf")
+        self.assertTrue(first.created)
+        self.assertFalse(second.created)
+        self.assertEqual(first.path, second.path)
+        self.assertTrue(first.path.endswith(f"{first.sha256[:2]}/{first.sha256}.pdf"))
+        self.assertEqual(os.listdir(os.path.dirname(first.path)), [os.path.basename(first.path)])
+
+    def test_store_blob_reads_stream_once(self):
+        content = os.urandom(CHUNK_SIZE * 2 + 5)
+        stream = io.BytesIO(content)
+        with mock.patch.object(stream, "seek", side_effect=AssertionError("stream dibaca ulang")):
+            stored = store_blob(FileStorage(stream, "besar.pdf"), self.tmpdir, ".pdf")
+        self.assertEqual(stored.sha256, hashlib.sha256(content).hexdigest())
+        with open(stored.path, "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(os.listdir(self.tmpdir), [stored.sha256[:2]])
+
+    def test_oversized_upload_leaves_no_files(self):
+        upload = FileStorage(io.BytesIO(b"x" * (CHUNK_SIZE + 1)), "besar.pdf")
+        with self.assertRaises(RequestEntityTooLarge):
+            store_blob(upload, self.tmpdir, ".pdf", max_size=CHUNK_SIZE)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+
+@unittest.skipIf(pyftpdlib is None, "pyftpdlib tidak terpasang")
+class FTPPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.remote_dir = os.path.join(self.tmpdir, "remote")
+        os.makedirs(self.remote_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_uploads_reuse_logged_in_sessions(self):
+        from tests.servers import FTPStandIn
+
+        with FTPStandIn(self.remote_dir) as server:
+            pool = FTPPool("127.0.0.1", server.port, server.user, server.password, size=1)
+            for i in range(3):
+                path = os.path.join(self.tmpdir, f"file{i}.pdf")
+                with open(path, "wb") as f:
+                    f.write(b"isi %d" % i)
+                pool.submit(path, f"file{i}.pdf").result(timeout=10)
+            pool.close()
+
+        self.assertEqual(server.logins, 1)
+        self.assertEqual(sorted(os.listdir(self.remote_dir)), ["file0.pdf", "file1.pdf", "file2.pdf"])
+
+    def test_failed_upload_is_reported_on_the_future(self):
+        path = os.path.join(self.tmpdir, "file.pdf")
+        with open(path, "wb") as f:
+            f.write(b"isi")
+        pool = FTPPool("127.0.0.1", 1, "x", "y", size=1, timeout=2, retries=0)
+        with self.assertRaises(OSError):
+            pool.submit(path, "file.pdf").result(timeout=10)
+        pool.close()
+
+
+@unittest.skipIf(pyftpdlib is None, "pyftpdlib tidak terpasang")
+class RecommendDedupTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        app.config['WTF_CSRF_ENABLED'] = False
+        self.tmpdir = tempfile.mkdtemp()
+        self.remote_dir = os.path.join(self.tmpdir, "remote")
+        os.makedirs(self.remote_dir)
+        with app.app_context():
+            db.session.add_all([
+                User(email="admin@example.com", password="x", name="Admin", is_verified=True),
+                User(email="pembaca@example.com", password="x", name="Pembaca", is_verified=True),
+            ])
+            db.session.commit()
+        with self.app.session_transaction() as sess:
+            sess['_user_id'] = "2"
+
+    def tearDown(self):
+        app.config['WTF_CSRF_ENABLED'] = True
+        shutil.rmtree(self.tmpdir)
+        super().tearDown()
+
+    def recommend(self, filename):
+        return self.app.post("/recommend", data={
+            "title": "Judul", "notes": "Catatan",
+            "file": (io.BytesIO(b"%PDF isi yang sama"), filename),
+        }, content_type="multipart/form-data")
+
+    def test_repeat_submission_skips_disk_write_and_ftp(self):
+        from tests.servers import FTPStandIn
+
+        blobs = os.path.join(self.tmpdir, "blobs")
+        with FTPStandIn(self.remote_dir) as server:
+            pool = FTPPool("127.0.0.1", server.port, server.user, server.password, size=1)
+            with mock.patch.dict(app.config, {"BLOB_FOLDER": blobs}), \
+                    mock.patch.dict(app.extensions, {"ftp_pool": pool}), \
+                    mock.patch.object(pool, "submit", wraps=pool.submit) as submit:
+                self.assertEqual(self.recommend("satu.pdf").status_code, 302)
+                pool.close()
+                self.assertEqual(self.recommend("dua.pdf").status_code, 302)
+
+        self.assertEqual(submit.call_count, 1)
+        self.assertEqual(len(os.listdir(self.remote_dir)), 1)
+        with app.app_context():
+            self.assertEqual(UploadBlob.query.count(), 1)
+            self.assertTrue(UploadBlob.query.one().ftp_uploaded)
+            self.assertEqual(sorted(u.filename for u in Upload.query), ["dua.pdf", "satu.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from app import load_user
+from tables import BlogPost, Comment, User, db
+from tests.helpers import AppTestCase, app, count_queries
+from user_cache import UserCache, UserSnapshot
+
+
+class UserCacheTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        app.config['WTF_CSRF_ENABLED'] = False
+        with app.app_context():
+            author = User(email="Penulis@Example.com", password="x", name="Penulis", is_verified=True)
+            post = BlogPost(title="Post Satu", subtitle="Sub", date="July 4, 2025",
+                            body="<p>Isi</p>", img_url="https://example.com/a.jpg", author=author)
+            db.session.add_all([author, post])
+            db.session.commit()
+            self.user_id = author.id
+            self.post_id = post.id
+
+    def tearDown(self):
+        super().tearDown()
+        app.config['WTF_CSRF_ENABLED'] = True
+
+    def test_snapshot_is_loaded_once(self):
+        def load_twice():
+            with app.app_context():
+                self.first = load_user(str(self.user_id))
+                self.second = load_user(str(self.user_id))
+
+        _, statements = count_queries(load_twice)
+        self.assertEqual(len(statements), 1)
+        self.assertIs(self.first, self.second)
+        self.assertIsInstance(self.first, UserSnapshot)
+        self.assertEqual(self.first.name, "Penulis")
+        self.assertEqual(self.first.get_id(), str(self.user_id))
+        # Hash Gravatar: email di-trim dan huruf kecil
+        self.assertEqual(self.first.email_hash, "9af6398a3899ff3f948b836aed0d3c3f")
+        self.assertFalse(hasattr(self.first, "__dict__"))
+
+    def test_user_change_invalidates_snapshot(self):
+        with app.app_context():
+            self.assertEqual(load_user(self.user_id).name, "Penulis")
+            User.query.get(self.user_id).name = "Penulis Baru"
+            db.session.commit()
+            self.assertEqual(load_user(self.user_id).name, "Penulis Baru")
+
+    def test_unknown_or_invalid_id(self):
+        with app.app_context():
+            self.assertIsNone(load_user("999"))
+            self.assertIsNone(load_user("bukan-angka"))
+
+    def test_ttl_and_lru_bounds(self):
+        calls = []
+        users = {i: User(id=i, email=f"u{i}@example.com", name=f"U{i}", is_verified=True) for i in range(3)}
+
+        def loader(user_id):
+            calls.append(user_id)
+            return users[user_id]
+
+        expiring = UserCache(loader, ttl=0)
+        expiring.get(1)
+        expiring.get(1)
+        self.assertEqual(calls, [1, 1])
+
+        calls.clear()
+        small = UserCache(loader, maxsize=2)
+        small.get(0)
+        small.get(1)
+        small.get(0)
+        small.get(2)  # mengusir 1, yang paling lama tidak dipakai
+        small.get(0)
+        small.get(1)
+        self.assertEqual(calls, [0, 1, 2, 1])
+
+    def test_logged_in_comment_uses_snapshot_id(self):
+        with self.app.session_transaction() as session:
+            session["_user_id"] = str(self.user_id)
+            session["_fresh"] = True
+        response = self.app.post(f"/post/{self.post_id}", data={"body": "Komentar dari snapshot"})
+        self.assertEqual(response.status_code, 302)
+        with app.app_context():
+            comment = Comment.query.one()
+            self.assertEqual(comment.author_id, self.user_id)
+            self.assertEqual(comment.author.name, "Penulis")
+
+
+if __name__ == "__main__":
+    unittest.main()
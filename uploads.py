@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import os
+import queue
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from ftplib import FTP, all_errors
+
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from tables import Upload, UploadBlob, db
+
+# Ukuran potongan saat membaca upload / mengirim ke FTP
+CHUNK_SIZE = 64 * 1024
+
+SpooledUpload = namedtuple("SpooledUpload", ["path", "sha256", "size"])
+
+# Hasil store_blob(); created=False berarti isi yang sama sudah tersimpan
+StoredBlob = namedtuple("StoredBlob", ["path", "sha256", "size", "created"])
+
+
+def _spool(stream, directory, max_size=None):
+    # Baca upload sekali saja: setiap potongan langsung di-hash dan ditulis ke
+    # file sementara di `directory` (jadi os.replace sesudahnya atomik)
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise RequestEntityTooLarge(f"Ukuran file melebihi batas {max_size} byte.")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return SpooledUpload(temp_path, digest.hexdigest(), size)
+
+
+def spool_upload(file_storage, directory, filename, max_size=None):
+    spooled = _spool(file_storage.stream, directory, max_size)
+    path = os.path.join(directory, filename)
+    os.replace(spooled.path, path)
+    return spooled._replace(path=path)
+
+
+def blob_name(sha256, extension=""):
+    # Dua karakter pertama hash jadi subfolder supaya satu folder tidak berisi
+    # ribuan file
+    return f"{sha256[:2]}/{sha256}{extension}"
+
+
+def store_blob(file_storage, directory, extension="", max_size=None):
+    """Simpan upload secara content-addressed: nama file = SHA-256 isinya.
+
+    Upload dibaca satu kali ke file sementara sambil di-hash (dan dibatasi
+    ``max_size``), lalu dipindah ke nama hash-nya; kalau blob dengan isi yang
+    sama sudah ada, file sementara itu dihapus.
+    """
+    spooled = _spool(file_storage.stream, directory, max_size)
+    path = os.path.join(directory, blob_name(spooled.sha256, extension))
+    try:
+        if os.path.exists(path):
+            os.unlink(spooled.path)
+            return StoredBlob(path, spooled.sha256, spooled.size, False)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(spooled.path, path)
+    except BaseException:
+        if os.path.exists(spooled.path):
+            os.unlink(spooled.path)
+        raise
+    return StoredBlob(path, spooled.sha256, spooled.size, True)
+
+
+def register_upload(user_id, filename, mimetype, stored, directory):
+    """Catat upload (user + nama file asli) dan blob-nya. Mengembalikan baris UploadBlob."""
+    blob = UploadBlob.query.get(stored.sha256)
+    if blob is None:
+        blob = UploadBlob(
+            sha256=stored.sha256,
+            size=stored.size,
+            path=os.path.relpath(stored.path, directory).replace(os.sep, "/"),
+        )
+        db.session.add(blob)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Upload lain dengan isi yang sama baru saja mendaftarkan blob ini
+            db.session.rollback()
+            blob = UploadBlob.query.get(stored.sha256)
+
+    db.session.add(Upload(user_id=user_id, filename=filename, mimetype=mimetype, sha256=blob.sha256))
+    db.session.commit()
+    return blob
+
+
+class FTPPool:
+    """Sejumlah kecil sesi FTP yang sudah login dan dipakai ulang.
+
+    Upload dijalankan di thread pool (``submit()`` mengembalikan Future), jadi
+    request tidak menunggu transfer FTP. Sesi yang mati (timeout dari server)
+    dideteksi dengan NOOP dan diganti dengan koneksi baru.
+    """
+
+    def __init__(self, host, port, user, password, size=2, timeout=30, retries=2):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.size = size
+        self.timeout = timeout
+        self.retries = retries
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._idle = None
+        self._executor = None
+
+    def _ensure_started(self):
+        # Koneksi dan thread tidak boleh dipakai bersama setelah fork
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._idle = queue.LifoQueue()
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="ftp-upload")
+
+    def _connect(self):
+        ftp = FTP(timeout=self.timeout)
+        ftp.connect(self.host, self.port)
+        ftp.login(self.user, self.password)
+        ftp.set_pasv(True)  # Wajib untuk mencegah 425 Error
+        return ftp
+
+    @contextmanager
+    def session(self):
+        self._ensure_started()
+        ftp = None
+        try:
+            ftp = self._idle.get_nowait()
+            ftp.voidcmd("NOOP")
+        except queue.Empty:
+            ftp = self._connect()
+        except all_errors:
+            ftp.close()
+            ftp = self._connect()
+
+        try:
+            yield ftp
+        except BaseException:
+            ftp.close()
+            raise
+        self._idle.put(ftp)
+
+    def upload(self, local_path, remote_name):
+        for attempt in range(self.retries + 1):
+            try:
+                with self.session() as ftp, open(local_path, "rb") as f:
+                    ftp.storbinary(f"STOR {remote_name}", f, blocksize=CHUNK_SIZE)
+                return remote_name
+            except all_errors as e:
+                if attempt == self.retries:
+                    raise
+                logging.warning(f"Upload FTP '{remote_name}' gagal, mencoba lagi: {e}")
+
+    def submit(self, local_path, remote_name):
+        self._ensure_started()
+        return self._executor.submit(self.upload, local_path, remote_name)
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                ftp = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                ftp.quit()
+            except all_errors:
+                ftp.close()
@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+from avatars import email_hash
+
+
+class UserSnapshot:
+    """Salinan ringan user yang login, dipakai sebagai ``current_user``.
+
+    Hanya berisi data yang dibaca template dan view di setiap request, dan
+    mengimplementasikan sendiri antarmuka Flask-Login (tanpa UserMixin), jadi
+    tidak perlu membangun objek ORM untuk setiap halaman.
+    """
+
+    __slots__ = ("id", "name", "email_hash", "is_verified")
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, id, name, email_hash, is_verified):
+        self.id = id
+        self.name = name
+        self.email_hash = email_hash
+        self.is_verified = is_verified
+
+    @classmethod
+    def from_user(cls, user):
+        # Hash MD5 dari email (format Gravatar), bukan email aslinya
+        return cls(user.id, user.name, user.avatar_hash or email_hash(user.email), user.is_verified)
+
+    def get_id(self):
+        return str(self.id)
+
+    def __repr__(self):
+        return f"<UserSnapshot {self.id} {self.name!r}>"
+
+
+class UserCache:
+    """Peta TTL + LRU dari id user ke ``UserSnapshot``, per proses.
+
+    ``get()`` hanya mengambil user dari database kalau snapshot belum ada atau
+    umurnya sudah lewat ``ttl`` detik. Perubahan pada baris user (misalnya
+    verifikasi email) langsung menghapus snapshot di proses ini lewat event
+    SQLAlchemy; worker lain melihat perubahan paling lambat setelah ``ttl``.
+    """
+
+    def __init__(self, loader, maxsize=1024, ttl=60):
+        self.loader = loader
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get("USER_CACHE_TTL", self.ttl)
+        app.extensions["user_cache"] = self
+
+    def get(self, user_id):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                return entry[0]
+
+        user = self.loader(user_id)
+        if user is None:
+            self.invalidate(user_id)
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        with self._lock:
+            self._entries[user_id] = (snapshot, now + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def watch(self, model):
+        # Snapshot dibuang setiap kali baris user diubah atau dihapus
+        def _invalidate(mapper, connection, target):
+            if target.id is not None:
+                self.invalidate(target.id)
+
+        event.listen(model, "after_update", _invalidate)
+        event.listen(model, "after_delete", _invalidate)
@@ -0,0 +1,8 @@
+from app import create_app
+
+# `gunicorn wsgi:app` / `flask --app wsgi run`; pakai --preload supaya worker
+# mewarisi app yang sudah siap. Profil dibaca dari env BLOG_CONFIG.
+app = create_app()
+
+if __name__ == "__main__":
+    app.run(debug=True)